@@ -0,0 +1,46 @@
+"""
+Construction of the environment and of the whole model.
+"""
+import numpy as np
+
+from benchmarks.common import BareModel, make_model
+from benchmarks.harness import benchmark
+from src.agents.cell import CellState
+from src.models.environment.environment import GridEnvironment
+from src.models.environment.landscape import LandscapeState
+from src.models.environment.smoke import SmokeField
+from src.models.environment.terrain import Terrain, fractal_noise
+from src.models.environment.wind import WindField
+
+
+@benchmark("environment.grid_build", params=[150, 200, 1000, 2000])
+def grid_build(size):
+    model = BareModel()
+    return lambda: GridEnvironment(model, size, size)
+
+
+@benchmark("model.build", params=['small', 'large'])
+def model_build(area_size):
+    return lambda: make_model(area_size, bases=2, drones=50)
+
+
+@benchmark("wind.set", params=[200, 2000])
+def wind_set(size):
+    speed = np.random.default_rng(0).uniform(0, 10, (size, size))
+    wind = WindField(size, size)
+    return lambda: wind.set(speed, 270)
+
+
+@benchmark("terrain.derive", params=[200, 2000])
+def terrain_derive(size):
+    elevation = fractal_noise(size, size, np.random.default_rng(0), feature_size=64) * 200
+    return lambda: Terrain(size, size, elevation)
+
+
+@benchmark("smoke.step", params=[200, 2000])
+def smoke_step(size):
+    landscape = LandscapeState(size, size)
+    landscape.state[size // 4:size // 2, size // 4:size // 2] = CellState.BURNING
+    smoke = SmokeField(size, size, downscale=4)
+    wind = WindField(size, size, speed=3, direction=270)
+    return lambda: smoke.step(landscape, wind)
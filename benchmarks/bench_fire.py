@@ -0,0 +1,53 @@
+"""
+Fire model steps at several fire sizes.
+"""
+import math
+
+from benchmarks.common import make_model
+from benchmarks.harness import benchmark
+from src.agents.cell import CellState
+
+
+def burning_model(fire_model: str, burning: int):
+    """Large model with a square block of about the given number of burning cells in the middle."""
+    model = make_model('large', **{'fire.model': fire_model})
+    side = max(1, round(math.sqrt(burning)))
+    x0 = (model.grid.width - side) // 2
+    y0 = (model.grid.height - side) // 2
+    model.landscape.state[x0:x0 + side, y0:y0 + side] = CellState.BURNING
+    model.fire_model.reset_front()
+    return model
+
+
+@benchmark("fire.simple_step", params=[10, 100, 1000, 10000])
+def simple_step(burning):
+    return burning_model('simple', burning).fire_model.step
+
+
+@benchmark("fire.vectorised_step", params=[10, 100, 1000, 10000])
+def vectorised_step(burning):
+    return burning_model('vectorised', burning).fire_model.step
+
+
+@benchmark("fire.rothermel_step", params=[10, 100, 1000, 10000])
+def rothermel_step(burning):
+    return burning_model('rothermel', burning).fire_model.step
+
+
+@benchmark("fire.vectorised_windy_step", params=[1000, 10000])
+def vectorised_windy_step(burning):
+    model = burning_model('vectorised', burning)
+    model.grid.wind.set(speed=5, direction=270)
+    return model.fire_model.step
+
+
+@benchmark("fire.arrival_sweep", params=[10, 1000])
+def arrival_sweep(burning):
+    return burning_model('arrival', burning).fire_model.sweep
+
+
+@benchmark("fire.arrival_step", params=[10, 1000])
+def arrival_step(burning):
+    model = burning_model('arrival', burning)
+    model.fire_model.sweep()
+    return model.fire_model.step
@@ -0,0 +1,55 @@
+"""
+Portrayal and drawing of the model for the visualisation.
+"""
+import io
+
+from matplotlib.figure import Figure
+
+from benchmarks.common import make_model
+from benchmarks.harness import benchmark
+from src.visualisation.raster import LandscapeRaster, RasterRenderer
+from src.visualisation.solara.custom_elements import (agent_portrayal,
+                                                      landscape_colors)
+
+
+@benchmark("render.agent_portrayal", params=['small', 'large'])
+def portrayal(area_size):
+    landscape = make_model(area_size).landscape
+    return lambda: [agent_portrayal(cell) for cell in landscape]
+
+
+@benchmark("render.landscape_colors", params=['small', 'large'])
+def colors(area_size):
+    landscape = make_model(area_size).landscape
+    return lambda: landscape_colors(landscape)
+
+
+def render_png(figure: Figure) -> bytes:
+    """Render a figure to PNG, as the Solara component does every frame."""
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+@benchmark("render.raster_update", params=['small', 'large'])
+def raster_update(area_size):
+    model = make_model(area_size)
+    model.start_fire(num_fires=20)
+    raster = LandscapeRaster(model.landscape)
+    model.step()
+    return raster.update
+
+
+@benchmark("render.raster_frame", params=['small', 'large'])
+def raster_frame(area_size):
+    model = make_model(area_size, bases=2, drones=50)
+    figure = Figure()
+    renderer = RasterRenderer(model, figure.add_subplot())
+    render_png(figure)
+
+    def frame():
+        model.step()
+        renderer.update()
+        render_png(figure)
+    return frame
+
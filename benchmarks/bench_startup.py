@@ -0,0 +1,25 @@
+"""
+Interpreter start-up and module import costs.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.harness import benchmark
+from src.utils.logging_config import get_logger
+
+ROOT = Path(__file__).parent.parent
+
+
+@benchmark("startup.import", params=['src.utils.config', 'src.simulation.simulation_model'])
+def import_module(module):
+    command = [sys.executable, "-c", f"import {module}"]
+    return lambda: subprocess.run(command, cwd=ROOT, check=True, capture_output=True)
+
+
+@benchmark("logging.get_logger_x1000")
+def get_logger_calls():
+    def calls():
+        for _ in range(1000):
+            get_logger()
+    return calls
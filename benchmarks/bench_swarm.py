@@ -0,0 +1,49 @@
+"""
+Swarm steps at several swarm sizes.
+"""
+from benchmarks.common import make_model, scatter_drones
+from benchmarks.harness import benchmark
+
+
+def swarm_model(drones: int, **overrides):
+    model = make_model('large', drones=drones, **overrides)
+    scatter_drones(model)
+    return model
+
+
+@benchmark("drone.step", params=[10, 100, 1000])
+def drone_step(drones):
+    model = swarm_model(drones)
+
+    def step():
+        model.neighbourhood.update(model.drones)
+        model.drones.shuffle_do("step")
+    return step
+
+
+@benchmark("drone.synchronous_step", params=[100, 1000, 2000])
+def drone_synchronous_step(drones):
+    model = swarm_model(drones, **{'swarm.schedule': 'synchronous'})
+
+    def step():
+        model.neighbourhood.update(model.drones)
+        model.drones.do("sense")
+        model.drones.do("decide")
+        model.drones.do("advance")
+    return step
+
+
+@benchmark("swarm.vectorised_step", params=[10, 100, 1000])
+def vectorised_step(drones):
+    model = swarm_model(drones, **{'swarm.engine': 'vectorised'})
+    return model.swarm_engine.step
+
+
+@benchmark("drone.advance", params=[1000])
+def drone_advance(drones):
+    # synchronous, so the time is not dominated by the neighbourhood following each move
+    model = swarm_model(drones, **{'swarm.schedule': 'synchronous'})
+    model.neighbourhood.update(model.drones)
+    for drone in model.drones:
+        drone.target_pos = (drone.pos[0] + 1, drone.pos[1] - 1)
+    return lambda: model.drones.do("advance")
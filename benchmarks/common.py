@@ -0,0 +1,41 @@
+"""
+Scenarios shared by the benchmarks.
+"""
+import mesa
+import numpy as np
+
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.utils.random_streams import RandomStreams
+
+
+def make_model(area_size: str = 'small', bases: int = 1, drones: int = 1, **overrides) -> SimulationModel:
+    """Build a simulation model writing no output, with the given config overrides."""
+    config = Config().with_overrides({
+        'simulation.area_size': area_size,
+        'simulation.save_data': False,
+        'simulation.seed': 42,
+        'swarm.initial_bases': bases,
+        'swarm.drone_base.number_of_agents': drones,
+        **overrides,
+    })
+    return SimulationModel(config)
+
+
+def scatter_drones(model: SimulationModel, seed: int = 0) -> None:
+    """Move every drone to a random position away from the edges."""
+    rng = np.random.default_rng(seed)
+    width, height = model.grid.width, model.grid.height
+    for drone in model.drones:
+        pos = (int(rng.integers(6, width - 6)), int(rng.integers(6, height - 6)))
+        model.grid.move_agent(drone, pos)
+        drone.target_pos = pos
+
+
+class BareModel(mesa.Model):
+    """Model with only a config and random number generators, to build environments on."""
+
+    def __init__(self, seed: int = 42):
+        super().__init__(seed=seed)
+        self.config = Config()
+        self.streams = RandomStreams(seed)
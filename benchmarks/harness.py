@@ -0,0 +1,159 @@
+"""
+Minimal benchmark harness.
+
+Benchmarks are registered with the benchmark decorator. A benchmark is a function, taking the
+parameter value if it has parameters, that does the setup and returns the callable to time. The
+setup is never timed and runs again before every repeat for benchmarks that change their state.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# name -> (factory, parameter values)
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, params: Sequence[Any] = (None,)):
+    """
+    Register a benchmark.
+
+    Args:
+        name: Name of the benchmark, the parameter value is appended to it
+        params: Parameter values to run the benchmark with
+    """
+    def register(factory: Callable[[Any], Callable[[], Any]]):
+        BENCHMARKS[name] = (factory, list(params))
+        return factory
+    return register
+
+
+@dataclass
+class Result:
+    """Timings of one benchmark, in seconds."""
+    min: float
+    median: float
+    mean: float
+    stdev: float
+    repeat: int
+
+
+def time_benchmark(factory: Callable[[Any], Callable[[], Any]], param: Any, repeat: int) -> Result:
+    """Time a benchmark, with a fresh setup and one untimed warm-up call before the repeats."""
+    def setup():
+        return factory() if param is None else factory(param)
+
+    setup()()
+    timings = []
+    for _ in range(repeat):
+        func = setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return Result(min=min(timings), median=statistics.median(timings), mean=statistics.fmean(timings),
+                  stdev=statistics.stdev(timings) if repeat > 1 else 0.0, repeat=repeat)
+
+
+def full_name(name: str, param: Any) -> str:
+    return name if param is None else f"{name}[{param}]"
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5,
+        report: Callable[[str, Result], None] = None) -> Dict[str, Result]:
+    """
+    Run the registered benchmarks.
+
+    Args:
+        pattern: Only run the benchmarks whose name contains it
+        repeat: Number of timed calls per benchmark
+        report: Called with each result as it is ready
+
+    Returns:
+        The results by benchmark name
+    """
+    results = {}
+    for name, (factory, params) in BENCHMARKS.items():
+        for param in params:
+            key = full_name(name, param)
+            if pattern and pattern not in key:
+                continue
+            results[key] = time_benchmark(factory, param, repeat)
+            if report:
+                report(key, results[key])
+    return results
+
+
+def machine_info() -> Dict[str, str]:
+    """Description of the machine and code the results were measured on."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def save(results: Dict[str, Result], path: str) -> None:
+    """Write the results and machine info as JSON."""
+    data = {'machine': machine_info(), 'results': {name: asdict(result) for name, result in results.items()}}
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
+
+
+def load(path: str) -> Dict[str, Result]:
+    """Read results written by save."""
+    with open(path) as file:
+        data = json.load(file)
+    return {name: Result(**result) for name, result in data['results'].items()}
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result],
+            threshold: float = 1.2) -> List[str]:
+    """
+    Compare results with a baseline, on the fastest run of each benchmark.
+
+    Args:
+        results: Current results
+        baseline: Results to compare with
+        threshold: Ratio of the timings above which a benchmark counts as a regression
+
+    Returns:
+        The names of the benchmarks that regressed
+    """
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<45} {'-':>12} {format_time(result.min):>12} {'new':>8}")
+            continue
+        ratio = result.min / baseline[name].min
+        flag = ""
+        if ratio > threshold:
+            flag = "  slower"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:<45} {format_time(baseline[name].min):>12} {format_time(result.min):>12} "
+              f"{ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
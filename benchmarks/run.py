@@ -0,0 +1,68 @@
+"""
+Run the benchmark suite.
+
+Usage, from the repository root:
+    python -m benchmarks.run                          # run everything
+    python -m benchmarks.run -k fire                  # only the benchmarks matching 'fire'
+    python -m benchmarks.run -o baseline.json         # save machine-readable results
+    python -m benchmarks.run --compare baseline.json  # compare with saved results
+
+With --compare the exit code is 1 if a benchmark got slower than the threshold.
+"""
+import argparse
+import importlib
+import pkgutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks import harness
+from src.utils.logging_config import log
+
+
+def load_benchmarks() -> None:
+    """Import the bench_* modules, which register their benchmarks."""
+    package = Path(__file__).parent
+    for module in pkgutil.iter_modules([str(package)]):
+        if module.name.startswith("bench_"):
+            importlib.import_module(f"benchmarks.{module.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('-k', '--filter', type=str, default=None,
+                        help='Only run the benchmarks whose name contains this')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Timed runs per benchmark')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Write the results to this JSON file')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='Compare with results saved with --output')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    # The models log every fire and base, keep the output to the results
+    log.remove()
+    log.add(sys.stderr, level="WARNING")
+
+    load_benchmarks()
+
+    def report(name, result):
+        print(f"{name:<45} min {harness.format_time(result.min):>10}   "
+              f"median {harness.format_time(result.median):>10}", flush=True)
+
+    results = harness.run(args.filter, args.repeat, report)
+
+    if args.output:
+        harness.save(results, args.output)
+    if args.compare:
+        regressions = harness.compare(results, harness.load(args.compare), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold}x the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
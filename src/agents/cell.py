@@ -1,13 +1,11 @@
-from enum import Enum
+from enum import IntEnum
 from typing import TYPE_CHECKING, Tuple
 
-import mesa
-
 if TYPE_CHECKING:
-    from src.simulation.simulation_model import SimulationModel
+    from src.models.environment.landscape import LandscapeState
 
 
-class FuelLevel(Enum):
+class FuelLevel(IntEnum):
     """Fuel levels for cell."""
     EMPTY = 0
     LOW = 1
@@ -15,37 +13,80 @@ class FuelLevel(Enum):
     HIGH = 3
 
 
-class Cell(mesa.Agent):
+class CellState(IntEnum):
+    """Fire state of a cell, as stored in the landscape state array."""
+    UNBURNT = 0
+    BURNING = 1
+    BURNT = 2
+    # No land at this position (e.g. the strip reserved for the bases)
+    VOID = 3
+
+
+class Cell:
     """Fixed location on the grid representing a portion of land.
 
-    Holds information about vegetation, terrain, and fire status.
+    Thin view onto one position of a LandscapeState, kept for API compatibility. The landscape
+    itself is stored as arrays, reading or writing an attribute reads or writes the arrays.
     """
-    def __init__(self, model: 'SimulationModel', is_road: bool = False):
+    __slots__ = ("landscape", "pos")
+
+    def __init__(self, landscape: 'LandscapeState', pos: Tuple[int, int]):
         """Cell.
 
         Args:
-            model: The model containing the agent
-        """
-        self.model: 'SimulationModel'
-        super().__init__(model)
-
-        # Use a weighted random selection
-        r = model.random.random()
-        if r < 0.01:
-            self.fuel_level = FuelLevel.EMPTY
-        elif r < 0.3:
-            self.fuel_level = FuelLevel.LOW
-        elif r < 0.70:
-            self.fuel_level = FuelLevel.MEDIUM
-        else:
-            self.fuel_level = FuelLevel.HIGH
-
-        self.on_fire = False
-        self.burnt = False
-        self.burn_counter = 0
-        self.is_road = is_road
-
-    def step(self):
-        """Step function for the cell agent.
+            landscape: The landscape state holding the cell data
+            pos: Position of the cell in the grid
         """
-        self.model.fire_model.calculate_fire_spread(self)
+        self.landscape = landscape
+        self.pos = pos
+
+    @property
+    def fuel_level(self) -> FuelLevel:
+        return FuelLevel(self.landscape.fuel[self.pos])
+
+    @fuel_level.setter
+    def fuel_level(self, value: FuelLevel):
+        self.landscape.fuel[self.pos] = value
+
+    @property
+    def on_fire(self) -> bool:
+        return self.landscape.state[self.pos] == CellState.BURNING
+
+    @on_fire.setter
+    def on_fire(self, value: bool):
+        if value:
+            self.landscape.state[self.pos] = CellState.BURNING
+        elif self.on_fire:
+            self.landscape.state[self.pos] = CellState.UNBURNT
+
+    @property
+    def burnt(self) -> bool:
+        return self.landscape.state[self.pos] == CellState.BURNT
+
+    @burnt.setter
+    def burnt(self, value: bool):
+        if value:
+            self.landscape.state[self.pos] = CellState.BURNT
+        elif self.burnt:
+            self.landscape.state[self.pos] = CellState.UNBURNT
+
+    @property
+    def burn_counter(self) -> int:
+        return int(self.landscape.burn_counter[self.pos])
+
+    @burn_counter.setter
+    def burn_counter(self, value: int):
+        self.landscape.burn_counter[self.pos] = value
+
+    @property
+    def is_road(self) -> bool:
+        return bool(self.landscape.road[self.pos])
+
+    def __eq__(self, other):
+        return isinstance(other, Cell) and other.landscape is self.landscape and other.pos == self.pos
+
+    def __hash__(self):
+        return hash(self.pos)
+
+    def __repr__(self):
+        return f"Cell at {self.pos}"
@@ -2,10 +2,11 @@
 Drone agent class.
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import mesa
 
+from src.models.swarm.state import COLOR_CODES, COLORS, UNSET
 from src.utils.logging_config import DroneLogger, get_logger
 
 if TYPE_CHECKING:
@@ -14,14 +15,35 @@ if TYPE_CHECKING:
 
 logger = get_logger()
 
+# Shared by all drones, the debug drone logs through the one that is on
+_QUIET_LOGGER = DroneLogger(logger)
+_DEBUG_LOGGER = DroneLogger(logger)
+_DEBUG_LOGGER.on = True
+
 
 class Drone(mesa.Agent):
     """
     Drone agent class.
 
-    Attributes:
+    The state of the drone is a row of the swarm state arrays of the model, model.swarm_state, and
+    the attributes below read and write that row.
 
+    Attributes:
+        index: Row of the drone in the swarm state
+        pos: Position on the grid, None until placed
+        target_pos: Position the drone moves towards, None until set
+        base_pos: Position of the base the drone was deployed from
+        color: Colour showing the current behaviour, one of COLORS
+        debug: Whether debug messages of the drone are logged
+        neighbours: Drones in communication range, from the last sense
+        same_cell_drones: Neighbours in the same cell, from the last sense
+        communication_range: Range of the swarm, held by the swarm state
+        desired_distance: Distance kept to the neighbours in formation, held by the swarm state
     """
+    # mesa.Agent has no __slots__, so drones still have a __dict__, which only holds the model and
+    # unique_id set by mesa
+    __slots__ = ('index', '_swarm', '_pos', '_profiler', 'neighbours', 'same_cell_drones')
+
     def __init__(self, model: 'SimulationModel', base_pos: tuple[int, int]):
         """
         Initialise the drone agent.
@@ -30,21 +52,79 @@ class Drone(mesa.Agent):
             model: The simulation model
             base_pos: The position of the base station the drone is deployed from
         """
+        # the row must exist before mesa.Agent sets the position
+        self._swarm = model.swarm_state
+        self.index = self._swarm.add(self)
         super().__init__(model)
         self.model: 'SimulationModel'
         self.base_pos = base_pos
-        self.communication_range = int(model.config.config.swarm.drone.communication_range)
-        self.desired_distance = int(self.communication_range * 0.9)
-        self.target_pos: tuple[int, int] = None
+        # Times the phases of the drone when the model profiles its steps
+        self._profiler = model.profiler
 
         # initialise neighbours
         self.neighbours = self.get_drones_in_range()
         self.same_cell_drones = []
 
-        self.debug = False
-        self.drone_logger = DroneLogger(logger)
+    @property
+    def communication_range(self) -> int:
+        return self._swarm.communication_range
+
+    @property
+    def desired_distance(self) -> int:
+        return self._swarm.desired_distance
+
+    @property
+    def pos(self) -> Optional[tuple[int, int]]:
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos: Optional[tuple[int, int]]) -> None:
+        # the tuple is kept as well, the grid and the behaviour read it on every move
+        self._pos = pos
+        self._swarm._positions[self.index] = (UNSET, UNSET) if pos is None else pos
+
+    @property
+    def target_pos(self) -> Optional[tuple[int, int]]:
+        x, y = self._swarm._targets[self.index].tolist()
+        return None if x == UNSET else (x, y)
+
+    @target_pos.setter
+    def target_pos(self, target: Optional[tuple[int, int]]) -> None:
+        self._swarm._targets[self.index] = (UNSET, UNSET) if target is None else target
+
+    @property
+    def base_pos(self) -> tuple[int, int]:
+        x, y = self._swarm._base_positions[self.index].tolist()
+        return None if x == UNSET else (x, y)
+
+    @base_pos.setter
+    def base_pos(self, base_pos: tuple[int, int]) -> None:
+        self._swarm._base_positions[self.index] = (UNSET, UNSET) if base_pos is None else base_pos
+
+    @property
+    def color(self) -> str:
+        return COLORS[self._swarm._colors[self.index]]
+
+    @color.setter
+    def color(self, color: str) -> None:
+        self._swarm._colors[self.index] = COLOR_CODES[color]
 
-        self.color = 'blue'
+    @property
+    def debug(self) -> bool:
+        return bool(self._swarm._debug[self.index])
+
+    @debug.setter
+    def debug(self, debug: bool) -> None:
+        self._swarm._debug[self.index] = debug
+
+    @property
+    def drone_logger(self) -> DroneLogger:
+        return _DEBUG_LOGGER if self._swarm._debug[self.index] else _QUIET_LOGGER
+
+    def remove(self) -> None:
+        """Remove the drone from the model and its row from the swarm state."""
+        super().remove()
+        self._swarm.remove(self)
 
     def set_up(self) -> None:
         """
@@ -55,18 +135,36 @@ class Drone(mesa.Agent):
         self.neighbours = self.get_drones_in_range()
         self.target_pos = (self.pos[0], self.pos[1])
 
-        if self.debug:
-            self.drone_logger.on = True
-
     def step(self) -> None:
         """
+        Sense, decide and move in one go, when the drones are stepped sequentially.
         """
-        # monitor
-        self.neighbours = self.get_drones_in_range()
+        self.sense()
+        self.decide()
+        self.advance()
+
+    def sense(self) -> None:
+        """
+        Update the neighbours and the same_cell_drones from the swarm neighbourhood.
+        """
+        with self._profiler.phase("neighbours"):
+            neighbourhood = self.model.neighbourhood
+            self.neighbours = neighbourhood.neighbours(self)
+            self.same_cell_drones = neighbourhood.same_cell(self)
 
-        self.disperse()
+    def decide(self) -> None:
+        """
+        Choose the target position.
+        """
+        with self._profiler.phase("formation"):
+            self.disperse()
 
-        self.move_towards(self.target_pos)
+    def advance(self) -> None:
+        """
+        Move towards the target position.
+        """
+        with self._profiler.phase("movement"):
+            self.move_towards(self.target_pos)
 
     def get_drones_in_range(self) -> list['Drone']:
         """
@@ -77,10 +175,7 @@ class Drone(mesa.Agent):
         """
         if not self.pos:
             return []
-        neighbours = self.model.grid.get_neighbors(
-            pos=self.pos, moore=True, include_center=True, radius=self.communication_range
-        )
-        drones = [drone for drone in neighbours if isinstance(drone, Drone) and drone != self]
+        drones = self.model.grid.get_agents_in_range(self.pos, self.communication_range, Drone, exclude=self)
         self.same_cell_drones = [drone for drone in drones if drone.pos == self.pos]
         return drones
 
@@ -137,15 +232,16 @@ class Drone(mesa.Agent):
         elif y > dy:
             y -= 1
 
-        self.drone_logger.debug(f"Moving towards {target}, at {x, y}")
-        self.model.grid.move_agent(self, (x, y))
+        self.drone_logger.debug("Moving towards {}, at {}", target, (x, y))
+        with self._profiler.phase("grid_move"):
+            self.model.grid.move_agent(self, (x, y))
 
     def get_random_direction(self, including_center: bool) -> tuple[int, int]:
         """
         Get a random neighbouring cell in the grid.
         """
         cells = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=including_center)
-        return self.random.choice(cells)
+        return cells[self.model.streams.swarm.integers(len(cells))]
 
     def disperse(self):
         """
@@ -196,8 +292,7 @@ class Drone(mesa.Agent):
             return
 
         # Find the closest neighbor
-        closest_neighbour = min(self.neighbours, key=lambda n: self.chebyshev_distance(n.pos))
-        current_distance = self.chebyshev_distance(closest_neighbour.pos)
+        closest_neighbour, current_distance = self.model.neighbourhood.nearest(self)
         dx = self.get_dx(closest_neighbour)
         dy = self.get_dy(closest_neighbour)
         axis_to_align = 'x' if dx < dy else 'y'
@@ -268,8 +363,7 @@ class Drone(mesa.Agent):
             return
 
         # Find the closest neighbor
-        closest_neighbour = min(self.neighbours, key=lambda n: self.chebyshev_distance(n.pos))
-        current_distance = self.chebyshev_distance(closest_neighbour.pos)
+        closest_neighbour, current_distance = self.model.neighbourhood.nearest(self)
 
         # Stay in place if already at desired distance
         if current_distance == self.desired_distance:
@@ -142,10 +142,7 @@ class Drone(mesa.Agent):
         """
         if not self.pos:
             return []
-        neighbours = self.model.grid.get_neighbors(
-            pos=self.pos, moore=True, include_center=True, radius=self.communication_range
-        )
-        drones = [drone for drone in neighbours if isinstance(drone, Drone) and drone != self]
+        drones = self.model.grid.get_agents_in_range(self.pos, self.communication_range, Drone, exclude=self)
         self.same_cell_drones = [drone for drone in drones if drone.pos == self.pos]
         return drones
 
@@ -322,7 +319,7 @@ class Drone(mesa.Agent):
         elif y > dy:
             y -= 1
 
-        self.drone_logger.debug(f"Moving towards {target}, at {x, y}")
+        self.drone_logger.debug("Moving towards {}, at {}", target, (x, y))
         self.model.grid.move_agent(self, (x, y))
 
     def get_random_direction(self, including_center: bool) -> tuple[int, int]:
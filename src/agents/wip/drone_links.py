@@ -116,7 +116,7 @@ class Drone(mesa.Agent):
 
         self.update_linked_leaders()
 
-        self.drone_logger.debug(f"{self.unique_id}. Links formed: {self.neighbouring_leaders}")
+        self.drone_logger.debug("{}. Links formed: {}", self.unique_id, self.neighbouring_leaders)
 
     def step(self) -> None:
         """
@@ -143,10 +143,7 @@ class Drone(mesa.Agent):
         """
         if not self.pos:
             return []
-        neighbours = self.model.grid.get_neighbors(
-            pos=self.pos, moore=True, include_center=True, radius=self.communication_range
-        )
-        drones = [drone for drone in neighbours if isinstance(drone, Drone) and drone != self]
+        drones = self.model.grid.get_agents_in_range(self.pos, self.communication_range, Drone, exclude=self)
         self.same_cell_drones = [drone for drone in drones if drone.pos == self.pos]
         return drones
 
@@ -316,7 +313,7 @@ class Drone(mesa.Agent):
         elif y > dy:
             y -= 1
 
-        self.drone_logger.debug(f"Moving towards {target}, at {x, y}")
+        self.drone_logger.debug("Moving towards {}, at {}", target, (x, y))
         self.model.grid.move_agent(self, (x, y))
 
     def get_random_direction(self):
@@ -364,7 +361,7 @@ class Drone(mesa.Agent):
                 self.target_pos[1] - dy  # Correct y-axis to maintain alignment
             ))
 
-            self.drone_logger.debug(f"Adjusting position for right leader: error={distance_error}")
+            self.drone_logger.debug("Adjusting position for right leader: error={}", distance_error)
 
         if self.neighbouring_leaders.left:
             left_leader = self.neighbouring_leaders.left
@@ -387,7 +384,7 @@ class Drone(mesa.Agent):
                 self.target_pos[1] - dy  # Correct y-axis to maintain alignment
             ))
 
-            self.drone_logger.debug(f"Adjusting position for left leader: error={distance_error}")
+            self.drone_logger.debug("Adjusting position for left leader: error={}", distance_error)
 
         if self.neighbouring_leaders.top:
             top_leader = self.neighbouring_leaders.top
@@ -410,7 +407,7 @@ class Drone(mesa.Agent):
                 self.target_pos[1] + distance_error
             ))
 
-            self.drone_logger.debug(f"Adjusting position for top leader: error={distance_error}")
+            self.drone_logger.debug("Adjusting position for top leader: error={}", distance_error)
 
         if self.neighbouring_leaders.bottom:
             bottom_leader = self.neighbouring_leaders.bottom
@@ -433,7 +430,7 @@ class Drone(mesa.Agent):
                 self.target_pos[1] - distance_error
             ))
 
-            self.drone_logger.debug(f"Adjusting position for bottom leader: error={distance_error}")
+            self.drone_logger.debug("Adjusting position for bottom leader: error={}", distance_error)
 
     def __repr__(self):
         return f"Drone {self.unique_id}, at {self.pos}"
@@ -2,13 +2,15 @@ import argparse
 import os
 import subprocess
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.simulation.batch import SWEEP_PARAMETERS, parse_values, run_sweep
 from src.simulation.simulation_model import SimulationModel
-from src.utils.config import Config
+from src.utils.config import Config, ConfigError
 
 
 def main():
@@ -22,14 +24,40 @@ def main():
                         help='Run with visualisation')
 
     parser.add_argument('--output-gif', '-o', type=str, default=None,
-                        help='Save visualization as GIF')
+                        help='Record the run to this file, a .gif or a video format written by ffmpeg')
+
+    parser.add_argument('--frame-every', type=int, default=None,
+                        help='Steps between recorded frames')
+
+    parser.add_argument('--downscale', type=int, default=None,
+                        help='Keep every n-th cell along each axis of the recorded frames')
 
     parser.add_argument('--dev', '-d', action='store_true',
                         help='Run in development mode with auto-reload')
 
+    parser.add_argument('--profile', '-p', action='store_true',
+                        help='Time the phases of each step and write a trace at the end of the run')
+
+    subparsers = parser.add_subparsers(dest='command')
+    sweep_parser = subparsers.add_parser('sweep', help='Run headless parameter sweeps')
+    sweep_parser.add_argument('--config', '-c', type=str, default=None,
+                              help='Path to the base configuration file')
+    for name, path in SWEEP_PARAMETERS.items():
+        sweep_parser.add_argument(f'--{name}', type=parse_values, default=None, metavar='VALUES',
+                                  help=f'Values of {path}, e.g. 1,2,4 or 0-99')
+    sweep_parser.add_argument('--set', '-s', action='append', default=[], metavar='KEY=VALUES',
+                              help='Values of any config value, e.g. fire.model=simple,vectorised')
+    sweep_parser.add_argument('--workers', '-j', type=int, default=None,
+                              help='Number of worker processes (default: number of CPUs)')
+    sweep_parser.add_argument('--output', '-o', type=str, default=None,
+                              help='JSON lines file for the run summaries '
+                                   '(default: a new file in simulation.save_location)')
+
     args = parser.parse_args()
 
-    if args.visualise:
+    if args.command == 'sweep':
+        sys.exit(sweep(sweep_parser, args))
+    elif args.visualise:
         command = ["solara", "run"]
         command.append("src/visualisation/solara/solara_app.py")
 
@@ -39,6 +67,9 @@ def main():
             env["WILDFIRE_CONFIG"] = args.config
         if args.output_gif:
             env["WILDFIRE_OUTPUT_GIF"] = args.output_gif
+        for name, value in (("WILDFIRE_FRAME_EVERY", args.frame_every), ("WILDFIRE_DOWNSCALE", args.downscale)):
+            if value is not None:
+                env[name] = str(value)
 
         if args.dev:
             # Run with file watcher in development mode
@@ -52,10 +83,48 @@ def main():
             # Run normally
             subprocess.run(command, env=env)
     else:
-        config = Config(args.config)
+        config = Config(args.config).with_overrides(recording_overrides(args))
+        if args.profile:
+            config = config.with_overrides({'simulation.profile': True})
         model = SimulationModel(config)
         model.run()
 
 
+def recording_overrides(args: argparse.Namespace) -> dict:
+    """Config overrides recording the run, from the --output-gif, --frame-every and --downscale options."""
+    overrides = {}
+    if args.output_gif:
+        overrides['simulation.video_path'] = args.output_gif
+    if args.frame_every is not None:
+        overrides['simulation.video_every'] = args.frame_every
+    if args.downscale is not None:
+        overrides['simulation.video_downscale'] = args.downscale
+    return overrides
+
+
+def sweep(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Run the sweep subcommand, returning the exit code."""
+    grid = {}
+    for name, path in SWEEP_PARAMETERS.items():
+        if getattr(args, name) is not None:
+            grid[path] = getattr(args, name)
+    for item in args.set:
+        key, sep, values = item.partition('=')
+        if not sep or not key:
+            parser.error(f"--set expects KEY=VALUES, got '{item}'")
+        grid[key.strip()] = parse_values(values)
+
+    output = args.output
+    if output is None:
+        save_location = Config(args.config).get("simulation.save_location", ".")
+        output = Path(save_location).expanduser() / f"sweep_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+
+    try:
+        failed = run_sweep(args.config, grid, str(output), workers=args.workers)
+    except ConfigError as e:
+        parser.error(str(e))
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
     main()
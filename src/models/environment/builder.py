@@ -0,0 +1,170 @@
+"""
+Landscape construction.
+
+The fuel layer is either drawn at random or read from a raster file, and the roads come from a
+mask layer, read from a raster file or laid along the middle of each axis. Everything is built with
+whole-array operations, so the cost grows with the number of cells but stays small even for
+millions of them.
+
+Raster files are read in map orientation: the first row is the northern edge (largest y) and the
+first column the western edge (x = 0). Supported formats are NumPy .npy arrays, ESRI ASCII grids
+(.asc) and single band GeoTIFFs (.tif, .tiff), read with Pillow. Cells holding the nodata value of
+an ASCII grid or GeoTIFF have no land.
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.environment.landscape import LandscapeState
+
+if TYPE_CHECKING:
+    from src.utils.config import Config
+
+# GeoTIFF tag written by GDAL with the nodata value, as text
+GDAL_NODATA_TAG = 42113
+
+
+def _read_npy(path: Path) -> Tuple[np.ndarray, Optional[float]]:
+    # memory-mapped, large maps are only read where they are used
+    return np.load(path, mmap_mode='r'), None
+
+
+def _read_ascii_grid(path: Path) -> Tuple[np.ndarray, Optional[float]]:
+    header = {}
+    with open(path) as file:
+        while True:
+            position = file.tell()
+            line = file.readline()
+            key, _, value = line.strip().partition(' ')
+            if not key or not key[0].isalpha():
+                file.seek(position)
+                break
+            header[key.lower()] = value.strip()
+        values = np.array(file.read().split(), dtype=np.float64)
+    try:
+        rows, columns = int(header['nrows']), int(header['ncols'])
+    except KeyError as e:
+        raise ValueError(f"{path} is missing the {e.args[0]} header of an ASCII grid") from None
+    if values.size != rows * columns:
+        raise ValueError(f"{path} holds {values.size} values, expected {rows}x{columns}")
+    nodata = float(header['nodata_value']) if 'nodata_value' in header else None
+    return values.reshape(rows, columns), nodata
+
+
+def _read_geotiff(path: Path) -> Tuple[np.ndarray, Optional[float]]:
+    # imported here, only needed for GeoTIFFs
+    from PIL import Image
+
+    with Image.open(path) as image:
+        nodata = image.tag_v2.get(GDAL_NODATA_TAG) if hasattr(image, 'tag_v2') else None
+        values = np.array(image)
+    if values.ndim != 2:
+        raise ValueError(f"{path} has {values.shape[2]} bands, expected a single band")
+    if isinstance(nodata, bytes):
+        nodata = nodata.decode()
+    return values, float(str(nodata).strip('\x00 ')) if nodata is not None else None
+
+
+RASTER_READERS = {
+    '.npy': _read_npy,
+    '.asc': _read_ascii_grid,
+    '.tif': _read_geotiff,
+    '.tiff': _read_geotiff,
+}
+
+
+def read_raster(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read a single band raster file into the grid layout.
+
+    Args:
+        path: .npy, .asc, .tif or .tiff file
+
+    Returns:
+        The values as an array of shape (width, height) indexed [x, y], and the mask of the cells
+        holding the nodata value
+    """
+    path = Path(path).expanduser()
+    reader = RASTER_READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported raster format '{path.suffix}', expected one of {', '.join(RASTER_READERS)}")
+    values, nodata = reader(path)
+    if values.ndim != 2:
+        raise ValueError(f"{path} holds a {values.ndim}D array, expected 2D")
+    missing = np.zeros(values.shape, dtype=bool) if nodata is None else values == nodata
+    # map rows run north to south, the grid y axis points north
+    return np.flipud(values).T, np.flipud(missing).T
+
+
+class LandscapeBuilder:
+    """
+    Build a LandscapeState: fuel, no-land cells and road mask.
+
+    When a fuel raster is given, the landscape takes its size.
+    """
+    def __init__(self, width: int, height: int, fuel_path: Optional[str] = None,
+                 road_path: Optional[str] = None, void_rows: int = 5):
+        """
+        Args:
+            width: Width of the landscape, unless read from the fuel raster
+            height: Height of the landscape, unless read from the fuel raster
+            fuel_path: Raster file with the FuelLevel of every cell, fuel is drawn at random if None
+            road_path: Raster file with the roads as nonzero cells, roads along the middle of each
+                axis if None
+            void_rows: Rows at the bottom of the landscape with no land, reserved for the bases
+        """
+        self.fuel: Optional[np.ndarray] = None
+        self.no_land: Optional[np.ndarray] = None
+        if fuel_path:
+            fuel, self.no_land = read_raster(fuel_path)
+            land = fuel[~self.no_land]
+            if land.size and (land.min() < 0 or land.max() >= len(FuelLevel) or np.any(land != np.round(land))):
+                raise ValueError(f"Fuel levels in {fuel_path} must be integers from 0 to {len(FuelLevel) - 1}")
+            self.fuel = np.where(self.no_land, 0, fuel).astype(np.uint8)
+            width, height = self.fuel.shape
+
+        self.width = width
+        self.height = height
+        self.road_path = road_path
+        self.void_rows = void_rows
+
+    @classmethod
+    def from_config(cls, config: 'Config') -> 'LandscapeBuilder':
+        """Builder for the landscape section of a config, sized by simulation.area_size."""
+        return cls(width=config.get("simulation._width", 100),
+                   height=config.get("simulation._height", 100),
+                   fuel_path=config.get("landscape.fuel_path", None),
+                   road_path=config.get("landscape.road_path", None),
+                   void_rows=config.get("landscape.void_rows", 5))
+
+    def build(self, rng: np.random.Generator) -> LandscapeState:
+        """
+        Build the landscape.
+
+        Args:
+            rng: Generator to draw the fuel from when it is not read from a file
+        """
+        landscape = LandscapeState(self.width, self.height)
+        if self.fuel is None:
+            landscape.randomise_fuel(rng)
+        else:
+            landscape.fuel[...] = self.fuel
+            landscape.state[self.no_land] = CellState.VOID
+
+        # no land in the strip reserved for the bases
+        landscape.state[:, :self.void_rows] = CellState.VOID
+
+        if self.road_path:
+            roads, missing = read_raster(self.road_path)
+            if roads.shape != landscape.road.shape:
+                raise ValueError(f"The road mask in {self.road_path} is {roads.shape[0]}x{roads.shape[1]}, "
+                                 f"the landscape is {self.width}x{self.height}")
+            landscape.road[...] = (roads != 0) & ~missing
+        else:
+            # roads along the middle of each axis
+            landscape.road[:, self.height // 2] = True
+            landscape.road[self.width // 2, :] = True
+        landscape.road[:, :self.void_rows] = False
+        return landscape
@@ -1,14 +1,23 @@
-from typing import TYPE_CHECKING
+import itertools
+from typing import (TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple,
+                    Type)
 
 import mesa
 
-from src.agents.cell import Cell
+from src.models.environment.builder import LandscapeBuilder
+from src.models.environment.landscape import LandscapeState
+from src.models.environment.neighbourhood_table import (NeighbourhoodTables,
+                                                        hex_offsets,
+                                                        square_offsets)
+from src.models.environment.spatial_index import SpatialHash
+from src.models.environment.terrain import Terrain
+from src.models.environment.wind import WindField
 
 if TYPE_CHECKING:
     from src.simulation.simulation_model import SimulationModel
 
 
-class HexEnvironment(mesa.space.HexMultiGrid):
+class HexEnvironment(NeighbourhoodTables, mesa.space.HexMultiGrid):
     def __init__(self, model: 'SimulationModel', width: int, height: int):
         """ Environment class for wildfire simulation.
 
@@ -16,42 +25,172 @@ class HexEnvironment(mesa.space.HexMultiGrid):
         """
         super().__init__(width=width, height=height, torus=False)
         self.model = model
+        self._neighbourhood_tables = {}
 
         # create cells
         # TODO: use config to determine size
-        for x in range(width):
-            for y in range(height):
-                cell = Cell(model)
-                self.place_agent(cell, (x, y))
+        self.landscape = LandscapeState(width, height)
+        self.landscape.randomise_fuel(model.streams.terrain)
+        self.wind = WindField(width, height)
+        self.terrain = Terrain(width, height)
 
     def get_neighbors(self, pos, moore: bool = True, radius: float = 1, include_center: bool = True):
-        return super().get_neighbors(pos, radius, include_center)
+        return super().get_neighbors(pos, include_center=include_center, radius=radius)
 
     def get_neighborhood(self, pos, moore: bool = True, radius: float = 1, include_center: bool = True):
-        return super().get_neighborhood(pos, radius, include_center)
+        return super().get_neighborhood(pos, include_center=include_center, radius=radius)
 
+    def offset_patterns(self, radius: int, moore: bool, include_center: bool):
+        return hex_offsets(radius, include_center)
 
-class GridEnvironment(mesa.space.MultiGrid):
-    def __init__(self, model: 'SimulationModel', width: int, height: int):
+
+class GridEnvironment(NeighbourhoodTables):
+    def __init__(self, model: 'SimulationModel', width: int, height: int, bucket_size: int = 10,
+                 landscape: Optional[LandscapeState] = None, wind: Optional[WindField] = None,
+                 terrain: Optional[Terrain] = None):
         """ Environment class for wildfire simulation.
 
         A 2D grid where each cell represents a portion of land that can be in un-burnt,
         burning or burnt and has specific vegetation and terrain properties.
+        The cells are stored in a LandscapeState, only the drones and bases are placed on the grid.
+        The grid has the interface of mesa.space.MultiGrid, without a torus, but keeps the contents
+        of the occupied cells only, so building it does not allocate a list per cell. Agents placed
+        on the grid are also kept in a spatial hash per agent type, so range queries between drones
+        do not walk every grid square in range.
+
+        Args:
+            bucket_size: Bucket size of the spatial hash, best set to the drone communication range
+            landscape: Landscape of the grid, of the same size, a random landscape is built if None
+            wind: Wind over the grid, of the same size, no wind if None
+            terrain: Elevation of the grid, of the same size, flat if None
         """
-        super().__init__(width=width, height=height, torus=False)
-        self.model = model
+        self.width = width
+        self.height = height
+        self.torus = False
+        # Agents in each occupied cell, empty cells have no entry
+        self._cells: Dict[Tuple[int, int], List[mesa.Agent]] = {}
 
-        # create cells
-        for x in range(width):
-            for y in range(height):
-                if y < 5:
-                    continue
-                if (height // 2 - 1 < y < height // 2 + 1) or (width // 2 - 1 < x < width // 2 + 1):
-                    cell = Cell(model, is_road=True)
-                    self.place_agent(cell, (x, y))
-                    continue
-                cell = Cell(model)
-                self.place_agent(cell, (x, y))
+        self.model = model
+        self.bucket_size = bucket_size
+        self._indexes: Dict[Type[mesa.Agent], SpatialHash] = {}
+        self._neighbourhood_tables = {}
+
+        if landscape is None:
+            landscape = LandscapeBuilder(width, height).build(model.streams.terrain)
+        elif (landscape.width, landscape.height) != (width, height):
+            raise ValueError(f"The landscape is {landscape.width}x{landscape.height}, the grid {width}x{height}")
+        self.landscape = landscape
+
+        if wind is None:
+            wind = WindField(width, height)
+        elif (wind.width, wind.height) != (width, height):
+            raise ValueError(f"The wind field is {wind.width}x{wind.height}, the grid {width}x{height}")
+        self.wind = wind
+
+        if terrain is None:
+            terrain = Terrain(width, height)
+        elif (terrain.width, terrain.height) != (width, height):
+            raise ValueError(f"The terrain is {terrain.width}x{terrain.height}, the grid {width}x{height}")
+        self.terrain = terrain
+
+    def offset_patterns(self, radius: int, moore: bool, include_center: bool):
+        return square_offsets(radius, moore, include_center)
+
+    def _index(self, agent_type: Type[mesa.Agent]) -> SpatialHash:
+        index = self._indexes.get(agent_type)
+        if index is None:
+            index = self._indexes[agent_type] = SpatialHash(self.bucket_size)
+        return index
+
+    def out_of_bounds(self, pos: Tuple[int, int]) -> bool:
+        x, y = pos
+        return x < 0 or x >= self.width or y < 0 or y >= self.height
+
+    def place_agent(self, agent: mesa.Agent, pos: Tuple[int, int]) -> None:
+        if self.out_of_bounds(pos):
+            raise ValueError(f"Position {pos} is outside the {self.width}x{self.height} grid")
+        pos = tuple(pos)
+        contents = self._cells.setdefault(pos, [])
+        if agent not in contents:
+            contents.append(agent)
+        agent.pos = pos
+        self._index(type(agent)).add(agent, pos)
+
+    def remove_agent(self, agent: mesa.Agent) -> None:
+        self._leave_cell(agent)
+        agent.pos = None
+        self._index(type(agent)).remove(agent)
+
+    def move_agent(self, agent: mesa.Agent, pos: Tuple[int, int]) -> None:
+        if self.out_of_bounds(pos):
+            raise ValueError(f"Position {pos} is outside the {self.width}x{self.height} grid")
+        pos = tuple(pos)
+        self._leave_cell(agent)
+        self._cells.setdefault(pos, []).append(agent)
+        agent.pos = pos
+        self._index(type(agent)).move(agent, pos)
+
+    def _leave_cell(self, agent: mesa.Agent) -> None:
+        contents = self._cells[agent.pos]
+        contents.remove(agent)
+        if not contents:
+            del self._cells[agent.pos]
+
+    def is_cell_empty(self, pos: Tuple[int, int]) -> bool:
+        return tuple(pos) not in self._cells
+
+    @property
+    def empties(self) -> Set[Tuple[int, int]]:
+        """Positions of the cells holding no agent."""
+        return {(x, y) for x in range(self.width) for y in range(self.height)} - self._cells.keys()
+
+    def coord_iter(self) -> Iterator[Tuple[List[mesa.Agent], Tuple[int, int]]]:
+        """Contents and position of every cell, column by column."""
+        for x in range(self.width):
+            for y in range(self.height):
+                yield self._cells.get((x, y), []), (x, y)
+
+    def iter_cell_list_contents(self, cell_list) -> Iterator[mesa.Agent]:
+        if len(cell_list) == 2 and not isinstance(cell_list[0], tuple):
+            cell_list = [cell_list]
+        cells = self._cells
+        return itertools.chain.from_iterable(cells[pos] for pos in map(tuple, cell_list) if pos in cells)
+
+    def get_cell_list_contents(self, cell_list) -> List[mesa.Agent]:
+        return list(self.iter_cell_list_contents(cell_list))
+
+    def get_neighborhood(self, pos: Tuple[int, int], moore: bool, include_center: bool = False,
+                         radius: int = 1) -> List[Tuple[int, int]]:
+        return self.neighbourhood_table(radius, moore, include_center).positions(pos)
+
+    def iter_neighbors(self, pos: Tuple[int, int], moore: bool, include_center: bool = False,
+                       radius: int = 1) -> Iterator[mesa.Agent]:
+        return self.iter_cell_list_contents(self.get_neighborhood(pos, moore, include_center, radius))
+
+    def get_neighbors(self, pos: Tuple[int, int], moore: bool, include_center: bool = False,
+                      radius: int = 1) -> List[mesa.Agent]:
+        return list(self.iter_neighbors(pos, moore, include_center, radius))
+
+    def get_agents_in_range(self, pos: Tuple[int, int], radius: int, agent_type: Type[mesa.Agent],
+                            exclude: Optional[mesa.Agent] = None) -> List[mesa.Agent]:
+        """
+        Get the agents of a type within a Chebyshev distance of a position, including the centre.
+
+        Same result as get_neighbors with moore=True and include_center=True filtered by type, but
+        answered from the spatial hash.
+
+        Args:
+            pos: Centre of the query
+            radius: Chebyshev radius
+            agent_type: Exact type of the agents to return
+            exclude: Optional agent to leave out of the result, usually the one making the query
+        Returns:
+            The agents in range, ordered by position
+        """
+        index = self._indexes.get(agent_type)
+        if index is None:
+            return []
+        return index.query(pos, radius, exclude=exclude)
 
 
 class SpaceEnvironment(mesa.space.ContinuousSpace):
@@ -63,13 +202,13 @@ class SpaceEnvironment(mesa.space.ContinuousSpace):
         self.model = model
 
         # create cells
-        for x in range(width):
-            for y in range(height):
-                cell = Cell(model)
-                self.place_agent(cell, (x, y))
+        self.landscape = LandscapeState(width, height)
+        self.landscape.randomise_fuel(model.streams.terrain)
+        self.wind = WindField(width, height)
+        self.terrain = Terrain(width, height)
 
     def get_neighbors(self, pos, moore: bool = True, radius: float = 1, include_center: bool = True):
-        return super().get_neighbors(pos, radius, include_center)
+        return super().get_neighbors(pos, include_center=include_center, radius=radius)
 
     def get_neighborhood(pos, moore=True, include_center=False, radius=1):
         """Get a pos 1 away from the current position."""
@@ -0,0 +1,97 @@
+"""
+Array-backed landscape state.
+
+The landscape is stored as contiguous NumPy arrays indexed by grid position ``[x, y]``, so the fire
+models, the drones and the visualisation can read a whole layer at once instead of going through one
+agent per cell.
+"""
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from src.agents.cell import Cell, CellState
+
+
+class LandscapeState:
+    """
+    Per-cell landscape state stored as arrays of shape (width, height).
+
+    Attributes:
+        fuel: uint8 array of FuelLevel values
+        state: uint8 array of CellState values
+        burn_counter: uint8 array with the number of steps each cell has been burning
+        road: bool mask of the road cells
+    """
+    # Upper bounds of the uniform draw for each fuel level, in FuelLevel order
+    FUEL_THRESHOLDS = (0.01, 0.3, 0.70)
+
+    def __init__(self, width: int, height: int):
+        """
+        Create an empty landscape, every cell unburnt with no fuel.
+
+        Args:
+            width: Width of the grid
+            height: Height of the grid
+        """
+        self.width = width
+        self.height = height
+
+        shape = (width, height)
+        self.fuel = np.zeros(shape, dtype=np.uint8)
+        self.state = np.full(shape, CellState.UNBURNT, dtype=np.uint8)
+        self.burn_counter = np.zeros(shape, dtype=np.uint8)
+        self.road = np.zeros(shape, dtype=bool)
+
+    def randomise_fuel(self, rng: np.random.Generator) -> None:
+        """
+        Assign a weighted random fuel level to every cell.
+
+        Args:
+            rng: The random generator to draw from
+        """
+        r = rng.random(self.fuel.shape)
+        self.fuel[...] = np.searchsorted(self.FUEL_THRESHOLDS, r, side='right')
+
+    @property
+    def land(self) -> np.ndarray:
+        """Mask of the positions holding a land cell."""
+        return self.state != CellState.VOID
+
+    @property
+    def on_fire(self) -> np.ndarray:
+        """Mask of the burning cells."""
+        return self.state == CellState.BURNING
+
+    @property
+    def burnt(self) -> np.ndarray:
+        """Mask of the burnt cells."""
+        return self.state == CellState.BURNT
+
+    def count(self, state: CellState) -> int:
+        """Number of cells in the given state."""
+        return int(np.count_nonzero(self.state == state))
+
+    def positions(self, mask: np.ndarray) -> list[Tuple[int, int]]:
+        """Grid positions where the mask is set, in x-major order."""
+        return [(int(x), int(y)) for x, y in np.argwhere(mask)]
+
+    def has_cell(self, pos: Tuple[int, int]) -> bool:
+        """Check if there is a land cell at the given position."""
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height and self.state[x, y] != CellState.VOID
+
+    def cell(self, pos: Tuple[int, int]) -> Cell:
+        """Get a Cell view of the given position."""
+        return Cell(self, pos)
+
+    def __iter__(self) -> Iterator[Cell]:
+        """Iterate over the land cells as Cell views."""
+        return (Cell(self, pos) for pos in self.positions(self.land))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.land))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the state arrays."""
+        return self.fuel.nbytes + self.state.nbytes + self.burn_counter.nbytes + self.road.nbytes
@@ -0,0 +1,167 @@
+"""
+Precomputed neighbourhood tables.
+
+A neighbourhood shape is stored once as flat index offsets, so finding the neighbours of a
+position is an addition of the position index to the offsets rather than building coordinates on
+every call. Environments provide the offset patterns of their grid and cache one table per
+(radius, moore, include_center).
+"""
+import abc
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class NeighbourhoodTable:
+    """
+    Neighbourhood of every position of a grid, for one neighbourhood shape.
+
+    Positions are flat indices x * height + y, the layout of the landscape arrays. The offsets may
+    differ with the parity of x, as on hexagonal grids, so one pattern is kept per parity class.
+    For positions at least radius away from the edges the neighbours are the position index plus
+    the offsets, positions near the edges leave out the offsets falling outside the grid. The
+    neighbours keep the order of the offset patterns.
+    """
+    def __init__(self, width: int, height: int, patterns: Sequence[Sequence[Tuple[int, int]]]):
+        """
+        Args:
+            width: Width of the grid
+            height: Height of the grid
+            patterns: (dx, dy) offsets for positions with x % len(patterns) == 0, 1, ...
+        """
+        self.width = width
+        self.height = height
+        self.dx = [np.array([dx for dx, _ in pattern], dtype=np.int64) for pattern in patterns]
+        self.dy = [np.array([dy for _, dy in pattern], dtype=np.int64) for pattern in patterns]
+        self.offsets = [dx * height + dy for dx, dy in zip(self.dx, self.dy)]
+        self.radius = max((int(np.abs(np.concatenate([dx, dy])).max()) for dx, dy in zip(self.dx, self.dy)
+                           if dx.size), default=0)
+
+    def _interior(self, x: int, y: int) -> bool:
+        r = self.radius
+        return r <= x < self.width - r and r <= y < self.height - r
+
+    def indices(self, pos: Tuple[int, int]) -> np.ndarray:
+        """
+        Flat indices of the neighbours of a position.
+
+        Args:
+            pos: (x, y) position
+
+        Returns:
+            The flat indices, in the order of the offset pattern
+        """
+        x, y = pos
+        k = x % len(self.offsets)
+        index = x * self.height + y
+        if self._interior(x, y):
+            return index + self.offsets[k]
+        nx = x + self.dx[k]
+        ny = y + self.dy[k]
+        inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+        return index + self.offsets[k][inside]
+
+    def positions(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Neighbouring positions of a position, as (x, y) tuples."""
+        x, y = np.divmod(self.indices(pos), self.height)
+        return list(zip(x.tolist(), y.tolist()))
+
+    def neighbours(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Neighbours of many positions at once.
+
+        Args:
+            cells: Flat indices of the positions
+
+        Returns:
+            Flat indices of the neighbours and, for each of them, the index of its source in cells,
+            grouped by source in the order of cells
+        """
+        cells = np.asarray(cells, dtype=np.int64)
+        if len(self.offsets) == 1:
+            return self._neighbours(cells, 0)
+
+        # one pass per parity class, then restore the order of the sources
+        x = cells // self.height
+        targets, sources = [], []
+        for k in range(len(self.offsets)):
+            members = np.flatnonzero(x % len(self.offsets) == k)
+            t, s = self._neighbours(cells[members], k)
+            targets.append(t)
+            sources.append(members[s])
+        targets, sources = np.concatenate(targets), np.concatenate(sources)
+        order = np.argsort(sources, kind='stable')
+        return targets[order], sources[order]
+
+    def _neighbours(self, cells: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        x, y = np.divmod(cells, self.height)
+        nx = x[:, None] + self.dx[k]
+        ny = y[:, None] + self.dy[k]
+        inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+        targets = (cells[:, None] + self.offsets[k])[inside]
+        sources = np.broadcast_to(np.arange(cells.size)[:, None], nx.shape)[inside]
+        return targets, sources
+
+
+class NeighbourhoodTables(abc.ABC):
+    """
+    Mixin for environments caching a NeighbourhoodTable per neighbourhood shape.
+
+    Environments implement offset_patterns with the neighbourhood shape of their grid and set
+    _neighbourhood_tables to an empty dict.
+    """
+    width: int
+    height: int
+    _neighbourhood_tables: Dict[tuple, NeighbourhoodTable]
+
+    @abc.abstractmethod
+    def offset_patterns(self, radius: int, moore: bool,
+                        include_center: bool) -> Sequence[Sequence[Tuple[int, int]]]:
+        """(dx, dy) offsets of the neighbourhood, one pattern per parity class of x."""
+
+    def neighbourhood_table(self, radius: int = 1, moore: bool = True,
+                            include_center: bool = False) -> NeighbourhoodTable:
+        """
+        Get the neighbourhood table of a neighbourhood shape, built on first use.
+
+        Args:
+            radius: Radius of the neighbourhood
+            moore: Moore neighbourhood if True, Von Neumann otherwise, where the grid makes a difference
+            include_center: Whether a position is part of its own neighbourhood
+        """
+        key = (radius, moore, include_center)
+        table = self._neighbourhood_tables.get(key)
+        if table is None:
+            patterns = self.offset_patterns(radius, moore, include_center)
+            table = self._neighbourhood_tables[key] = NeighbourhoodTable(self.width, self.height, patterns)
+        return table
+
+
+def square_offsets(radius: int, moore: bool, include_center: bool) -> List[List[Tuple[int, int]]]:
+    """Offsets of a square grid neighbourhood, in the order of mesa's Grid.get_neighborhood."""
+    pattern = [(dx, dy) for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+               if (moore or abs(dx) + abs(dy) <= radius) and (include_center or dx or dy)]
+    return [pattern]
+
+
+def hex_offsets(radius: int, include_center: bool) -> List[List[Tuple[int, int]]]:
+    """
+    Offsets of a hexagonal grid neighbourhood for even and odd x, sorted like mesa's
+    HexGrid.get_neighborhood.
+    """
+    def adjacent(x, y):
+        if x % 2 == 0:
+            return [(x, y - 1), (x, y + 1), (x - 1, y + 1), (x - 1, y), (x + 1, y + 1), (x + 1, y)]
+        return [(x, y - 1), (x, y + 1), (x - 1, y), (x - 1, y - 1), (x + 1, y), (x + 1, y - 1)]
+
+    patterns = []
+    for parity in (0, 1):
+        reached = {(parity, 0)}
+        ring = [(parity, 0)]
+        for _ in range(radius):
+            ring = [pos for cell in ring for pos in adjacent(*cell) if pos not in reached]
+            reached.update(ring)
+        if not include_center:
+            reached.discard((parity, 0))
+        patterns.append(sorted((x - parity, y) for x, y in reached))
+    return patterns
@@ -0,0 +1,204 @@
+"""
+Smoke transport.
+
+Burning cells emit smoke into a concentration field, which is then carried by the wind and spread
+out each step: advection by a semi-Lagrangian backtrace with bilinear interpolation, diffusion by a
+five-point stencil, and exponential decay. The field may be coarser than the landscape, one smoke
+cell covering downscale x downscale landscape cells, to save work on large maps.
+
+Concentrations are in units of the smoke emitted by one burning landscape cell in one step, spread
+over one landscape cell, so they do not depend on the resolution of the field. Smoke leaving the grid
+is lost.
+"""
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.agents.cell import CellState
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.models.environment.landscape import LandscapeState
+    from src.models.environment.wind import WindField
+    from src.utils.config import Config
+
+logger = get_logger()
+
+
+class SmokeField:
+    """
+    Smoke concentration over the grid, advected by the wind and diffused.
+
+    Attributes:
+        concentration: float32 concentration of the smoke cells, of shape self.shape, indexed [x, y]
+    """
+    # Largest diffusion number of one stencil pass, below the stability limit of 0.25
+    MAX_DIFFUSION_NUMBER = 0.2
+
+    def __init__(self, width: int, height: int, downscale: int = 1, emission: float = 1.0,
+                 diffusivity: float = 5.0, decay: float = 0.05, extinction: float = 1.0,
+                 cell_size: float = 10.0, step_minutes: float = 1.0):
+        """
+        Args:
+            width: Width of the landscape
+            height: Height of the landscape
+            downscale: Landscape cells per smoke cell along each axis
+            emission: Smoke emitted by a burning cell per step
+            diffusivity: Diffusion coefficient of the smoke in m²/s
+            decay: Fraction of the smoke lost per minute, by settling and dilution above the drones
+            extinction: Attenuation of the vision per unit of concentration
+            cell_size: Side of a landscape cell in metres
+            step_minutes: Minutes per step
+        """
+        self.width = width
+        self.height = height
+        self.downscale = int(downscale)
+        self.emission = emission
+        self.extinction = extinction
+        self.step_minutes = step_minutes
+        k = self.downscale
+        self.shape = (-(-width // k), -(-height // k))
+        self.concentration = np.zeros(self.shape, dtype=np.float32)
+
+        # Smoke cells per m/s of wind over one step
+        self._displacement = 60 * step_minutes / (cell_size * k)
+        # Diffusion number of a step, split into passes that keep the stencil stable
+        diffusion = diffusivity * 60 * step_minutes / (cell_size * k) ** 2
+        self._passes = int(np.ceil(diffusion / self.MAX_DIFFUSION_NUMBER))
+        self._diffusion = diffusion / self._passes if self._passes else 0.0
+        self._retained = np.float32(np.exp(-decay * step_minutes))
+
+        self._x = np.arange(self.shape[0], dtype=np.float32)[:, None]
+        self._y = np.arange(self.shape[1], dtype=np.float32)[None, :]
+
+    @classmethod
+    def from_config(cls, config: 'Config', width: int, height: int) -> 'SmokeField':
+        """Smoke field of the smoke section of a config."""
+        return cls(width, height,
+                   downscale=config.get("smoke.downscale", 1),
+                   emission=config.get("smoke.emission", 1.0),
+                   diffusivity=config.get("smoke.diffusivity", 5.0),
+                   decay=config.get("smoke.decay", 0.05),
+                   extinction=config.get("smoke.extinction", 1.0),
+                   cell_size=config.get("landscape.cell_size", 10.0),
+                   step_minutes=config.get("fire.step_minutes", 1.0))
+
+    def step(self, landscape: 'LandscapeState', wind: 'WindField') -> None:
+        """
+        Advance the smoke by one step.
+
+        Args:
+            landscape: Landscape whose burning cells emit smoke
+            wind: Wind carrying the smoke
+        """
+        self.emit(landscape)
+        self.advect(wind)
+        self.diffuse()
+        self.concentration *= self._retained
+
+    def emit(self, landscape: 'LandscapeState') -> None:
+        """Add the smoke emitted by the burning cells of a landscape."""
+        burning = np.flatnonzero(landscape.state.reshape(-1) == CellState.BURNING)
+        if burning.size == 0:
+            return
+        x, y = np.divmod(burning, landscape.height)
+        k = self.downscale
+        cells = (x // k) * self.shape[1] + y // k
+        counts = np.bincount(cells, minlength=self.concentration.size).reshape(self.shape)
+        self.concentration += (self.emission / k ** 2) * counts.astype(np.float32)
+
+    def advect(self, wind: 'WindField') -> None:
+        """Move the smoke with the wind, tracing each smoke cell back to where its smoke came from."""
+        if wind.calm:
+            return
+        # wind at the centre of each smoke cell
+        k = self.downscale
+        centres = np.ix_(np.minimum(np.arange(self.shape[0]) * k + k // 2, self.width - 1),
+                         np.minimum(np.arange(self.shape[1]) * k + k // 2, self.height - 1))
+        speed = wind.speed if wind.speed.ndim == 0 else wind.speed[centres]
+        direction = np.radians(wind.direction if wind.direction.ndim == 0 else wind.direction[centres])
+        # the wind blows from its direction, clockwise from north (+y)
+        dx = -np.sin(direction) * speed * self._displacement
+        dy = -np.cos(direction) * speed * self._displacement
+        self.concentration = self._interpolate(self.concentration, self._x - dx, self._y - dy)
+
+    def diffuse(self) -> None:
+        """Spread the smoke to the neighbouring smoke cells."""
+        c = self.concentration
+        for _ in range(self._passes):
+            laplacian = -4 * c
+            laplacian[1:] += c[:-1]
+            laplacian[:-1] += c[1:]
+            laplacian[:, 1:] += c[:, :-1]
+            laplacian[:, :-1] += c[:, 1:]
+            c += self._diffusion * laplacian
+
+    @staticmethod
+    def _interpolate(field: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Bilinear interpolation of a field at fractional indices, zero outside of it."""
+        x, y = np.broadcast_arrays(x, y)
+        x0 = np.floor(x).astype(np.intp)
+        y0 = np.floor(y).astype(np.intp)
+        fx = (x - x0).astype(np.float32)
+        fy = (y - y0).astype(np.float32)
+        padded = np.pad(field, 1)
+        # indices into the padded field, clipped to its zero border
+        x0 = np.clip(x0 + 1, 0, padded.shape[0] - 2)
+        y0 = np.clip(y0 + 1, 0, padded.shape[1] - 2)
+        inside = (x > -1) & (x < field.shape[0]) & (y > -1) & (y < field.shape[1])
+        values = ((padded[x0, y0] * (1 - fx) + padded[x0 + 1, y0] * fx) * (1 - fy)
+                  + (padded[x0, y0 + 1] * (1 - fx) + padded[x0 + 1, y0 + 1] * fx) * fy)
+        return np.where(inside, values, 0).astype(np.float32)
+
+    def sample(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Concentration at landscape positions, e.g. of the drones.
+
+        Args:
+            positions: (N, 2) grid positions
+
+        Returns:
+            (N,) concentrations
+        """
+        positions = np.asarray(positions, dtype=np.intp).reshape(-1, 2)
+        return self.concentration[positions[:, 0] // self.downscale, positions[:, 1] // self.downscale]
+
+    def line_integral(self, origins: np.ndarray, targets: np.ndarray, samples: int = 16) -> np.ndarray:
+        """
+        Smoke along straight lines between landscape positions, e.g. lines of sight.
+
+        Args:
+            origins: (N, 2) start positions
+            targets: (N, 2) end positions
+            samples: Number of points sampled along each line
+
+        Returns:
+            (N,) integrals of the concentration along the lines, in concentration x landscape cells
+        """
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 2)
+        targets = np.asarray(targets, dtype=np.float32).reshape(-1, 2)
+        # midpoints of equal segments, in smoke cell coordinates
+        t = (np.arange(samples, dtype=np.float32) + 0.5) / samples
+        points = origins[:, None] + (targets - origins)[:, None] * t[None, :, None]
+        points = (points + 0.5) / self.downscale - 0.5
+        values = self._interpolate(self.concentration, points[..., 0], points[..., 1])
+        length = np.hypot(*(targets - origins).T)
+        return values.mean(axis=1) * length
+
+    def vision_ranges(self, positions: np.ndarray, vision_range: float) -> np.ndarray:
+        """
+        Vision range of drones, shortened by the smoke around them.
+
+        Args:
+            positions: (N, 2) positions of the drones
+            vision_range: Vision range in clear air
+
+        Returns:
+            (N,) vision ranges, vision_range * exp(-extinction * concentration)
+        """
+        return vision_range * np.exp(-self.extinction * self.sample(positions))
+
+    @property
+    def total(self) -> float:
+        """Amount of smoke over the grid, in units of the emission of one cell."""
+        return float(self.concentration.sum(dtype=np.float64)) * self.downscale ** 2
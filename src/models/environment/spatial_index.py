@@ -0,0 +1,94 @@
+"""
+Spatial hash index for range queries between agents on the grid.
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import mesa
+
+
+class SpatialHash:
+    """
+    Uniform bucket grid over agent positions.
+
+    The grid is split in square buckets of bucket_size cells. A Chebyshev radius query only visits
+    the buckets overlapping the query square, so with the bucket size set to the usual query radius
+    a query looks at 3x3 buckets and only at the indexed agents in them.
+    """
+    def __init__(self, bucket_size: int):
+        """
+        Args:
+            bucket_size: Side of the square buckets, in grid cells
+        """
+        self.bucket_size = max(1, int(bucket_size))
+        # dicts keep the insertion order, which keeps the query results deterministic
+        self.buckets: Dict[Tuple[int, int], Dict['mesa.Agent', None]] = {}
+        self._positions: Dict['mesa.Agent', Tuple[int, int]] = {}
+
+    def _bucket(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        return pos[0] // self.bucket_size, pos[1] // self.bucket_size
+
+    def add(self, agent: 'mesa.Agent', pos: Tuple[int, int]) -> None:
+        """Add an agent at the given position."""
+        self._positions[agent] = pos
+        self.buckets.setdefault(self._bucket(pos), {})[agent] = None
+
+    def remove(self, agent: 'mesa.Agent') -> None:
+        """Remove an agent from the index."""
+        pos = self._positions.pop(agent)
+        key = self._bucket(pos)
+        bucket = self.buckets[key]
+        del bucket[agent]
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, agent: 'mesa.Agent', pos: Tuple[int, int]) -> None:
+        """Update the position of an agent, moving it to another bucket only if needed."""
+        old_key = self._bucket(self._positions[agent])
+        new_key = self._bucket(pos)
+        self._positions[agent] = pos
+        if old_key == new_key:
+            return
+        bucket = self.buckets[old_key]
+        del bucket[agent]
+        if not bucket:
+            del self.buckets[old_key]
+        self.buckets.setdefault(new_key, {})[agent] = None
+
+    def query(self, pos: Tuple[int, int], radius: int,
+              exclude: Optional['mesa.Agent'] = None) -> List['mesa.Agent']:
+        """
+        Get the agents within a Chebyshev distance of a position.
+
+        Args:
+            pos: Centre of the query
+            radius: Chebyshev radius, inclusive
+            exclude: Optional agent to leave out of the result
+        Returns:
+            The agents in range, ordered by position like the grid neighbourhood iteration
+        """
+        x, y = pos
+        radius = int(radius)
+        bx_min, by_min = self._bucket((x - radius, y - radius))
+        bx_max, by_max = self._bucket((x + radius, y + radius))
+        positions = self._positions
+
+        found = []
+        for bx in range(bx_min, bx_max + 1):
+            for by in range(by_min, by_max + 1):
+                bucket = self.buckets.get((bx, by))
+                if not bucket:
+                    continue
+                for agent in bucket:
+                    ax, ay = positions[agent]
+                    if abs(ax - x) <= radius and abs(ay - y) <= radius and agent is not exclude:
+                        found.append(agent)
+
+        found.sort(key=positions.__getitem__)
+        return found
+
+    def __contains__(self, agent: 'mesa.Agent') -> bool:
+        return agent in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
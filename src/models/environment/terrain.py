@@ -0,0 +1,243 @@
+"""
+Terrain elevation.
+
+The elevation is generated as fractal noise or read from a raster file. The slope towards each of
+the 8 Moore neighbours, and the slope and aspect of every cell, are derived from it once, a block of
+columns at a time, and stored as small integer arrays. The fire models look the slopes up instead of
+taking differences of the elevation every step.
+
+With a memmap directory set, the arrays are memory-mapped temporary files in it, so maps of many
+millions of cells do not need to fit in memory. The files are deleted when the arrays are released.
+"""
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from src.models.environment.builder import read_raster
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.utils.config import Config
+
+logger = get_logger()
+
+# Tangent of the slope per unit of the directional slope arrays
+SLOPE_UNIT = 0.02
+# Offset of each directional slope layer, the Moore directions in the order of their keys
+LAYER_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+# Layer of each Moore direction key, (dx + 1) * 3 + dy + 1, -1 for the centre
+KEY_LAYERS = np.array([0, 1, 2, 3, -1, 4, 5, 6, 7])
+# Slope coefficient of the spread probability of Alexandridis et al. (2008), per degree
+SLOPE_COEFFICIENT = 0.078
+
+
+def fractal_noise(width: int, height: int, rng: np.random.Generator, feature_size: int, octaves: int = 4,
+                  out: Optional[np.ndarray] = None, block: int = 256) -> np.ndarray:
+    """
+    Fractal value noise in [0, 1].
+
+    Octaves of smoothly interpolated random lattices, each with half the feature size and half the
+    amplitude of the one before. The lattices are drawn first, the noise is then filled in a block of
+    columns at a time.
+
+    Args:
+        width: Width of the grid
+        height: Height of the grid
+        rng: Generator to draw the lattices from
+        feature_size: Lattice spacing of the first octave, in cells
+        octaves: Number of octaves
+        out: (width, height) array to write to, allocated if None
+        block: Number of columns filled at once
+
+    Returns:
+        The noise, indexed [x, y]
+    """
+    if out is None:
+        out = np.empty((width, height), dtype=np.float32)
+    layers = []
+    for octave in range(octaves):
+        size = max(feature_size / 2 ** octave, 1)
+        lattice = rng.random((int(width / size) + 2, int(height / size) + 2), dtype=np.float32)
+        fy = np.arange(height) / size
+        iy = fy.astype(np.intp)
+        ty = fy - iy
+        layers.append((size, 0.5 ** octave, lattice, iy, (ty * ty * (3 - 2 * ty)).astype(np.float32)))
+    total = sum(amplitude for _, amplitude, _, _, _ in layers)
+
+    for x0 in range(0, width, block):
+        x1 = min(x0 + block, width)
+        values = np.zeros((x1 - x0, height), dtype=np.float32)
+        for size, amplitude, lattice, iy, ty in layers:
+            fx = np.arange(x0, x1) / size
+            ix = fx.astype(np.intp)
+            tx = (fx - ix)[:, None]
+            tx = (tx * tx * (3 - 2 * tx)).astype(np.float32)
+            left = lattice[ix][:, iy] * (1 - ty) + lattice[ix][:, iy + 1] * ty
+            right = lattice[ix + 1][:, iy] * (1 - ty) + lattice[ix + 1][:, iy + 1] * ty
+            values += amplitude * (left * (1 - tx) + right * tx)
+        out[x0:x1] = values / total
+    return out
+
+
+def allocate(shape: tuple, dtype, memmap_dir: Optional[Path] = None) -> np.ndarray:
+    """Zeroed array, memory-mapped to a temporary file in memmap_dir if set."""
+    if memmap_dir is None:
+        return np.zeros(shape, dtype=dtype)
+    memmap_dir = Path(memmap_dir).expanduser()
+    memmap_dir.mkdir(parents=True, exist_ok=True)
+    # the file is unlinked at once, the mapping keeps it alive as long as the array
+    with tempfile.TemporaryFile(dir=memmap_dir) as file:
+        return np.memmap(file, dtype=dtype, mode='w+', shape=shape)
+
+
+class Terrain:
+    """
+    Elevation of the grid and the slopes derived from it.
+
+    Attributes:
+        elevation: (width, height) float32 elevation in metres
+        slopes: (8, width, height) int8 tangent of the slope towards each Moore neighbour in
+            SLOPE_UNIT, positive uphill, in the order of LAYER_OFFSETS. Zero towards the outside
+        slope: (width, height) uint8 slope of each cell in degrees
+        aspect: (width, height) uint16 direction each cell faces, downslope, in degrees clockwise from
+            north (+y)
+        flat: Whether the terrain has no slope anywhere
+    """
+    # Number of columns derived at once
+    BLOCK = 256
+
+    def __init__(self, width: int, height: int, elevation: Optional[np.ndarray] = None,
+                 cell_size: float = 10.0, memmap_dir: Optional[str] = None):
+        """
+        Args:
+            width: Width of the grid
+            height: Height of the grid
+            elevation: (width, height) elevation in metres, flat if None. A writeable float32 array
+                is used as is, other arrays are copied
+            cell_size: Side of a cell in metres
+            memmap_dir: Directory for the memory-mapped arrays, in memory if None
+        """
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.memmap_dir = Path(memmap_dir).expanduser() if memmap_dir else None
+
+        if elevation is None:
+            self.elevation = np.broadcast_to(np.float32(0), (width, height))
+            self.slopes = np.broadcast_to(np.int8(0), (len(LAYER_OFFSETS), width, height))
+            self.slope = np.broadcast_to(np.uint8(0), (width, height))
+            self.aspect = np.broadcast_to(np.uint16(0), (width, height))
+            self.flat = True
+        else:
+            if elevation.shape != (width, height):
+                raise ValueError(f"The elevation is {elevation.shape[0]}x{elevation.shape[1]}, "
+                                 f"the grid {width}x{height}")
+            if isinstance(elevation, np.ndarray) and elevation.dtype == np.float32 and elevation.flags.writeable:
+                self.elevation = elevation
+            else:
+                self.elevation = allocate((width, height), np.float32, self.memmap_dir)
+                for x0 in range(0, width, self.BLOCK):
+                    self.elevation[x0:x0 + self.BLOCK] = elevation[x0:x0 + self.BLOCK]
+            self.slopes = allocate((len(LAYER_OFFSETS), width, height), np.int8, self.memmap_dir)
+            self.slope = allocate((width, height), np.uint8, self.memmap_dir)
+            self.aspect = allocate((width, height), np.uint16, self.memmap_dir)
+            self.flat = not self._derive()
+
+        # Multiplier of the spread probability for each directional slope value, indexed by value + 128
+        degrees = np.degrees(np.arctan(np.arange(-128, 128) * SLOPE_UNIT))
+        self.multipliers = np.exp(SLOPE_COEFFICIENT * degrees).astype(np.float32)
+
+    @classmethod
+    def from_config(cls, config: 'Config', width: int, height: int, rng: np.random.Generator) -> 'Terrain':
+        """
+        Terrain of the terrain section of a config.
+
+        Args:
+            config: The configuration
+            width: Width of the grid
+            height: Height of the grid
+            rng: Generator to draw a generated relief from
+        """
+        cell_size = config.get("landscape.cell_size", 10.0)
+        memmap_dir = config.get("terrain.memmap_dir", None)
+        path = config.get("terrain.elevation_path", None)
+        relief = config.get("terrain.relief", 0.0)
+        if path:
+            elevation, missing = read_raster(path)
+            if missing.any():
+                elevation = np.where(missing, 0, elevation)
+            logger.info(f"Loaded the elevation from {path}")
+        elif relief > 0:
+            # generated straight into the elevation array of the terrain, then scaled in place
+            elevation = allocate((width, height), np.float32, memmap_dir)
+            fractal_noise(width, height, rng, config.get("terrain.feature_size", 64), out=elevation)
+            for x0 in range(0, width, cls.BLOCK):
+                elevation[x0:x0 + cls.BLOCK] *= relief
+        else:
+            return cls(width, height, cell_size=cell_size)
+        return cls(width, height, elevation, cell_size=cell_size, memmap_dir=memmap_dir)
+
+    def _derive(self) -> bool:
+        """Fill the slope arrays from the elevation, returns whether any slope is not zero."""
+        steep = False
+        width, step = self.width, self.BLOCK
+        for x0 in range(0, width, step):
+            x1 = min(x0 + step, width)
+            # the block with a margin of one cell, the edges repeated outside the grid
+            block = np.asarray(self.elevation[max(x0 - 1, 0):min(x1 + 1, width)], dtype=np.float32)
+            block = np.pad(block, ((x0 == 0, x1 == width), (1, 1)), mode='edge')
+            centre = block[1:-1, 1:-1]
+
+            for layer, (dx, dy) in enumerate(LAYER_OFFSETS):
+                neighbour = block[1 + dx:block.shape[0] - 1 + dx, 1 + dy:block.shape[1] - 1 + dy]
+                tangent = (neighbour - centre) / (self.cell_size * np.hypot(dx, dy))
+                values = np.clip(np.round(tangent / SLOPE_UNIT), -127, 127).astype(np.int8)
+                self.slopes[layer, x0:x1] = values
+                steep = steep or bool(values.any())
+
+            east = (block[2:, 1:-1] - block[:-2, 1:-1]) / (2 * self.cell_size)
+            north = (block[1:-1, 2:] - block[1:-1, :-2]) / (2 * self.cell_size)
+            self.slope[x0:x1] = np.round(np.degrees(np.arctan(np.hypot(east, north))))
+            self.aspect[x0:x1] = np.round(np.degrees(np.arctan2(-east, -north))) % 360
+        return steep
+
+    def directional_slopes(self, sources: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """
+        Slope from each source towards a Moore neighbour.
+
+        Args:
+            sources: Flat indices of the cells
+            keys: Keys of the directions, from moore_keys
+
+        Returns:
+            The int8 slope values, tangents in SLOPE_UNIT
+        """
+        if self.flat:
+            return np.zeros(np.shape(sources), dtype=np.int8)
+        return self.slopes.reshape(len(LAYER_OFFSETS), -1)[KEY_LAYERS[keys], sources]
+
+    def multiplier(self, sources: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """Factor of the spread probability from each source towards a Moore neighbour."""
+        return self.multipliers[self.directional_slopes(sources, keys).astype(np.intp) + 128]
+
+    def elevation_at(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Elevation of the ground at grid positions, e.g. below the drones.
+
+        Args:
+            positions: (N, 2) positions
+
+        Returns:
+            (N,) elevations in metres
+        """
+        positions = np.asarray(positions)
+        return self.elevation[positions[:, 0], positions[:, 1]]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory or file space used by the terrain arrays."""
+        if self.flat:
+            return 0
+        return self.elevation.nbytes + self.slopes.nbytes + self.slope.nbytes + self.aspect.nbytes
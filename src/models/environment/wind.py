@@ -0,0 +1,198 @@
+"""
+Wind field.
+
+The wind speed and direction are stored per cell and quantised into wind bins. The effect of the
+wind on the spread of fire in each Moore direction depends only on the bin, so the spread kernels
+of every bin are computed once and looked up by the fire models. Changing the wind costs the
+quantisation of the new arrays, not the kernels.
+
+A wind series, read from a file, changes the wind over time: a .csv file with step, speed and
+direction columns for a wind uniform over the grid, or a .npz file with a steps array and speed and
+direction arrays of shape (steps,) or (steps, width, height), indexed [x, y] like the landscape.
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.utils.config import Config
+
+logger = get_logger()
+
+# Unit vectors of the Moore directions, keyed by (dx + 1) * 3 + dy + 1, the centre is zero
+_offsets = np.stack(np.divmod(np.arange(9), 3), axis=1) - 1
+MOORE_DIRECTIONS = _offsets / np.maximum(np.hypot(_offsets[:, 0], _offsets[:, 1]), 1)[:, None]
+
+
+def moore_keys(sources: np.ndarray, targets: np.ndarray, height: int) -> np.ndarray:
+    """Key of the Moore direction from each source to its neighbouring target, flat indices."""
+    return (targets // height - sources // height + 1) * 3 + (targets % height - sources % height + 1)
+
+
+class WindField:
+    """
+    Wind speed and direction over the grid.
+
+    Speeds are in m/s at midflame height, directions are where the wind blows from in degrees
+    clockwise from north (+y). A uniform wind is stored as scalars broadcast over the grid.
+
+    Attributes:
+        multipliers: (bins, 9) factors of the spread probability in each Moore direction
+        ellipses: (bins, 9) rate of spread in each Moore direction relative to the head fire
+    """
+    # Resolution and number of the speed bins, in m/s
+    SPEED_STEP = 0.25
+    SPEED_BINS = 121
+    # Number of direction bins, sectors of 360 / DIRECTION_BINS degrees
+    DIRECTION_BINS = 32
+    # Wind coefficients of the spread probability of Alexandridis et al. (2008), per m/s
+    C1 = 0.045
+    C2 = 0.131
+    # Cap of the length-to-breadth ratio of the fire ellipse, as in FARSITE, the ratio of Anderson
+    # (1983) grows without bound and leaves no flank spread in strong wind
+    MAX_LENGTH_TO_BREADTH = 8.0
+
+    def __init__(self, width: int, height: int, speed: Union[float, np.ndarray] = 0.0,
+                 direction: Union[float, np.ndarray] = 0.0,
+                 series: Optional[Tuple[np.ndarray, List[np.ndarray], List[np.ndarray]]] = None):
+        """
+        Args:
+            width: Width of the grid
+            height: Height of the grid
+            speed: Wind speed, scalar or (width, height) array
+            direction: Wind direction, scalar or (width, height) array
+            series: Steps at which the wind changes, with the speed and direction from each of them
+        """
+        self.width = width
+        self.height = height
+        if series is not None:
+            for values in series[1] + series[2]:
+                self._check_shape(values)
+        self.series = series
+        self._series_index = -1
+
+        # Kernels at the centre of every bin, bin = speed bin * DIRECTION_BINS + direction bin
+        speed_bin, direction_bin = np.divmod(np.arange(self.SPEED_BINS * self.DIRECTION_BINS), self.DIRECTION_BINS)
+        bin_speed = speed_bin * self.SPEED_STEP
+        angle = np.radians(direction_bin * 360 / self.DIRECTION_BINS)
+        downwind = -np.stack([np.sin(angle), np.cos(angle)], axis=1)
+        cosine = downwind @ MOORE_DIRECTIONS.T
+        self.multipliers = np.exp(bin_speed[:, None] * (self.C1 + self.C2 * (cosine - 1))).astype(np.float32)
+        # Anderson's (1983) length-to-breadth ratio of the fire ellipse, from the speed in mph
+        mph = bin_speed * 2.23694
+        ratio = 0.936 * np.exp(0.2566 * mph) + 0.461 * np.exp(-0.1548 * mph) - 0.397
+        ratio = np.minimum(ratio, self.MAX_LENGTH_TO_BREADTH)
+        eccentricity = (np.sqrt(np.maximum(ratio ** 2 - 1, 0)) / ratio)[:, None]
+        self.ellipses = ((1 - eccentricity) / (1 - eccentricity * cosine)).astype(np.float32)
+
+        self.set(speed, direction)
+
+    @classmethod
+    def from_config(cls, config: 'Config', width: int, height: int) -> 'WindField':
+        """Wind field of the wind section of a config."""
+        series_path = config.get("wind.series_path", None)
+        return cls(width, height,
+                   speed=config.get("wind.speed", 0.0),
+                   direction=config.get("wind.direction", 0.0),
+                   series=read_series(series_path) if series_path else None)
+
+    def _check_shape(self, values: np.ndarray) -> None:
+        if values.ndim and values.shape != (self.width, self.height):
+            raise ValueError(f"Wind arrays must be scalars or {self.width}x{self.height}, "
+                             f"got {'x'.join(map(str, values.shape))}")
+
+    def set(self, speed: Union[float, np.ndarray], direction: Union[float, np.ndarray]) -> None:
+        """
+        Set the wind.
+
+        Args:
+            speed: Wind speed, scalar or (width, height) array
+            direction: Wind direction, scalar or (width, height) array
+        """
+        speed = np.asarray(speed, dtype=np.float32)
+        direction = np.asarray(direction, dtype=np.float32)
+        self._check_shape(speed)
+        self._check_shape(direction)
+        if np.any(speed < 0):
+            raise ValueError("Wind speeds must not be negative")
+        self.speed = speed
+        self.direction = direction
+
+        speed_bin = np.minimum(np.round(speed / self.SPEED_STEP), self.SPEED_BINS - 1).astype(np.uint16)
+        direction_bin = np.round(direction / (360 / self.DIRECTION_BINS)).astype(np.int64) % self.DIRECTION_BINS
+        # flat array over the grid, or a scalar for a uniform wind
+        self._bins = (speed_bin * self.DIRECTION_BINS + direction_bin).astype(np.uint16)
+        if self._bins.ndim:
+            self._bins = np.broadcast_to(self._bins, (self.width, self.height)).reshape(-1)
+        self.calm = not np.any(speed_bin)
+
+    def update(self, step: int) -> bool:
+        """
+        Apply the latest entry of the series at or before a step.
+
+        Returns:
+            Whether the wind changed
+        """
+        if self.series is None:
+            return False
+        steps, speeds, directions = self.series
+        index = int(np.searchsorted(steps, step, side='right')) - 1
+        if index < 0 or index == self._series_index:
+            return False
+        self._series_index = index
+        self.set(speeds[index], directions[index])
+        return True
+
+    def bins(self, cells: np.ndarray) -> np.ndarray:
+        """Wind bin of the cells at flat indices."""
+        if self._bins.ndim == 0:
+            return np.full(np.shape(cells), self._bins, dtype=np.uint16)
+        return self._bins[cells]
+
+    def speed_bins(self, cells: np.ndarray) -> np.ndarray:
+        """Speed bin of the cells at flat indices."""
+        return self.bins(cells) // self.DIRECTION_BINS
+
+    def multiplier(self, sources: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """
+        Factor of the spread probability from each source in a Moore direction.
+
+        Args:
+            sources: Flat indices of the cells the fire spreads from
+            keys: Keys of the directions, from moore_keys
+        """
+        return self.multipliers[self.bins(sources), keys]
+
+
+def read_series(path: str) -> Tuple[np.ndarray, List[np.ndarray], List[np.ndarray]]:
+    """
+    Read a wind series file.
+
+    Args:
+        path: .csv or .npz file
+
+    Returns:
+        The steps in increasing order, with the speed and direction from each of them
+    """
+    path = Path(path).expanduser()
+    if path.suffix.lower() == '.csv':
+        table = np.genfromtxt(path, delimiter=',', names=True, ndmin=1)
+        missing = {'step', 'speed', 'direction'} - set(table.dtype.names)
+        if missing:
+            raise ValueError(f"{path} is missing the {', '.join(sorted(missing))} columns of a wind series")
+        steps, speeds, directions = table['step'], table['speed'], table['direction']
+    elif path.suffix.lower() == '.npz':
+        with np.load(path) as data:
+            steps, speeds, directions = data['steps'], data['speed'], data['direction']
+    else:
+        raise ValueError(f"Unsupported wind series format '{path.suffix}', expected .csv or .npz")
+
+    steps = np.asarray(steps, dtype=np.int64)
+    if len(speeds) != steps.size or len(directions) != steps.size:
+        raise ValueError(f"{path} holds {steps.size} steps but {len(speeds)} speeds and {len(directions)} directions")
+    order = np.argsort(steps, kind='stable')
+    logger.info(f"Loaded a wind series of {steps.size} entries from {path}")
+    return steps[order], [np.asarray(speeds[i]) for i in order], [np.asarray(directions[i]) for i in order]
@@ -0,0 +1,372 @@
+"""
+Event-driven fire spread from precomputed ignition times.
+
+Instead of rolling the spread of every burning cell at every step, the time at which each cell
+ignites is computed once, with a Dijkstra sweep over the grid from the burning cells, and a step of
+the model only applies the ignitions and burn outs due at it. The state of any cell at any step is a
+comparison of its ignition and burn out steps.
+
+The sweep follows the stepped models: a burning cell acts once per step at a random turn within the
+step, and also in the step it ignites if its turn comes after the ignition. At each action but the
+last it ignites each unburnt neighbour with the spread probability, so the action that ignites a
+neighbour follows a geometric distribution. It is drawn by inversion of a uniform per edge, or set
+to its median for a deterministic spread, and the neighbour ignites at the time of that action.
+
+Later ignitions always come from later actions, so once the steps before a step are done, the
+ignitions within it are found by relaxing the edges between its cells until nothing changes, and
+the step is final (Dial's bucketed variant of Dijkstra's algorithm, vectorised over each step).
+"""
+import heapq
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.environment.wind import moore_keys
+from src.models.fire.simple import SimpleFireModel
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+logger = get_logger()
+
+# Ignition step of the cells the fire never reaches, and of the cells burnt before the sweep
+NEVER = np.iinfo(np.int32).max
+PAST = np.iinfo(np.int32).min
+
+
+class ArrivalTimeFireModel(SimpleFireModel):
+    """Fire spread with the probabilities and burn times of SimpleFireModel, computed ahead as ignition times.
+
+    The spread matches the stepped models in distribution but not roll for roll. The wind and slope
+    multipliers are taken when the sweep runs, and the sweep is run again from the current state
+    when the wind or the terrain are replaced, or when cells are set on fire from outside. The rolls
+    are memoryless, so a new sweep continues the fire without bias.
+    """
+
+    def __init__(self, model: 'SimulationModel'):
+        super().__init__(model)
+        self.deterministic = model.config.get("fire.deterministic_delays", False)
+
+        # Lookup tables indexed by fuel level, a cell burns out at its first action at the latest
+        levels = sorted(FuelLevel)
+        self.spread_probability = np.array([self.base_probabilities[level] for level in levels], dtype=float)
+        self.burn_time = np.maximum([self.burn_times[level] for level in levels], 1).astype(np.int32)
+        with np.errstate(divide='ignore'):
+            # logarithm of the probability that a roll misses, without wind and slope
+            self._log_miss = np.log1p(-np.clip(self.spread_probability, 0, 1))
+
+        # Steps advanced by the fire model
+        self.time = 0
+        # Step each cell ignites at, first acts at and burns out at, over the flat grid, None until the sweep
+        self.ignition: Optional[np.ndarray] = None
+        self.first_action: Optional[np.ndarray] = None
+        self.burn_out_time: Optional[np.ndarray] = None
+
+        # Cells reached by the sweep sorted by ignition step and by burn out step
+        self._by_ignition: np.ndarray = None
+        self._by_burn_out: np.ndarray = None
+        self._ignition_steps: np.ndarray = None
+        self._burn_out_steps: np.ndarray = None
+        # Whether the ignition times no longer follow from the landscape and must be swept again
+        self._stale = True
+        # Wind and terrain of the sweep
+        self._conditions: tuple = None
+
+    def _current_conditions(self) -> tuple:
+        grid = self.model.grid
+        return grid.wind.speed, grid.wind.direction, grid.terrain
+
+    def _needs_sweep(self) -> bool:
+        """Whether the ignition times are missing or out of date."""
+        if self._stale or self.ignition is None:
+            return True
+        # the wind and terrain are replaced rather than changed in place
+        return any(now is not then for now, then in zip(self._current_conditions(), self._conditions))
+
+    def reset_front(self):
+        """Sweep the ignition times again from the landscape state at the next step."""
+        self._stale = True
+
+    def get_front(self) -> Optional[np.ndarray]:
+        if self.ignition is None:
+            return None
+        burning = self._burning_cells()
+        return np.stack(np.unravel_index(burning, self.model.grid.landscape.state.shape), axis=1)
+
+    def set_front(self, front: Optional[np.ndarray]):
+        """The burning cells follow from the ignition times saved with get_arrays."""
+        self._stale = True
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        if self.ignition is None or self._stale:
+            return {'time': np.array(self.time)}
+        return {'time': np.array(self.time), 'ignition': self.ignition, 'first_action': self.first_action,
+                'burn_out': self.burn_out_time}
+
+    def set_arrays(self, arrays: Dict[str, np.ndarray]):
+        if 'time' in arrays:
+            self.time = int(arrays['time'])
+        if 'ignition' not in arrays:
+            return
+        self.ignition = arrays['ignition'].copy()
+        self.first_action = arrays['first_action'].copy()
+        self.burn_out_time = arrays['burn_out'].copy()
+        self._index_events()
+        self._conditions = self._current_conditions()
+        self._stale = False
+
+    def frontier(self) -> Set[Tuple[int, int]]:
+        landscape = self.model.grid.landscape
+        table = self.model.grid.neighbourhood_table(1, moore=True, include_center=False)
+        targets, _ = table.neighbours(np.flatnonzero(landscape.on_fire))
+        targets = targets[landscape.state.reshape(-1)[targets] == CellState.UNBURNT]
+        x, y = np.divmod(np.unique(targets), landscape.height)
+        return set(zip(x.tolist(), y.tolist()))
+
+    def ignite(self, pos: Tuple[int, int]):
+        landscape = self.model.grid.landscape
+        if landscape.state[pos] == CellState.BURNING:
+            return
+        landscape.state[pos] = CellState.BURNING
+        landscape.burn_counter[pos] = 0
+        self._stale = True
+
+    def sweep(self):
+        """Compute the ignition, first action and burn out steps of every cell from the current landscape.
+
+        The burning cells have acted burn_counter times and act at every step from the next one.
+        """
+        landscape = self.model.grid.landscape
+        state = landscape.state.reshape(-1)
+        fuel = landscape.fuel.reshape(-1)
+        counter = landscape.burn_counter.reshape(-1).astype(np.int32)
+        rng = self.model.streams.fire
+        now = self.time
+        # turns of a cell at each step from its ignition step to its last action
+        columns = int(self.burn_time.max()) + 1
+
+        ignition = np.full(state.size, NEVER, dtype=np.int32)
+        first_action = np.full(state.size, NEVER, dtype=np.int32)
+        burn_out = np.full(state.size, NEVER, dtype=np.int32)
+        burnt = state == CellState.BURNT
+        ignition[burnt] = first_action[burnt] = burn_out[burnt] = PAST
+        # Time of ignition within the steps, only needed while sweeping
+        arrival = np.full(state.size, np.inf)
+        settled = state != CellState.UNBURNT
+
+        burning = np.flatnonzero(state == CellState.BURNING)
+        ignition[burning] = now - counter[burning]
+        first_action[burning] = now + 1 - counter[burning]
+        burn_out[burning] = first_action[burning] + self.burn_time[fuel[burning]] - 1
+
+        # Steps with pending cells and the cells pushed for each, stale entries are skipped on pop
+        buckets = {}
+        queue = []
+
+        def relax(targets: np.ndarray, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """Keep the earliest arrival at each target, returns the improved ones."""
+            before = arrival[targets]
+            np.minimum.at(arrival, targets, times)
+            improved = times < before
+            return targets[improved], times[improved]
+
+        def push(targets: np.ndarray, times: np.ndarray):
+            steps = np.floor(times).astype(np.int64)
+            for step in np.unique(steps).tolist():
+                if step not in buckets:
+                    buckets[step] = []
+                    heapq.heappush(queue, step)
+                buckets[step].append(targets[steps == step])
+
+        # the burning cells act from the next step, counting the actions they already made
+        turns, log_uniforms = self._draws(burning.size, columns, rng)
+        push(*relax(*self._spread(burning, now, first_action[burning], counter[burning], np.arange(burning.size),
+                                  turns, log_uniforms, settled, landscape)))
+
+        # row of each cell of the current step in its draws
+        rows = np.full(state.size, -1, dtype=np.intp)
+        while queue:
+            step = heapq.heappop(queue)
+            cells = np.unique(np.concatenate(buckets.pop(step)))
+            cells = cells[np.floor(arrival[cells]) == step]
+            # draws of the cells of the step, kept while their arrival improves within it
+            members = []
+            turns = np.empty((0, columns), dtype=np.float32)
+            log_uniforms = np.empty((0, 9), dtype=np.float32)
+            while cells.size:
+                new = cells[rows[cells] < 0]
+                if new.size:
+                    rows[new] = np.arange(len(turns), len(turns) + new.size)
+                    members.append(new)
+                    more_turns, more_log_uniforms = self._draws(new.size, columns, rng)
+                    turns = np.concatenate([turns, more_turns])
+                    log_uniforms = np.concatenate([log_uniforms, more_log_uniforms])
+                # a cell acts in its ignition step if its turn comes after the ignition. Its actions
+                # only change, and it only needs to spread again, when that makes it act earlier
+                first = step + (turns[rows[cells], 0] <= arrival[cells] - step)
+                earlier = first < first_action[cells]
+                cells, first = cells[earlier], first[earlier]
+                first_action[cells] = first
+                targets, times = relax(*self._spread(cells, step, first, np.zeros(cells.size, dtype=np.int32),
+                                                     rows[cells], turns, log_uniforms, settled, landscape))
+                later = np.floor(times) > step
+                push(targets[later], times[later])
+                cells = np.unique(targets[~later])
+
+            if not members:
+                continue
+            cells = np.concatenate(members)
+            settled[cells] = True
+            ignition[cells] = step
+            burn_out[cells] = first_action[cells] + self.burn_time[fuel[cells]] - 1
+            rows[cells] = -1
+
+        self.ignition = ignition
+        self.first_action = first_action
+        self.burn_out_time = burn_out
+        self._index_events()
+        self._conditions = self._current_conditions()
+        self._stale = False
+        logger.debug(f"Swept the ignition times of {self._by_ignition.size} cells from step {now}")
+
+    def _draws(self, n: int, columns: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Turns of n cells at each of their steps and log uniforms of the spread to each Moore neighbour."""
+        if self.deterministic:
+            return np.full((n, columns), 0.5, dtype=np.float32), np.full((n, 9), np.log(0.5), dtype=np.float32)
+        # logarithms of uniforms in (0, 1], as the inversion takes them
+        return rng.random((n, columns), dtype=np.float32), np.log(1 - rng.random((n, 9), dtype=np.float32))
+
+    def _spread(self, cells: np.ndarray, step: int, first: np.ndarray, done: np.ndarray, rows: np.ndarray,
+                turns: np.ndarray, log_uniforms: np.ndarray, settled: np.ndarray,
+                landscape) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Times the cells ignite their unsettled neighbours at.
+
+        Args:
+            cells: Flat indices of the burning cells
+            step: Step of the first column of the turns
+            first: Step of the first action of each cell
+            done: Number of actions each cell made before the sweep
+            rows: Row of each cell in the draws
+            turns: Turns at each step from step on, from _draws
+            log_uniforms: Log uniforms of each Moore direction key, from _draws
+            settled: Whether each cell of the grid has its final ignition time
+            landscape: The landscape state
+
+        Returns:
+            Flat indices of the ignited neighbours and the time they ignite
+        """
+        table = self.model.grid.neighbourhood_table(1, moore=True, include_center=False)
+        targets, index = table.neighbours(cells)
+        open_ = ~settled[targets]
+        targets, index = targets[open_], index[open_]
+        origins = cells[index]
+        fuel = landscape.fuel.reshape(-1)
+
+        factors = self.spread_factors(origins, targets)
+        if factors is None:
+            log_miss = self._log_miss[fuel[targets]]
+        else:
+            with np.errstate(divide='ignore'):
+                log_miss = np.log1p(-np.clip(self.spread_probability[fuel[targets]] * factors, 0, 1))
+        # the action igniting each neighbour, by inversion of the geometric distribution, never
+        # where the probability is 0 and the logarithm of the miss is 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tries = np.ceil(log_uniforms[rows[index], moore_keys(origins, targets, landscape.height)] / log_miss)
+        action = done[index] + np.maximum(tries, 1)
+        spreads = (action <= self.burn_time[fuel[origins]] - 1) & (log_miss < 0)
+        index, action = index[spreads], action[spreads].astype(np.int64)
+        # the step of the action and the turn of the cell in it
+        at = first[index] + action - 1
+        return targets[spreads], at + turns[rows[index], at - step]
+
+    def _index_events(self):
+        reached = np.flatnonzero((self.ignition != NEVER) & (self.ignition != PAST))
+        self._by_ignition = reached[np.argsort(self.ignition[reached], kind='stable')]
+        self._by_burn_out = reached[np.argsort(self.burn_out_time[reached], kind='stable')]
+        self._ignition_steps = self.ignition[self._by_ignition]
+        self._burn_out_steps = self.burn_out_time[self._by_burn_out]
+
+    @staticmethod
+    def _events(order: np.ndarray, steps: np.ndarray, start: int, end: int) -> np.ndarray:
+        """Cells of an event order whose event step, in the sorted steps, is in (start, end]."""
+        # queried with the dtype of the steps, otherwise searchsorted converts the whole array
+        bounds = np.searchsorted(steps, np.array([start, end], dtype=steps.dtype), side='right')
+        return order[bounds[0]:bounds[1]]
+
+    def _burning_cells(self) -> np.ndarray:
+        """Cells burning at the current step."""
+        ignited = self._events(self._by_ignition, self._ignition_steps, self.time - int(self.burn_time.max()) - 1,
+                               self.time)
+        return ignited[self.burn_out_time[ignited] > self.time]
+
+    def _counters(self, cells: np.ndarray, step: int) -> np.ndarray:
+        """Burn counters of cells at a step, the number of times they acted."""
+        first, burn_out = self.first_action[cells], self.burn_out_time[cells]
+        return np.clip(step - first + 1, 0, burn_out - first + 1)
+
+    def step(self):
+        """Advance the fire by one step, applying the ignitions and burn outs due at it."""
+        if self._needs_sweep():
+            self.sweep()
+        self.time += 1
+        landscape = self.model.grid.landscape
+        state = landscape.state.reshape(-1)
+        counter = landscape.burn_counter.reshape(-1)
+        t = self.time
+
+        state[self._events(self._by_ignition, self._ignition_steps, t - 1, t)] = CellState.BURNING
+        burnt = self._events(self._by_burn_out, self._burn_out_steps, t - 1, t)
+        state[burnt] = CellState.BURNT
+        changed = np.concatenate([burnt, self._burning_cells()])
+        counter[changed] = self._counters(changed, t)
+
+    def advance_to(self, step: int):
+        """
+        Advance the fire to a step in a single pass over the cells it reaches.
+
+        Args:
+            step: Step of the fire model to advance to, not before the current one
+        """
+        if self._needs_sweep():
+            self.sweep()
+        self.time = max(step, self.time)
+        landscape = self.model.grid.landscape
+        reached = self._by_ignition
+        landscape.state.reshape(-1)[reached] = self.state_at(self.time, reached)
+        landscape.burn_counter.reshape(-1)[reached] = self._counters(reached, self.time)
+
+    def state_at(self, step: int, cells: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        State of cells at a step of the fire model, from their ignition and burn out steps.
+
+        Cells the fire does not reach keep their current state.
+
+        Args:
+            step: Step of the fire model
+            cells: Flat indices of the cells, all cells if None
+
+        Returns:
+            The states, flat
+        """
+        if self._needs_sweep():
+            self.sweep()
+        if cells is None:
+            cells = np.arange(self.ignition.size)
+        ignition, burn_out = self.ignition[cells], self.burn_out_time[cells]
+        states = self.model.grid.landscape.state.reshape(-1)[cells].copy()
+        reached = (ignition != NEVER) & (ignition != PAST)
+        states[reached] = np.where(step < ignition[reached], CellState.UNBURNT,
+                                   np.where(step < burn_out[reached], CellState.BURNING, CellState.BURNT))
+        return states
+
+    @property
+    def end_time(self) -> int:
+        """Step of the fire model at which the last cell burns out."""
+        if self._needs_sweep():
+            self.sweep()
+        if self._by_burn_out.size == 0:
+            return self.time
+        return max(int(self._burn_out_steps[-1]), self.time)
@@ -1,2 +1,238 @@
-class RothermelModel:
-    pass
+"""
+Rothermel surface fire spread.
+
+The rate of spread through the dead fine fuel of each fuel level is computed with Rothermel's
+(1972) model once, when the fire model is created, for a range of wind speeds and slopes along the
+direction of spread, and kept in a lookup table. A step only gathers rates from the table for the
+edges between the burning cells and their unburnt neighbours.
+
+Spread is time-accumulated: a cell ignites when the front, moving from a burning neighbour at the
+rate of spread of the cell's fuel in that direction, has covered the distance between their
+centres. Fronts crossing several cells within a step ignite each of them at the time they arrive,
+and the progress of fronts that have not reached a cell by the end of the step is carried over.
+"""
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import numpy as np
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.environment.terrain import SLOPE_UNIT
+from src.models.environment.wind import WindField, moore_keys
+from src.models.fire.vectorised import VectorisedFireModel
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+logger = get_logger()
+
+# Unit conversions, the model works in US customary units
+_TONS_PER_ACRE = 0.0459137  # lb/ft²
+_FT_TO_M = 0.3048
+_MS_TO_FT_PER_MIN = 196.85
+
+# Dead fine fuel of the Anderson (1982) fuel model standing for each fuel level:
+# (load lb/ft², surface-area-to-volume ratio 1/ft, fuel bed depth ft, moisture of extinction)
+FUEL_MODELS = {
+    FuelLevel.LOW: (0.74 * _TONS_PER_ACRE, 3500, 1.0, 0.12),  # 1, short grass
+    FuelLevel.MEDIUM: (1.0 * _TONS_PER_ACRE, 2000, 2.0, 0.20),  # 5, brush
+    FuelLevel.HIGH: (3.01 * _TONS_PER_ACRE, 2000, 1.0, 0.25),  # 10, timber litter and understory
+}
+
+# Fuel particle properties shared by all fuel models
+PARTICLE_DENSITY = 32.0  # lb/ft³
+HEAT_CONTENT = 8000.0  # BTU/lb
+MINERAL_TOTAL = 0.0555
+MINERAL_EFFECTIVE = 0.010
+
+
+def rate_of_spread(fuel_level: FuelLevel, wind_speed, slope, moisture: float) -> np.ndarray:
+    """
+    Rothermel's rate of spread through the fuel of a fuel level.
+
+    Args:
+        fuel_level: Fuel level of the cells
+        wind_speed: Midflame wind speed along the direction of spread in m/s, array or scalar
+        slope: Tangent of the upward slope along the direction of spread, array or scalar
+        moisture: Dead fuel moisture content, as a fraction of the dry weight
+
+    Returns:
+        The rate of spread in m/min, broadcast over wind_speed and slope
+    """
+    wind_speed, slope = np.broadcast_arrays(np.asarray(wind_speed, dtype=float), np.asarray(slope, dtype=float))
+    if fuel_level not in FUEL_MODELS:
+        return np.zeros(wind_speed.shape)
+    load, sav, depth, extinction = FUEL_MODELS[fuel_level]
+
+    # Fuel bed
+    bulk_density = load / depth
+    packing = bulk_density / PARTICLE_DENSITY
+    optimum_packing = 3.348 * sav ** -0.8189
+    relative_packing = packing / optimum_packing
+
+    # Reaction intensity
+    a = 133 * sav ** -0.7913
+    max_velocity = sav ** 1.5 / (495 + 0.0594 * sav ** 1.5)
+    velocity = max_velocity * relative_packing ** a * np.exp(a * (1 - relative_packing))
+    # no spread at or above the moisture of extinction
+    rm = moisture / extinction
+    moisture_damping = 1 - 2.59 * rm + 5.11 * rm ** 2 - 3.52 * rm ** 3 if rm < 1 else 0.0
+    mineral_damping = 0.174 * MINERAL_EFFECTIVE ** -0.19
+    intensity = velocity * load * (1 - MINERAL_TOTAL) * HEAT_CONTENT * moisture_damping * mineral_damping
+
+    # Heat reaching the fuel ahead of the front and heat needed to ignite it
+    propagating_flux = np.exp((0.792 + 0.681 * sav ** 0.5) * (packing + 0.1)) / (192 + 0.2595 * sav)
+    heating = np.exp(-138 / sav)
+    ignition_heat = 250 + 1116 * moisture
+
+    # Wind and slope factors, the wind speed limited to 0.9 times the reaction intensity
+    c = 7.47 * np.exp(-0.133 * sav ** 0.55)
+    b = 0.02526 * sav ** 0.54
+    e = 0.715 * np.exp(-3.59e-4 * sav)
+    wind = np.minimum(np.maximum(wind_speed, 0) * _MS_TO_FT_PER_MIN, 0.9 * intensity)
+    phi_wind = c * wind ** b * relative_packing ** -e
+    phi_slope = 5.275 * packing ** -0.3 * np.maximum(slope, 0) ** 2
+
+    spread = intensity * propagating_flux * (1 + phi_wind + phi_slope) / (bulk_density * heating * ignition_heat)
+    return spread * _FT_TO_M
+
+
+class RothermelModel(VectorisedFireModel):
+    """Fire spread with rates of spread from Rothermel's surface fire model.
+
+    The fire spreads fastest downwind, at the rate of the table for the wind speed of the burning
+    cell, and slower in the other directions, along the fire ellipse of its wind bin. The slope bin
+    of each edge comes from the directional slopes of the terrain, downhill edges spread as on flat
+    ground.
+
+    A cell keeps burning long enough for the front of the slowest fuel to cross to its diagonal
+    neighbours without wind, so the fire does not stall where it passes into slower fuel.
+    """
+    # Resolution and number of the slope bins of the table, as the tangent of the slope
+    SLOPE_STEP = 0.05
+    SLOPE_BINS = 41
+
+    def __init__(self, model: 'SimulationModel'):
+        super().__init__(model)
+        config = model.config
+        self.cell_size = config.get("landscape.cell_size", 10.0)
+        self.step_minutes = config.get("fire.step_minutes", 1.0)
+        self.moisture = config.get("fire.fuel_moisture", 0.06)
+
+        # Rate of spread in m/min indexed by [fuel level, wind speed bin, slope bin]
+        levels = sorted(FuelLevel)
+        wind = np.arange(WindField.SPEED_BINS) * WindField.SPEED_STEP
+        slope = np.arange(self.SLOPE_BINS) * self.SLOPE_STEP
+        self.ros_table = np.stack([rate_of_spread(level, wind[:, None], slope[None, :], self.moisture)
+                                   for level in levels]).astype(np.float32)
+
+        # Slope bin of each directional slope value of the terrain, indexed by value + 128
+        tangent = np.arange(-128, 128) * SLOPE_UNIT
+        self._slope_bins = np.clip(np.round(tangent / self.SLOPE_STEP), 0, self.SLOPE_BINS - 1).astype(np.intp)
+
+        # Steps per metre along each Moore direction, keyed like MOORE_DIRECTIONS
+        dx, dy = np.divmod(np.arange(9), 3)
+        length = np.maximum(np.hypot(dx - 1, dy - 1), 1)
+        self._step_per_metre = (self.step_minutes / (self.cell_size * length)).astype(np.float32)
+
+        # Burn time in steps: the front of the slowest fuel crossing a diagonal, then the flame
+        # residence time of the fuel, 384 / sav minutes
+        no_wind = self.ros_table[:, 0, 0]
+        slowest = no_wind[no_wind > 0].min() if np.any(no_wind > 0) else np.inf
+        crossing = self.cell_size * np.sqrt(2) / slowest
+        burn_time = [np.ceil((crossing + 384 / FUEL_MODELS[level][1]) / self.step_minutes)
+                     if level in FUEL_MODELS and no_wind[level] > 0 else 0 for level in levels]
+        if max(burn_time) > np.iinfo(np.uint8).max:
+            raise ValueError(f"Cells would burn for {max(burn_time):.0f} steps, more than the burn counter holds, "
+                             f"use longer fire.step_minutes or a smaller landscape.cell_size")
+        self.burn_time = np.array(burn_time, dtype=np.uint8)
+
+        # Fraction of the distance to each cell covered by the front, carried over between steps
+        self._progress: np.ndarray = None
+        # Scratch arrays over the flat grid, only the visited cells are reset after each step
+        self._arrival: np.ndarray = None
+        self._advance: np.ndarray = None
+
+    def _allocate(self, size: int):
+        self._progress = np.zeros(size, dtype=np.float32)
+        self._arrival = np.full(size, np.inf, dtype=np.float32)
+        self._advance = np.zeros(size, dtype=np.float32)
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        return {} if self._progress is None else {'progress': self._progress}
+
+    def set_arrays(self, arrays: Dict[str, np.ndarray]):
+        if 'progress' in arrays:
+            self._allocate(arrays['progress'].size)
+            self._progress[:] = arrays['progress']
+
+    def step(self):
+        """Advance the fire by step_minutes."""
+        landscape = self.model.grid.landscape
+        state = landscape.state.reshape(-1)
+        fuel = landscape.fuel.reshape(-1)
+        counter = landscape.burn_counter.reshape(-1)
+        if self._arrival is None or self._arrival.size != state.size:
+            self._allocate(state.size)
+
+        if self._burning is None:
+            self.reset_front()
+        burning = self._burning
+        if burning.size == 0:
+            return
+
+        counter[burning] += 1
+        burns_out = counter[burning] >= self.burn_time[fuel[burning]]
+        state[burning[burns_out]] = CellState.BURNT
+        actors = burning[~burns_out]
+
+        # Earliest arrival of a front at each cell within the step. The cells ignited in the step
+        # stay unburnt in the state until the end, so an earlier front can still replace the arrival
+        self._arrival[actors] = 0
+        sources, reached = actors, []
+        while sources.size:
+            targets, index, rate = self._edges(sources, landscape)
+            with np.errstate(divide='ignore'):
+                times = self._arrival[sources[index]] + (1 - self._progress[targets]) / rate
+            arrives = times <= 1
+            targets, times = targets[arrives], times[arrives]
+            before = self._arrival[targets]
+            np.minimum.at(self._arrival, targets, times)
+            sources = np.unique(targets[self._arrival[targets] < before])
+            reached.append(sources)
+
+        ignited = np.unique(np.concatenate(reached)) if reached else np.empty(0, dtype=np.int64)
+        state[ignited] = CellState.BURNING
+        self._progress[ignited] = 0
+        counter[ignited] = 0
+
+        # Fronts that do not reach a cell in the step carry their progress over
+        front = np.concatenate([actors, ignited])
+        targets, index, rate = self._edges(front, landscape)
+        np.maximum.at(self._advance, targets, rate * (1 - self._arrival[front[index]]))
+        targets = np.unique(targets)
+        self._progress[targets] = np.minimum(self._progress[targets] + self._advance[targets], 1)
+        self._advance[targets] = 0
+
+        self._arrival[front] = np.inf
+        self._burning = front
+
+    def _edges(self, sources: np.ndarray, landscape) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Edges from the sources to their unburnt Moore neighbours, with the rate of spread along them.
+
+        Args:
+            sources: Flat indices of the burning cells
+            landscape: The landscape state
+
+        Returns:
+            Flat indices of the neighbours, the index of their source in sources and the fraction of
+            the edge the front covers in one step
+        """
+        targets, index = self._neighbours(sources, landscape)
+        origins = sources[index]
+        key = moore_keys(origins, targets, landscape.height)
+        wind, terrain = self.model.grid.wind, self.model.grid.terrain
+        bins = wind.bins(origins)
+        slope = 0 if terrain.flat else self._slope_bins[terrain.directional_slopes(origins, key).astype(np.intp) + 128]
+        ros = self.ros_table[landscape.fuel.reshape(-1)[targets], bins // WindField.DIRECTION_BINS, slope]
+        return targets, index, ros * wind.ellipses[bins, key] * self._step_per_metre[key]
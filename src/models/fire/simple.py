@@ -1,8 +1,11 @@
-from typing import TYPE_CHECKING, Dict, List, Tuple
+import heapq
+import itertools
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
-from src.agents.cell import Cell, FuelLevel
+from src.agents.cell import Cell, CellState, FuelLevel
+from src.models.environment.wind import moore_keys
 from src.utils.logging_config import get_logger
 
 if TYPE_CHECKING:
@@ -10,6 +13,10 @@ if TYPE_CHECKING:
 
 logger = get_logger()
 
+# Plain ints, comparing numpy values with the enum members is much slower
+_UNBURNT = int(CellState.UNBURNT)
+_BURNING = int(CellState.BURNING)
+
 
 class SimpleFireModel:
     """Simple fire spread model."""
@@ -18,8 +25,8 @@ class SimpleFireModel:
         self.model = model
 
         # Get grid dimensions
-        self.width = model.config.config.simulation._width
-        self.height = model.config.config.simulation._height
+        self.width = model.grid.width
+        self.height = model.grid.height
 
         # Base probabilities for fire spread based on fuel level
         # 678
@@ -38,24 +45,154 @@ class SimpleFireModel:
             FuelLevel.HIGH: 4,
         }
 
+        # Active set of burning cells, built from the landscape on the first step and then updated
+        # as cells ignite and burn out
+        self._burning: Set[Tuple[int, int]] = None
+
+        # Schedule of the current step, turns drawn in [0, 1)
+        self._queue: List[Tuple[float, Tuple[int, int]]] = []
+        self._turn: float = None
+
+    @property
+    def burning(self) -> Optional[Set[Tuple[int, int]]]:
+        """Positions of the burning cells the model acts on, None if the front is not built yet.
+
+        Read through get_front, so it is the same for every fire model.
+        """
+        front = self.get_front()
+        return None if front is None else set(map(tuple, front.tolist()))
+
+    def reset_front(self):
+        """Rebuild the active set from the landscape state.
+
+        Must be called after writing to the state arrays without going through ignite.
+        """
+        landscape = self.model.grid.landscape
+        self._burning = set(landscape.positions(landscape.on_fire))
+
+    def get_front(self) -> Optional[np.ndarray]:
+        """Positions of the active set in the order they act, None if it is not built yet."""
+        if self._burning is None:
+            return None
+        return np.array(sorted(self._burning), dtype=np.int64).reshape(-1, 2)
+
+    def set_front(self, front: Optional[np.ndarray]):
+        """Restore an active set saved with get_front."""
+        self._burning = None if front is None else set(map(tuple, front.tolist()))
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        """State of the fire model beyond the landscape and the front, saved with checkpoints."""
+        return {}
+
+    def set_arrays(self, arrays: Dict[str, np.ndarray]):
+        """Restore the arrays saved from get_arrays."""
+
+    def frontier(self) -> Set[Tuple[int, int]]:
+        """Unburnt cells next to a burning cell, the cells that can ignite in the next step."""
+        if self._burning is None:
+            self.reset_front()
+        landscape = self.model.grid.landscape
+        return {pos for burning in self._burning
+                for pos in self.model.grid.get_neighborhood(burning, moore=True, include_center=False)
+                if landscape.state[pos] == CellState.UNBURNT}
+
+    def ignite(self, pos: Tuple[int, int]):
+        """Set a cell on fire.
+
+        Args:
+            pos: Position of the cell
+        """
+        self.model.grid.landscape.state[pos] = CellState.BURNING
+        if self._burning is None:
+            return
+        self._burning.add(pos)
+
+        # A cell ignited during a step acts in the same step if its turn has not passed yet
+        if self._turn is not None:
+            turn = self.model.streams.fire.random()
+            if turn > self._turn:
+                heapq.heappush(self._queue, (turn, pos))
+
+    def burn_out(self, pos: Tuple[int, int]):
+        """Mark a burning cell as burnt."""
+        self.model.grid.landscape.state[pos] = CellState.BURNT
+        self._burning.discard(pos)
+
+    def step(self):
+        """Advance the fire by one step.
+
+        Only the active set is visited. Each burning cell acts at a random turn within the step, so
+        as with the random sweep over every cell, a cell ignited before its own turn spreads fire in
+        the same step. The cost of a step scales with the fire front rather than the landscape.
+        """
+        if self._burning is None:
+            self.reset_front()
+
+        # Sorted so the step depends only on the burning cells, not on the history of the set
+        front = sorted(self._burning)
+        self._queue = list(zip(self.model.streams.fire.random(len(front)).tolist(), front))
+        heapq.heapify(self._queue)
+        self._turn = 0.0
+        while self._queue:
+            self._turn, pos = heapq.heappop(self._queue)
+            self._spread_from(pos)
+        self._turn = None
+
     def calculate_fire_spread(self, cell: Cell):
         """Calculate fire spread for a cell.
 
         Args:
             cell: The cell to evaluate
         """
+        self._spread_from(cell.pos)
+
+    def spread_factors(self, sources: np.ndarray, targets: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Wind and slope multipliers of the spread probability from each source to its neighbour.
+
+        Args:
+            sources: Flat indices of the burning cells
+            targets: Flat indices of their Moore neighbours
+
+        Returns:
+            The multipliers, None without wind and on flat ground
+        """
+        grid = self.model.grid
+        if grid.wind.calm and grid.terrain.flat:
+            return None
+        keys = moore_keys(sources, targets, grid.landscape.height)
+        factors = np.ones(len(targets), dtype=np.float32)
+        if not grid.wind.calm:
+            factors *= grid.wind.multiplier(sources, keys)
+        if not grid.terrain.flat:
+            factors *= grid.terrain.multiplier(sources, keys)
+        return factors
+
+    def _spread_from(self, pos: Tuple[int, int]):
+        """Count down the burn time of a burning cell and roll the spread to its unburnt neighbours.
+
+        The spread probabilities are scaled by the wind and slope multipliers of the cell in the
+        direction of each neighbour.
+        """
+        landscape = self.model.grid.landscape
+        state = landscape.state.reshape(-1)
+        fuel = landscape.fuel.reshape(-1)
+        counter = landscape.burn_counter.reshape(-1)
+        index = pos[0] * landscape.height + pos[1]
 
-        if not cell.on_fire:
+        if state[index] != _BURNING:
             return
 
-        cell.burn_counter += 1
-        if cell.burn_counter >= self.burn_times[cell.fuel_level]:
-            cell.on_fire = False
-            cell.burnt = True
+        counter[index] += 1
+        if counter[index] >= self.burn_times[fuel[index]]:
+            self.burn_out(pos)
             return
 
-        neighbours = self.model.grid.get_neighbors(pos=cell.pos, moore=True, radius=1)
-        neighbours: List[Cell] = [n for n in neighbours if isinstance(n, Cell) and not n.burnt and not n.on_fire]
-        for neighbour in neighbours:
-            if self.model.random.random() < self.base_probabilities[neighbour.fuel_level]:
-                neighbour.on_fire = True
+        neighbours = self.model.grid.neighbourhood_table(1, moore=True, include_center=False).indices(pos)
+        neighbours = neighbours[state[neighbours] == _UNBURNT]
+        rolls = self.model.streams.fire.random(len(neighbours)).tolist()
+        factors = self.spread_factors(np.full(len(neighbours), index), neighbours)
+        factors = itertools.repeat(1.0) if factors is None else factors.tolist()
+        for neighbour, roll, factor in zip(neighbours.tolist(), rolls, factors):
+            if roll < self.base_probabilities[fuel[neighbour]] * factor:
+                self.ignite(divmod(neighbour, landscape.height))
@@ -0,0 +1,168 @@
+from typing import TYPE_CHECKING, Optional, Set, Tuple
+
+import numpy as np
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.fire.simple import SimpleFireModel
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+logger = get_logger()
+
+
+class VectorisedFireModel(SimpleFireModel):
+    """Simple fire spread model advanced with batched NumPy operations.
+
+    Uses the same spread probabilities and burn times as SimpleFireModel and reproduces its
+    random sweep order statistically: every cell acts at a uniform random time within the step, and
+    a cell ignited before its own turn acts in the same step. Only the burning cells and their
+    Moore neighbours are visited, so the cost of a step scales with the fire front.
+    """
+
+    def __init__(self, model: 'SimulationModel'):
+        super().__init__(model)
+
+        # Lookup tables indexed by fuel level
+        levels = sorted(FuelLevel)
+        self.spread_probability = np.array([self.base_probabilities[level] for level in levels], dtype=float)
+        self.burn_time = np.array([self.burn_times[level] for level in levels], dtype=np.uint8)
+
+        # Flat indices of the burning cells
+        self._burning: np.ndarray = None
+
+        # Scratch arrays over the flat grid, only the visited cells are reset after each step
+        self._ignition_time: np.ndarray = None
+        self._turn: np.ndarray = None
+        self._acted: np.ndarray = None
+
+    def _allocate(self, size: int):
+        self._ignition_time = np.full(size, np.inf)
+        self._turn = np.full(size, np.nan)
+        self._acted = np.zeros(size, dtype=bool)
+
+    def reset_front(self):
+        """Rebuild the active set from the landscape state."""
+        self._burning = np.flatnonzero(self.model.grid.landscape.on_fire)
+
+    def get_front(self) -> Optional[np.ndarray]:
+        if self._burning is None:
+            return None
+        return np.stack(np.unravel_index(self._burning, self.model.grid.landscape.state.shape), axis=1)
+
+    def set_front(self, front: Optional[np.ndarray]):
+        if front is None:
+            self._burning = None
+        else:
+            self._burning = np.ravel_multi_index((front[:, 0], front[:, 1]), self.model.grid.landscape.state.shape)
+
+    def frontier(self) -> Set[Tuple[int, int]]:
+        if self._burning is None:
+            self.reset_front()
+        landscape = self.model.grid.landscape
+        targets, _ = self._neighbours(self._burning, landscape)
+        x, y = np.divmod(np.unique(targets), landscape.height)
+        return set(zip(x.tolist(), y.tolist()))
+
+    def ignite(self, pos: Tuple[int, int]):
+        landscape = self.model.grid.landscape
+        if landscape.state[pos] == CellState.BURNING:
+            return
+        landscape.state[pos] = CellState.BURNING
+        if self._burning is not None:
+            index = np.ravel_multi_index(pos, landscape.state.shape)
+            self._burning = np.append(self._burning, index)
+
+    def step(self):
+        """Advance the whole fire by one step."""
+        landscape = self.model.grid.landscape
+        state = landscape.state.reshape(-1)
+        fuel = landscape.fuel.reshape(-1)
+        counter = landscape.burn_counter.reshape(-1)
+        rng = self.model.streams.fire
+        if self._ignition_time is None or self._ignition_time.size != state.size:
+            self._allocate(state.size)
+
+        if self._burning is None:
+            self.reset_front()
+        burning = self._burning
+        if burning.size == 0:
+            return
+
+        # Burning cells count down and burn out, the rest spread at their turn in the step
+        counter[burning] += 1
+        burns_out = counter[burning] >= self.burn_time[fuel[burning]]
+        state[burning[burns_out]] = CellState.BURNT
+        actors = burning[~burns_out]
+        actors_at_start = actors
+        actor_turn = rng.random(actors.size)
+
+        visited = []
+        while actors.size:
+            targets, times = self._spread(actors, actor_turn, landscape)
+            if targets.size == 0:
+                break
+
+            # A cell is ignited by the earliest successful neighbour
+            np.minimum.at(self._ignition_time, targets, times)
+            targets = np.unique(targets)
+            fresh = targets[np.isnan(self._turn[targets])]
+            self._turn[fresh] = rng.random(fresh.size)
+            visited.append(fresh)
+
+            # Cells ignited before their own turn act in this step
+            acts = targets[(self._ignition_time[targets] < self._turn[targets]) & ~self._acted[targets]]
+            self._acted[acts] = True
+            actors = acts[self.burn_time[fuel[acts]] > 1]
+            actor_turn = self._turn[actors]
+
+        if not visited:
+            self._burning = actors_at_start
+            return
+        visited = np.concatenate(visited)
+        acted = visited[self._acted[visited]]
+
+        state[visited] = CellState.BURNING
+        counter[acted] = 1
+        state[acted[counter[acted] >= self.burn_time[fuel[acted]]]] = CellState.BURNT
+
+        self._burning = np.concatenate([actors_at_start, visited[state[visited] == CellState.BURNING]])
+
+        self._ignition_time[visited] = np.inf
+        self._turn[visited] = np.nan
+        self._acted[visited] = False
+
+    def _neighbours(self, cells: np.ndarray, landscape) -> Tuple[np.ndarray, np.ndarray]:
+        """Unburnt neighbours of the given cells, from the neighbourhood table of the grid.
+
+        Args:
+            cells: Flat indices of the cells
+            landscape: The landscape state
+
+        Returns:
+            Flat indices of the neighbours and, for each of them, the index of its source in cells
+        """
+        table = self.model.grid.neighbourhood_table(1, moore=True, include_center=False)
+        targets, sources = table.neighbours(cells)
+        unburnt = landscape.state.reshape(-1)[targets] == CellState.UNBURNT
+        return targets[unburnt], sources[unburnt]
+
+    def _spread(self, actors: np.ndarray, turn: np.ndarray, landscape) -> Tuple[np.ndarray, np.ndarray]:
+        """Roll the spread from each actor to its unburnt Moore neighbours, with the wind and slope multipliers.
+
+        Args:
+            actors: Flat indices of the spreading cells
+            turn: Time of each actor's turn within the step
+            landscape: The landscape state
+
+        Returns:
+            Flat indices of the successfully ignited neighbours and the time of the ignition
+        """
+        targets, sources = self._neighbours(actors, landscape)
+        p = self.spread_probability[landscape.fuel.reshape(-1)[targets]]
+        factors = self.spread_factors(actors[sources], targets)
+        if factors is not None:
+            p = p * factors
+        success = self.model.streams.fire.random(targets.size) < p
+        return targets[success], turn[sources[success]]
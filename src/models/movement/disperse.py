@@ -22,21 +22,23 @@ def disperse(drone: 'Drone') -> np.array:
     desired_distance: int = int(drone.desired_distance) * 10
 
     # drones in communication range
-    neighbours: list['Drone'] = drone.get_neighbours()
+    neighbours: list['Drone'] = drone.model.grid.get_agents_in_range(
+        drone.pos, drone.communication_range, type(drone), exclude=drone
+    )
 
 
     movement_vector = np.array([random.uniform(-2, 2), random.uniform(-1, 3)])
     if not neighbours:
-        logger.debug(f"Drone {drone.unique_id} has no neighbours")
+        logger.debug("Drone {} has no neighbours", drone.unique_id)
         return movement_vector
 
     # If both the left and right leaders are equidistant then the forces will cancel out
     if not drone.left_leader:
-        logger.debug(f"Drone {drone.unique_id} has no left leader")
+        logger.debug("Drone {} has no left leader", drone.unique_id)
         # select the first in the neighbours list that has no right leader
         # leave empty if not found (placed on the edge)
         leader = next((n for n in neighbours if n.pos[0] <= drone.pos[0] and not n.right_leader and n not in drone.neighbouring_leaders and drone not in n.neighbouring_leaders), None)
-        logger.debug(f"Leader to assign: {leader.unique_id if leader else None}")
+        logger.debug("Leader to assign: {}", leader.unique_id if leader else None)
         if leader:
             drone.left_leader = leader
             leader.right_leader = drone
@@ -44,9 +46,9 @@ def disperse(drone: 'Drone') -> np.array:
             leader.neighbouring_leaders.append(drone)
 
     if not drone.right_leader:
-        logger.debug(f"Drone {drone.unique_id} has no right leader")
+        logger.debug("Drone {} has no right leader", drone.unique_id)
         leader = next((n for n in neighbours if n.pos[0] >= drone.pos[0] and not n.left_leader and n not in drone.neighbouring_leaders and drone not in n.neighbouring_leaders), None)
-        logger.debug(f"Leader to assign: {leader.unique_id if leader else None}")
+        logger.debug("Leader to assign: {}", leader.unique_id if leader else None)
         if leader:
             drone.right_leader = leader
             leader.left_leader = drone
@@ -54,9 +56,9 @@ def disperse(drone: 'Drone') -> np.array:
             leader.neighbouring_leaders.append(drone)
 
     if not drone.top_leader:
-        logger.debug(f"Drone {drone.unique_id} has no top leader")
+        logger.debug("Drone {} has no top leader", drone.unique_id)
         leader = next((n for n in neighbours if n.pos[1] >= drone.pos[1] and not n.bottom_leader and n not in drone.neighbouring_leaders and drone not in n.neighbouring_leaders), None)
-        logger.debug(f"Leader to assign: {leader.unique_id if leader else None}")
+        logger.debug("Leader to assign: {}", leader.unique_id if leader else None)
         if leader:
             drone.top_leader = leader
             leader.bottom_leader = drone
@@ -64,9 +66,9 @@ def disperse(drone: 'Drone') -> np.array:
             leader.neighbouring_leaders.append(drone)
 
     if not drone.bottom_leader:
-        logger.debug(f"Drone {drone.unique_id} has no bottom leader")
+        logger.debug("Drone {} has no bottom leader", drone.unique_id)
         leader = next((n for n in neighbours if n.pos[1] <= drone.pos[1] and not n.top_leader and n not in drone.neighbouring_leaders and drone not in n.neighbouring_leaders), None)
-        logger.debug(f"Leader to assign: {leader.unique_id if leader else None}")
+        logger.debug("Leader to assign: {}", leader.unique_id if leader else None)
         if leader:
             drone.bottom_leader = leader
             leader.top_leader = drone
@@ -74,16 +76,16 @@ def disperse(drone: 'Drone') -> np.array:
             leader.neighbouring_leaders.append(drone)
 
     if drone.left_leader:
-        logger.debug(f"Drone {drone.unique_id} has left leader {drone.left_leader.unique_id}")
+        logger.debug("Drone {} has left leader {}", drone.unique_id, drone.left_leader.unique_id)
         movement_vector = apply_force(drone, drone.left_leader, movement_vector, desired_distance, horizontal=True)
     if drone.right_leader:
-        logger.debug(f"Drone {drone.unique_id} has right leader {drone.right_leader.unique_id}")
+        logger.debug("Drone {} has right leader {}", drone.unique_id, drone.right_leader.unique_id)
         movement_vector = apply_force(drone, drone.right_leader, movement_vector, desired_distance, horizontal=True)
     if drone.top_leader:
-        logger.debug(f"Drone {drone.unique_id} has top leader {drone.top_leader.unique_id}")
+        logger.debug("Drone {} has top leader {}", drone.unique_id, drone.top_leader.unique_id)
         movement_vector = apply_force(drone, drone.top_leader, movement_vector, desired_distance, horizontal=False)
     if drone.bottom_leader:
-        logger.debug(f"Drone {drone.unique_id} has bottom leader {drone.bottom_leader.unique_id}")
+        logger.debug("Drone {} has bottom leader {}", drone.unique_id, drone.bottom_leader.unique_id)
         movement_vector = apply_force(drone, drone.bottom_leader, movement_vector, desired_distance, horizontal=False)
 
     return movement_vector
@@ -107,7 +109,7 @@ def apply_force(drone: 'Drone', leader: 'Drone', movement_vector: np.array, desi
 
     force = np.array([f_x, f_y])
     movement_vector += force
-    logger.debug(f"Drone {drone.unique_id} force: {force}")
+    logger.debug("Drone {} force: {}", drone.unique_id, force)
 
     return movement_vector
 
@@ -0,0 +1 @@
+# Swarm models package initialization
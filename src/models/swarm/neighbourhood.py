@@ -0,0 +1,137 @@
+"""
+Swarm-wide neighbourhood pass.
+
+In synchronous mode the neighbour lists of all the drones are built once per step, then the
+neighbour list, same-cell drones and nearest neighbour of every drone are answered from that shared
+result.
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+if TYPE_CHECKING:
+    from src.agents.drone import Drone
+    from src.models.environment.environment import GridEnvironment
+
+
+class SwarmNeighbourhood:
+    """
+    Shared neighbourhood of a swarm within a communication range.
+
+    In sequential mode, where each drone sees the moves of the drones stepped before it, the
+    queries go to the grid spatial hash, which follows every move. In synchronous mode all drones
+    see the positions at the start of the step, so the neighbour lists are built once per step with
+    a KD-tree. A full (N, N) distance matrix was slower than both at every swarm size measured.
+
+    Neighbours are ordered by position, the order the grid neighbourhood is walked in, so ties for
+    the nearest neighbour resolve the same way as a query on the grid.
+    """
+    def __init__(self, grid: 'GridEnvironment', radius: int, synchronous: bool = False):
+        """
+        Args:
+            grid: The grid the drones are placed on
+            radius: Communication range, as a Chebyshev distance
+            synchronous: Whether the drones decide on the positions at the start of the step
+        """
+        self.grid = grid
+        self.radius = int(radius)
+        self.synchronous = synchronous
+
+        self.drones: List['Drone'] = []
+        self._index: Dict['Drone', int] = {}
+        self.positions: np.ndarray = np.empty((0, 2), dtype=np.int32)
+
+        # Sparse neighbour lists (CSR) and nearest neighbours, used with the KD-tree
+        self._indptr: Optional[np.ndarray] = None
+        self._indices: Optional[np.ndarray] = None
+        self._nearest: Optional[np.ndarray] = None
+        self._nearest_distance: Optional[np.ndarray] = None
+
+    @property
+    def mode(self) -> str:
+        """How the neighbourhood is answered: 'kdtree' or 'grid'."""
+        return 'kdtree' if self.synchronous else 'grid'
+
+    def update(self, drones: Sequence['Drone']) -> None:
+        """
+        Build the neighbourhood of the swarm from the current drone positions.
+
+        Args:
+            drones: All the drones of the swarm
+        """
+        self._indptr = self._indices = self._nearest = self._nearest_distance = None
+        if not self.synchronous:
+            # the grid answers the queries
+            self.drones, self._index = [], {}
+            return
+        self.drones = list(drones)
+        self._index = {drone: i for i, drone in enumerate(self.drones)}
+        self.positions = np.array([drone.pos for drone in self.drones], dtype=np.int32).reshape(-1, 2)
+        self._build_sparse()
+
+    def _order_key(self, positions: np.ndarray) -> np.ndarray:
+        """Key sorting positions in x-major order."""
+        return positions[..., 0].astype(np.int64) * self.grid.height + positions[..., 1]
+
+    def _build_sparse(self) -> None:
+        n = len(self.drones)
+        pairs = cKDTree(self.positions).query_pairs(self.radius, p=np.inf, output_type='ndarray')
+        source = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        target = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        distance = np.abs(self.positions[source] - self.positions[target]).max(axis=1)
+
+        # group by source, each group ordered like the grid neighbourhood
+        order = np.lexsort((target, self._order_key(self.positions[target]), source))
+        source, target, distance = source[order], target[order], distance[order]
+        self._indices = target
+        self._indptr = np.searchsorted(source, np.arange(n + 1))
+
+        # nearest neighbour: smallest distance, then first in grid order
+        self._nearest = np.full(n, -1)
+        self._nearest_distance = np.full(n, -1)
+        if target.size:
+            by_distance = np.lexsort((np.arange(target.size), distance, source))
+            grouped = source[by_distance]
+            first = by_distance[np.r_[True, grouped[1:] != grouped[:-1]]]
+            self._nearest[source[first]] = target[first]
+            self._nearest_distance[source[first]] = distance[first]
+
+    def neighbours(self, drone: 'Drone') -> List['Drone']:
+        """
+        Get the drones within communication range of a drone, excluding itself.
+        """
+        i = self._index.get(drone)
+        if i is None:
+            return self.grid.get_agents_in_range(drone.pos, self.radius, type(drone), exclude=drone)
+        js = self._indices[self._indptr[i]:self._indptr[i + 1]]
+        return [self.drones[j] for j in js]
+
+    def same_cell(self, drone: 'Drone') -> List['Drone']:
+        """
+        Get the other drones in the same cell as a drone.
+        """
+        i = self._index.get(drone)
+        if i is None:
+            return self.grid.get_agents_in_range(drone.pos, 0, type(drone), exclude=drone)
+        js = self._indices[self._indptr[i]:self._indptr[i + 1]]
+        js = js[np.all(self.positions[js] == self.positions[i], axis=1)]
+        return [self.drones[j] for j in js if j != i]
+
+    def nearest(self, drone: 'Drone') -> Tuple[Optional['Drone'], int]:
+        """
+        Get the nearest drone within communication range.
+
+        Returns:
+            The nearest drone and its Chebyshev distance, or (None, -1) if no drone is in range
+        """
+        i = self._index.get(drone)
+        if i is None:
+            neighbours = self.neighbours(drone)
+            if not neighbours:
+                return None, -1
+            nearest = min(neighbours, key=lambda n: drone.chebyshev_distance(n.pos))
+            return nearest, drone.chebyshev_distance(nearest.pos)
+
+        j = self._nearest[i]
+        return (self.drones[j], int(self._nearest_distance[i])) if j >= 0 else (None, -1)
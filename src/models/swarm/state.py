@@ -0,0 +1,128 @@
+"""
+Struct-of-arrays state of the swarm.
+
+The positions, targets, base positions, colours and debug flags of all drones are held in NumPy
+arrays, one row per drone, and each Drone is a handle holding its row index. Vectorised code,
+the data collection and the renderers read the arrays directly instead of visiting every agent.
+"""
+from typing import TYPE_CHECKING, List, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.agents.drone import Drone
+
+# Colour of a drone by its code in SwarmState.colors
+COLORS = ('blue', 'red', 'purple', 'yellow')
+COLOR_CODES = {name: code for code, name in enumerate(COLORS)}
+BLUE, RED, PURPLE, YELLOW = range(len(COLORS))
+
+# Coordinate marking a position or target that is not set
+UNSET = np.iinfo(np.int32).min
+
+
+class SwarmState:
+    """
+    Arrays holding the state of every drone, indexed by Drone.index.
+
+    The arrays grow as drones are added. The positions, targets, base_positions, colors and debug
+    properties are views of the rows in use, writes to them update the drones. The ranges are the
+    same for every drone and held once here.
+    """
+    def __init__(self, capacity: int = 64, communication_range: int = 10):
+        """
+        Args:
+            capacity: Number of drones the arrays are allocated for, they grow when needed
+            communication_range: Chebyshev range within which drones communicate
+        """
+        self.communication_range = int(communication_range)
+        # Distance the drones keep to their neighbours in formation
+        self.desired_distance = int(self.communication_range * 0.9)
+        self.size = 0
+        self.drones: List['Drone'] = []
+        self._positions = np.full((capacity, 2), UNSET, dtype=np.int32)
+        self._targets = np.full((capacity, 2), UNSET, dtype=np.int32)
+        self._base_positions = np.full((capacity, 2), UNSET, dtype=np.int32)
+        self._colors = np.zeros(capacity, dtype=np.uint8)
+        self._debug = np.zeros(capacity, dtype=bool)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """(N, 2) positions of the drones, UNSET for drones not on the grid."""
+        return self._positions[:self.size]
+
+    @property
+    def targets(self) -> np.ndarray:
+        """(N, 2) target positions of the drones, UNSET where there is no target."""
+        return self._targets[:self.size]
+
+    @property
+    def base_positions(self) -> np.ndarray:
+        """(N, 2) positions of the bases the drones were deployed from."""
+        return self._base_positions[:self.size]
+
+    @property
+    def colors(self) -> np.ndarray:
+        """(N,) colour codes of the drones, indices into COLORS."""
+        return self._colors[:self.size]
+
+    @property
+    def debug(self) -> np.ndarray:
+        """(N,) whether debug logging is on for each drone."""
+        return self._debug[:self.size]
+
+    def add(self, drone: 'Drone') -> int:
+        """
+        Add a row for a drone, with no position or target and the first colour.
+
+        Returns:
+            The index of the row
+        """
+        if self.size == len(self._positions):
+            self._grow(2 * self.size)
+        index = self.size
+        self.size += 1
+        self.drones.append(drone)
+        self._positions[index] = UNSET
+        self._targets[index] = UNSET
+        self._base_positions[index] = UNSET
+        self._colors[index] = 0
+        self._debug[index] = False
+        return index
+
+    def remove(self, drone: 'Drone') -> None:
+        """Remove the row of a drone, the last drone takes its place."""
+        index, last = drone.index, self.size - 1
+        if index != last:
+            moved = self.drones[last]
+            for array in (self._positions, self._targets, self._base_positions, self._colors, self._debug):
+                array[index] = array[last]
+            self.drones[index] = moved
+            moved.index = index
+        self.drones.pop()
+        self.size -= 1
+
+    def reorder(self, drones: Sequence['Drone']) -> None:
+        """Move the rows into the order of the given drones, which must be all drones of the swarm."""
+        order = np.array([drone.index for drone in drones], dtype=np.intp)
+        for array in (self._positions, self._targets, self._base_positions, self._colors, self._debug):
+            array[:self.size] = array[order]
+        self.drones = list(drones)
+        for index, drone in enumerate(self.drones):
+            drone.index = index
+
+    def _grow(self, capacity: int) -> None:
+        capacity = max(capacity, 1)
+        for name in ('_positions', '_targets', '_base_positions', '_colors', '_debug'):
+            array = getattr(self, name)
+            grown = np.full((capacity,) + array.shape[1:], UNSET if array.ndim == 2 else 0, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+
+    def color_names(self, codes: Sequence[int] = None) -> List[str]:
+        """Colour names of the drones, or of the given colour codes."""
+        codes = self.colors if codes is None else codes
+        return [COLORS[code] for code in np.asarray(codes).tolist()]
+
+    def __len__(self) -> int:
+        return self.size
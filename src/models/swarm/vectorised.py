@@ -0,0 +1,160 @@
+"""
+Vectorised swarm kinematics.
+
+Applies the formation rule of Drone to the whole swarm at once with array operations, updating all
+drones synchronously from the positions at the start of the step.
+"""
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from src.models.swarm.state import BLUE, PURPLE, RED, UNSET
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+logger = get_logger()
+
+# Moore neighbourhood offsets, the centre last so it can be left out
+OFFSETS = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy] + [(0, 0)])
+
+
+class VectorisedSwarm:
+    """
+    Synchronous swarm engine working on the swarm state arrays of the model.
+
+    Each step follows Drone.disperse and Drone.formation for every drone: drones sharing a cell
+    move to a random neighbouring cell, drones without neighbours walk randomly, and the others
+    move one step towards or away from their nearest neighbour to reach the desired distance.
+    Targets are kept away from the edges as in Drone.change_target, and every drone then moves one
+    step towards its target as in Drone.move_towards.
+
+    Targets and colours are written to the arrays, the drones that moved are also moved on the grid.
+    """
+    def __init__(self, model: 'SimulationModel'):
+        self.model = model
+        self.state = model.swarm_state
+        self.width = model.grid.width
+        self.height = model.grid.height
+        self.communication_range = self.state.communication_range
+        self.desired_distance = self.state.desired_distance
+
+    def step(self) -> None:
+        """Advance all the drones by one step."""
+        state = self.state
+        if state.size == 0:
+            return
+
+        targets = state.targets
+        # drones set up before their first target are taken to target their position
+        unset = targets[:, 0] == UNSET
+        targets[unset] = state.positions[unset]
+
+        positions = state.positions.copy()
+        keys = self._order_key(positions)
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True,
+                                               return_counts=True)
+        shares_cell = counts[inverse] > 1
+
+        nearest, distance = self._nearest(positions[first])
+        nearest, distance = nearest[inverse], distance[inverse]
+
+        no_neighbours = ~shares_cell & (distance < 0)
+        formation = ~shares_cell & (distance >= 0)
+        too_close = formation & (distance < self.desired_distance)
+        too_far = formation & (distance > self.desired_distance)
+
+        # One step away from or towards the nearest neighbour
+        direction = np.sign(nearest - positions)
+        candidates = positions.copy()
+        candidates[too_close] -= direction[too_close]
+        candidates[too_far] += direction[too_far]
+        candidates[shares_cell] = self._random_neighbour(positions[shares_cell], include_center=False)
+        candidates[no_neighbours] = self._random_neighbour(positions[no_neighbours], include_center=True)
+
+        changed = shares_cell | no_neighbours | too_close | too_far
+        targets[changed] = self._away_from_edges(candidates[changed])
+
+        colors = state.colors
+        colors[:] = BLUE
+        colors[no_neighbours] = RED
+        colors[formation & ~too_close & ~too_far] = PURPLE
+
+        self._move(positions + np.sign(targets - positions).astype(np.int32), positions)
+
+    def _order_key(self, positions: np.ndarray) -> np.ndarray:
+        """Key sorting positions in x-major order, the order the grid neighbourhood is walked in."""
+        return positions[..., 0].astype(np.int64) * self.height + positions[..., 1]
+
+    def _nearest(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest other position within communication range, for distinct positions.
+
+        Ties on the Chebyshev distance resolve to the first position in grid order, as when the
+        drones take the min over their neighbour list.
+
+        Returns:
+            The nearest position and its distance, -1 where no position is in range
+        """
+        m = len(positions)
+        nearest = positions.copy()
+        distance = np.full(m, -1, dtype=np.int64)
+        if m < 2:
+            return nearest, distance
+
+        tree = cKDTree(positions)
+        rows = np.arange(m)
+        k = min(9, m)
+        while rows.size:
+            # The first result is the position itself, the upper bound is exclusive
+            d, idx = tree.query(positions[rows], k=k, p=np.inf,
+                                distance_upper_bound=self.communication_range + 0.5)
+            d, idx = d[:, 1:], idx[:, 1:]
+            d_min = d.min(axis=1)
+            found = np.isfinite(d_min)
+
+            ties = (d == d_min[:, None]) & found[:, None]
+            order = np.where(ties, self._order_key(positions[np.minimum(idx, m - 1)]), np.iinfo(np.int64).max)
+            best = idx[np.arange(rows.size), order.argmin(axis=1)]
+            nearest[rows[found]] = positions[best[found]]
+            distance[rows[found]] = d_min[found]
+
+            # More ties may lie beyond the k results, query those again with a larger k
+            truncated = found & ties[:, -1] & (k < m)
+            rows = rows[truncated]
+            k = min(2 * k, m)
+        return nearest, distance
+
+    def _random_neighbour(self, positions: np.ndarray, include_center: bool) -> np.ndarray:
+        """
+        Random neighbouring cell within the grid for each position, like Drone.get_random_direction.
+        """
+        rng = self.model.streams.swarm
+        choices = len(OFFSETS) if include_center else len(OFFSETS) - 1
+        result = positions.copy()
+        pending = np.arange(len(positions))
+        while pending.size:
+            candidate = positions[pending] + OFFSETS[rng.integers(choices, size=pending.size)]
+            inside = ((candidate[:, 0] >= 0) & (candidate[:, 0] < self.width) &
+                      (candidate[:, 1] >= 0) & (candidate[:, 1] < self.height))
+            result[pending[inside]] = candidate[inside]
+            pending = pending[~inside]
+        return result
+
+    def _away_from_edges(self, targets: np.ndarray) -> np.ndarray:
+        """Move targets away from the grid edges, like Drone.change_target."""
+        targets = targets.copy()
+        for axis, size in ((0, self.width), (1, self.height)):
+            targets[targets[:, axis] <= 5, axis] += 2
+            targets[targets[:, axis] >= size - 5, axis] -= 2
+        return targets
+
+    def _move(self, new_positions: np.ndarray, positions: np.ndarray) -> None:
+        """Move the drones whose position changed on the grid, which updates the positions array."""
+        grid = self.model.grid
+        drones = self.state.drones
+        moved = np.flatnonzero(np.any(new_positions != positions, axis=1))
+        for i, pos in zip(moved.tolist(), new_positions[moved].tolist()):
+            grid.move_agent(drones[i], tuple(pos))
@@ -0,0 +1,160 @@
+"""
+Headless batch runs and parameter sweeps.
+
+A sweep runs the simulation without visualisation for every combination of a grid of config
+overrides. The runs are spread over a pool of worker processes and the summary of each run is
+appended to a JSON lines file as soon as it finishes.
+"""
+import itertools
+import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import yaml
+
+from src.agents.cell import CellState
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.utils.logging_config import get_logger, log
+
+logger = get_logger()
+
+# Short names for the values most sweeps vary
+SWEEP_PARAMETERS = {
+    'bases': 'swarm.initial_bases',
+    'agents': 'swarm.drone_base.number_of_agents',
+    'range': 'swarm.drone.communication_range',
+    'seeds': 'simulation.seed',
+}
+
+
+def parse_values(text: str) -> List[Any]:
+    """
+    Parse a comma separated list of sweep values.
+
+    Each item is read as YAML, so numbers and booleans keep their type, and an item of the form
+    'a-b' with two integers is expanded to the inclusive range a..b.
+
+    Args:
+        text: The list, e.g. '1,2,4' or '0-99'
+
+    Returns:
+        The parsed values
+    """
+    values = []
+    for item in text.split(','):
+        item = item.strip()
+        match = re.fullmatch(r'(\d+)-(\d+)', item)
+        if match:
+            values.extend(range(int(match[1]), int(match[2]) + 1))
+        elif item:
+            values.append(yaml.safe_load(item))
+    return values
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a grid of values into the list of all their combinations.
+
+    Args:
+        grid: Values to try, keyed by their config path
+
+    Returns:
+        One dict of overrides per run
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def run_simulation(config: Config) -> Dict[str, Any]:
+    """
+    Run one simulation to the end without visualisation.
+
+    Args:
+        config: Configuration of the run
+
+    Returns:
+        Summary of the final state of the run
+    """
+    start = time.perf_counter()
+    model = SimulationModel(config)
+    model.start_fire(num_fires=config.get("fire.initial_fires", 1))
+    model.run()
+
+    landscape = model.landscape
+    summary = {
+        'steps': model.steps,
+        'burning': landscape.count(CellState.BURNING),
+        'burnt': landscape.count(CellState.BURNT),
+        'unburnt': landscape.count(CellState.UNBURNT),
+        'drones': len(model.drones),
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+    if model.datacollector and model.datacollector.path:
+        summary['data'] = str(model.datacollector.path)
+    return summary
+
+
+# Base configuration of a worker process, loaded once and reused for all its runs
+_worker_config: Optional[Config] = None
+
+
+def _init_worker(config_path: Optional[str], log_level: str) -> None:
+    global _worker_config
+    log.remove()
+    log.add(sys.stderr, level=log_level)
+    _worker_config = Config(config_path)
+
+
+def _run_job(overrides: Dict[str, Any]) -> Dict[str, Any]:
+    config = _worker_config.with_overrides(overrides)
+    return {'overrides': overrides, **run_simulation(config)}
+
+
+def run_sweep(config_path: Optional[str], grid: Dict[str, Sequence[Any]], output: str,
+              workers: Optional[int] = None, log_level: str = "WARNING") -> int:
+    """
+    Run the simulation for every combination of the grid in a pool of worker processes.
+
+    Args:
+        config_path: Base configuration file, the default config if None
+        grid: Values to try, keyed by their config path (e.g., 'simulation.seed')
+        output: JSON lines file the run summaries are appended to
+        workers: Number of worker processes, the number of CPUs if None
+        log_level: Log level inside the workers
+
+    Returns:
+        The number of runs that failed
+    """
+    jobs = expand_grid(grid)
+
+    # Validate all the overrides before starting any run
+    base = Config(config_path)
+    for job in jobs:
+        base.with_overrides(job)
+
+    output_path = Path(output).expanduser()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Running {len(jobs)} simulations, writing the summaries to {output_path}")
+
+    failed = 0
+    with open(output_path, 'a') as file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(config_path, log_level)) as pool:
+        futures = {pool.submit(_run_job, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                summary = future.result()
+            except Exception as e:
+                failed += 1
+                summary = {'overrides': futures[future], 'error': repr(e)}
+                logger.error(f"Run {futures[future]} failed: {e!r}")
+            file.write(json.dumps(summary) + '\n')
+            file.flush()
+            logger.info(f"Finished {done}/{len(jobs)} runs")
+
+    return failed
@@ -1,23 +1,51 @@
-from typing import TYPE_CHECKING
+import collections
+import itertools
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict
 
 import mesa
 import mesa.agent
+import numpy as np
 
 from src.agents.base import DroneBase
-from src.agents.cell import Cell
+from src.agents.cell import CellState
 from src.agents.drone import Drone
+from src.models.environment.builder import LandscapeBuilder
 from src.models.environment.environment import (GridEnvironment,
                                                 HexEnvironment,
                                                 SpaceEnvironment)
+from src.models.environment.smoke import SmokeField
+from src.models.environment.terrain import Terrain
+from src.models.environment.wind import WindField
+from src.models.fire.arrival import ArrivalTimeFireModel
+from src.models.fire.rothermel import RothermelModel
 from src.models.fire.simple import SimpleFireModel
+from src.models.fire.vectorised import VectorisedFireModel
+from src.models.swarm.neighbourhood import SwarmNeighbourhood
+from src.models.swarm.state import UNSET, SwarmState
+from src.models.swarm.vectorised import VectorisedSwarm
 from src.utils.config import Config
+from src.utils.data_collection import DataCollector
+from src.utils.export import StreamingExporter
 from src.utils.logging_config import get_logger
+from src.utils.profiling import StepProfiler
+from src.utils.random_streams import RandomStreams
 
 if TYPE_CHECKING:
     pass
 # Get logger for this module
 logger = get_logger()
 
+FIRE_MODELS = {
+    'simple': SimpleFireModel,
+    'vectorised': VectorisedFireModel,
+    'rothermel': RothermelModel,
+    'arrival': ArrivalTimeFireModel,
+}
+
 
 class SimulationModel(mesa.Model):
     """
@@ -38,21 +66,59 @@ class SimulationModel(mesa.Model):
         self.config = config or Config()
 
         super().__init__(seed=self.config.get("simulation.seed", None))
-        # Initialise fire spread model
-        self.fire_model = SimpleFireModel(self)
+        # Largest unique_id given to an agent of this model, kept up to date by register_agent
+        self.last_agent_id = 0
+        # Timing of the phases of each step, a no-op unless enabled
+        self.profiler = StepProfiler(enabled=self.config.get("simulation.profile", False))
+        # Random number generators of the terrain, fire, swarm and scheduling, derived from the seed
+        self.streams = RandomStreams(self.config.get("simulation.seed", None))
 
         # Initialise environment (must be called space or grid to work with solara)
+        builder = LandscapeBuilder.from_config(self.config)
         self.grid = GridEnvironment(model=self,
-                                    width=self.config.get("simulation._width", 100),
-                                    height=self.config.get("simulation._height", 100))
+                                    width=builder.width,
+                                    height=builder.height,
+                                    bucket_size=int(self.config.get("swarm.drone.communication_range", 10)),
+                                    landscape=builder.build(self.streams.terrain),
+                                    wind=WindField.from_config(self.config, builder.width, builder.height),
+                                    terrain=Terrain.from_config(self.config, builder.width, builder.height,
+                                                                self.streams.terrain))
+        self.landscape = self.grid.landscape
+
+        # Initialise fire spread model
+        fire_model = self.config.get("fire.model", "simple")
+        if fire_model not in FIRE_MODELS:
+            logger.warning(f"Fire model '{fire_model}' is not implemented, using the simple model")
+        self.fire_model = FIRE_MODELS.get(fire_model, SimpleFireModel)(self)
+
+        # Smoke emitted by the fire, None unless enabled
+        self.smoke = None
+        if self.config.get("smoke.enabled", False):
+            self.smoke = SmokeField.from_config(self.config, self.grid.width, self.grid.height)
+
+        # Neighbourhood of the swarm, computed once per step for all drones
+        self.synchronous = self.config.get("swarm.schedule", "sequential") == "synchronous"
+        self.neighbourhood = SwarmNeighbourhood(self.grid,
+                                                radius=int(self.config.get("swarm.drone.communication_range", 10)),
+                                                synchronous=self.synchronous)
+
+        # Positions, targets and flags of all drones, the drone agents index into it
+        self.swarm_state = SwarmState(
+            communication_range=int(self.config.get("swarm.drone.communication_range", 10)))
+
+        # Optional vectorised engine updating the whole swarm at once
+        self.swarm_engine = None
+        if self.config.get("swarm.engine", "agent") == "vectorised":
+            self.swarm_engine = VectorisedSwarm(self)
 
         self.N = int(kwargs.get("N", self.config.get("swarm.drone_base.number_of_agents", 1)))
         self.num_of_bases = int(kwargs.get("initial_bases", self.config.get("swarm.initial_bases", 1)))
 
         # Initialise bases
+        rng = self.streams.swarm
         for _ in range(self.num_of_bases):
-            x = self.random.randint(2, self.grid.width - 2)
-            y = self.random.choice([2, self.grid.height // 2, self.grid.height - 3])
+            x = int(rng.integers(2, self.grid.width - 2, endpoint=True))
+            y = [2, self.grid.height // 2, self.grid.height - 3][rng.integers(3)]
             base = DroneBase(self, self.N)
             self.grid.place_agent(base, (x, y))
             base.deploy_drones()
@@ -60,12 +126,49 @@ class SimulationModel(mesa.Model):
         self._init_agentsets()
 
         # Set debug flag for a random drone
-        drone = self.random.choice(self.drones)
-        drone.debug = True
-        self.drones.do("set_up")
+        if self.drones:
+            drone = self.drones[int(rng.integers(len(self.drones)))]
+            drone.debug = True
+            self.drones.do("set_up")
+
+        # Outputs of the run are written to their own directory in save_location when save_data is set
+        self.run_name = f"run_{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
+        save_location = Path(self.config.get("simulation.save_location", "~/results")).expanduser()
+        self.run_path = None
+        if self.config.get("simulation.save_data", False):
+            self.run_path = save_location / self.run_name
+        self.profile_path = save_location / f"{self.run_name}_profile.json"
+
+        # Per-step metrics, written in chunks, None unless saved or collected in memory
+        self.datacollector = None
+        if self.run_path or self.config.get("simulation.collect_metrics", False):
+            self.datacollector = DataCollector(self, self.run_path,
+                                               chunk_size=self.config.get("simulation.save_chunk_size", 1000))
+
+        # Landscape snapshots and drone trajectories, written in the background
+        self.exporter = None
+        snapshots_every = self.config.get("simulation.export_snapshots_every", 0)
+        trajectories = self.config.get("simulation.export_trajectories", False)
+        if self.run_path and (snapshots_every or trajectories):
+            self.exporter = StreamingExporter(self, self.run_path, snapshot_every=snapshots_every,
+                                              trajectories=trajectories)
+
+        # Animation of the run, encoded in the background
+        self.recorder = None
+        video_path = self.config.get("simulation.video_path", None)
+        if video_path:
+            # imported here, the rendering modules load matplotlib
+            from src.visualisation.recording import VideoRecorder
+            self.recorder = VideoRecorder(self, video_path,
+                                          every=self.config.get("simulation.video_every", 1),
+                                          downscale=self.config.get("simulation.video_downscale", 1),
+                                          fps=self.config.get("simulation.video_fps", 10))
+
+    def register_agent(self, agent: mesa.Agent) -> None:
+        super().register_agent(agent)
+        self.last_agent_id = max(self.last_agent_id, agent.unique_id)
 
     def _init_agentsets(self):
-        self.cells: mesa.agent.AgentSet = self.agents_by_type.get(Cell, [])
         self.drones: mesa.agent.AgentSet = self.agents_by_type.get(Drone, [])
         self.bases: mesa.agent.AgentSet = self.agents_by_type.get(DroneBase, [])
 
@@ -73,10 +176,51 @@ class SimulationModel(mesa.Model):
         """
         Execute one step of the simulation.
         """
-        self.cells.shuffle_do("step")
+        profiler = self.profiler
+        with profiler.phase("step"):
+            with profiler.phase("fire"):
+                self.grid.wind.update(self.steps)
+                self.fire_model.step()
+            if self.smoke:
+                with profiler.phase("smoke"):
+                    self.smoke.step(self.landscape, self.grid.wind)
+
+            if self.swarm_engine:
+                with profiler.phase("swarm_engine"):
+                    self.swarm_engine.step()
+            else:
+                with profiler.phase("neighbourhood"):
+                    self.neighbourhood.update(self.drones)
+                if self.synchronous:
+                    self.drones.do("sense")
+                    self.shuffle_do(self.drones, "decide")
+                    self.drones.do("advance")
+                else:
+                    self.shuffle_do(self.drones, "step")
+            # self.agents.shuffle_do("step")
 
-        self.drones.shuffle_do("step")
-        # self.agents.shuffle_do("step")
+            if self.datacollector or self.exporter:
+                with profiler.phase("collect"):
+                    if self.datacollector:
+                        self.datacollector.collect()
+                    if self.exporter:
+                        self.exporter.record()
+            if self.recorder:
+                with profiler.phase("record"):
+                    self.recorder.capture()
+        profiler.end_step()
+
+    def shuffle_do(self, agents: mesa.agent.AgentSet, method: str) -> None:
+        """
+        Call a method of every agent in an order drawn from the scheduling stream.
+
+        Args:
+            agents: The agents
+            method: Name of the method to call
+        """
+        agents = list(agents)
+        for i in self.streams.scheduling.permutation(len(agents)).tolist():
+            getattr(agents[i], method)()
 
     def run(self):
         """
@@ -84,10 +228,194 @@ class SimulationModel(mesa.Model):
         """
         self.running = True
         max_steps = self.config.get("simulation.max_steps", float("inf"))
-        for _ in range(max_steps):
-            self.step()
-            if not self.running:
-                break
+        if self._fire_only():
+            # Nothing but the fire changes, jump to the last step and collect it
+            self.fire_model.advance_to(self.fire_model.time + max_steps)
+            self.steps += max_steps
+            if self.datacollector:
+                self.datacollector.collect()
+        else:
+            for _ in range(max_steps):
+                self.step()
+                if not self.running:
+                    break
+        if self.datacollector:
+            self.datacollector.flush()
+        if self.exporter:
+            self.exporter.close()
+        if self.recorder:
+            self.recorder.close()
+        self.profiler.report(self.profile_path)
+
+    def _fire_only(self) -> bool:
+        """Whether a run only advances a fire known ahead, without drones, smoke or per-step outputs."""
+        return (isinstance(self.fire_model, ArrivalTimeFireModel) and not self.drones and self.smoke is None
+                and self.grid.wind.series is None and self.exporter is None and self.recorder is None)
+
+    def fire_state_at(self, step: int) -> np.ndarray:
+        """
+        State of the landscape at a past or future step, from the ignition times of the arrival model.
+
+        Args:
+            step: The step
+
+        Returns:
+            The (width, height) cell states
+        """
+        if not isinstance(self.fire_model, ArrivalTimeFireModel):
+            raise ValueError("Only the 'arrival' fire model knows the state at other steps")
+        # the fire model counts its own steps, the fire step of a model step follows the step counter
+        step = step - self.steps + self.fire_model.time
+        return self.fire_model.state_at(step).reshape(self.landscape.state.shape)
+
+    def save_checkpoint(self, path: str) -> None:
+        """
+        Save the state of the simulation, to continue it later with from_checkpoint.
+
+        The landscape arrays, fire front, bases and drones, step counter and random number generator
+        states are written to a compressed .npz file. A model restored from it continues exactly as
+        this model would.
+
+        Args:
+            path: File to write
+        """
+        swarm = self.swarm_state
+        drones = swarm.drones
+        bases = list(self.bases)
+        base_index = {base: i for i, base in enumerate(bases)}
+        owner = {drone: base_index[base] for base in bases for drone in base.drones}
+        front = self.fire_model.get_front()
+
+        version, internal_state, gauss_next = self.random.getstate()
+        meta = {
+            'config': self.config.config.model_dump(),
+            'steps': self.steps,
+            'running': self.running,
+            'num_of_bases': self.num_of_bases,
+            'last_agent_id': self.last_agent_id,
+            'fire_front': front is not None,
+            'random': {'version': version, 'gauss_next': gauss_next},
+            'rng': self.rng.bit_generator.state,
+            'streams': self.streams.get_state(),
+        }
+        landscape = self.landscape
+        with open(path, 'wb') as file:
+            np.savez_compressed(
+                file,
+                meta=np.array(json.dumps(meta)),
+                random_state=np.array(internal_state, dtype=np.uint32),
+                landscape_fuel=landscape.fuel,
+                landscape_state=landscape.state,
+                landscape_burn_counter=landscape.burn_counter,
+                landscape_road=landscape.road,
+                fire_front=front if front is not None else np.empty((0, 2), dtype=np.int64),
+                **{f'fire_model_{name}': array for name, array in self.fire_model.get_arrays().items()},
+                **({'smoke': self.smoke.concentration} if self.smoke else {}),
+                base_ids=np.array([base.unique_id for base in bases], dtype=np.int64),
+                base_positions=np.array([base.pos for base in bases], dtype=np.int64).reshape(-1, 2),
+                base_num_drones=np.array([base.num_drones for base in bases], dtype=np.int64),
+                drone_ids=np.array([drone.unique_id for drone in drones], dtype=np.int64),
+                drone_owners=np.array([owner.get(drone, -1) for drone in drones], dtype=np.int64),
+                drone_positions=swarm.positions.astype(np.int64),
+                drone_targets=np.where(swarm.targets == UNSET, -1, swarm.targets).astype(np.int64),
+                drone_base_positions=swarm.base_positions.astype(np.int64),
+                drone_colors=np.array(swarm.color_names(), dtype=str),
+                drone_debug=swarm.debug.copy(),
+            )
+        logger.info(f"Saved checkpoint at step {self.steps} to {path}")
+
+    @classmethod
+    def from_checkpoint(cls, path: str) -> 'SimulationModel':
+        """
+        Create a model from a checkpoint written by save_checkpoint.
+
+        Outputs of the restored model are written to a new run directory.
+
+        Args:
+            path: Checkpoint file
+
+        Returns:
+            The restored model, ready to continue from the saved step
+        """
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        meta = json.loads(str(arrays['meta']))
+
+        model = cls(Config.from_dict(meta['config']), initial_bases=0)
+        model._restore(meta, arrays)
+        logger.info(f"Restored checkpoint at step {model.steps} from {path}")
+        return model
+
+    def _restore(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        landscape = self.landscape
+        landscape.fuel[:] = arrays['landscape_fuel']
+        landscape.state[:] = arrays['landscape_state']
+        landscape.burn_counter[:] = arrays['landscape_burn_counter']
+        landscape.road[:] = arrays['landscape_road']
+        self.fire_model.set_front(arrays['fire_front'] if meta['fire_front'] else None)
+        self.fire_model.set_arrays({name[len('fire_model_'):]: array for name, array in arrays.items()
+                                    if name.startswith('fire_model_')})
+        if self.smoke and 'smoke' in arrays:
+            self.smoke.concentration[:] = arrays['smoke']
+
+        # Agents are created in the order of their ids, the order of mesa's agent sets, and given
+        # their saved ids. New agents continue after the largest id given out before the checkpoint
+        base_ids, drone_ids = arrays['base_ids'].tolist(), arrays['drone_ids'].tolist()
+        num_drones = dict(zip(base_ids, arrays['base_num_drones'].tolist()))
+        base_positions = dict(zip(drone_ids, arrays['drone_base_positions'].tolist()))
+        agents = {}
+        for unique_id in sorted(base_ids + drone_ids):
+            if unique_id in num_drones:
+                agent = DroneBase(self, num_drones[unique_id])
+            else:
+                agent = Drone(self, tuple(base_positions[unique_id]))
+            agent.unique_id = unique_id
+            agents[unique_id] = agent
+        self.last_agent_id = meta['last_agent_id']
+        self._resume_agent_ids(self.last_agent_id + 1)
+
+        bases = [agents[unique_id] for unique_id in base_ids]
+        for base, pos in zip(bases, arrays['base_positions'].tolist()):
+            self.grid.place_agent(base, tuple(pos))
+
+        # The rows of the swarm keep the saved order, which differs from the ids once drones are removed
+        drones = [agents[unique_id] for unique_id in drone_ids]
+        self.swarm_state.reorder(drones)
+        for drone, pos, target, owner, color, debug in zip(
+                drones, arrays['drone_positions'].tolist(), arrays['drone_targets'].tolist(),
+                arrays['drone_owners'].tolist(), arrays['drone_colors'].tolist(), arrays['drone_debug'].tolist()):
+            self.grid.place_agent(drone, tuple(pos))
+            drone.target_pos = tuple(target) if target != [-1, -1] else None
+            drone.color = color
+            drone.debug = debug
+            if owner >= 0:
+                bases[owner].drones.append(drone)
+
+        self._init_agentsets()
+
+        self.num_of_bases = meta['num_of_bases']
+        self.steps = meta['steps']
+        self.running = meta['running']
+        # Restore the generators in place, the agent sets hold references to them
+        random_state = meta['random']
+        self.random.setstate((random_state['version'], tuple(arrays['random_state'].tolist()),
+                              random_state['gauss_next']))
+        self.rng.bit_generator.state = meta['rng']
+        self.streams.set_state(meta['streams'])
+
+    def _resume_agent_ids(self, next_id: int) -> None:
+        """
+        Make the next agent created get next_id.
+
+        mesa has no public way to set the id counter of a model, it keeps one itertools.count per
+        model in Agent._ids (mesa 3.0 to 3.3). The counter is replaced once here, and a mesa that
+        keeps its ids differently is reported rather than silently giving out duplicate ids.
+        """
+        counters = getattr(mesa.Agent, '_ids', None)
+        if not isinstance(counters, collections.defaultdict):
+            raise RuntimeError(f"mesa {mesa.__version__} does not keep its agent ids in Agent._ids, "
+                               f"the agent ids of the checkpoint cannot be restored")
+        counters[self] = itertools.count(next_id)
 
     def start_fire(self, num_fires=1, position=None):
         """
@@ -98,27 +426,28 @@ class SimulationModel(mesa.Model):
             position: Optional (x,y) tuple to start fire at specific location
         """
         if position:
-            # Get cell at specific position
-            cell_contents = self.grid.get_cell_list_contents([position])
-            cells = [agent for agent in cell_contents if isinstance(agent, Cell)]
-            if cells:
-                cells[0].on_fire = True
+            # Ignite the cell at the specific position
+            if self.landscape.has_cell(position):
+                self.fire_model.ignite(position)
                 logger.info(f"Started fire at position {position}")
         else:
             # Start random fires
-            available_cells = [agent for agent in self.cells if not agent.on_fire]
-            if available_cells:
-                cells_to_ignite = self.random.sample(available_cells, min(num_fires, len(available_cells)))
-                for cell in cells_to_ignite:
-                    cell.on_fire = True
-                    logger.info(f"Started fire at position {cell.pos}")
+            available_cells = np.flatnonzero(self.landscape.state == CellState.UNBURNT)
+            if available_cells.size:
+                chosen = self.streams.fire.choice(available_cells, min(num_fires, available_cells.size),
+                                                  replace=False)
+                for index in chosen.tolist():
+                    pos = divmod(index, self.landscape.height)
+                    self.fire_model.ignite(pos)
+                    logger.info(f"Started fire at position {pos}")
 
     def add_base(self):
         """
         Add a new base to the simulation.
         """
-        x = self.random.randint(2, self.grid.width - 2)
-        y = self.random.randint(2, self.grid.height - 2)
+        rng = self.streams.swarm
+        x = int(rng.integers(2, self.grid.width - 2, endpoint=True))
+        y = int(rng.integers(2, self.grid.height - 2, endpoint=True))
         base = DroneBase(self, self.N)
         self.grid.place_agent(base, (x, y))
         base.deploy_drones()
@@ -1,9 +1,9 @@
 import os
 from pathlib import Path
-from typing import Any, Literal, Optional
+from typing import Any, Dict, Literal, Optional
 
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from src.utils.logging_config import get_logger
 
@@ -37,15 +37,93 @@ class SimulationConfig(BaseModel):
         self._height: int = 150 if self.area_size == 'small' else 200
 
     max_steps: int = Field(default=100, gt=1)
+    # Seed of the independent random streams of the terrain, fire, swarm and scheduling
     seed: int = 42
-    save_data: bool = True
+    # Write the per-step metrics and the exports of the run to a directory in save_location
+    save_data: bool = False
     save_location: str = "~/results"
+    # Record the per-step metrics in memory, also without save_data
+    collect_metrics: bool = False
+    # Number of steps buffered in memory before the collected data is written
+    save_chunk_size: int = Field(default=1000, gt=0)
+    # Steps between exported landscape snapshots, 0 to export none
+    export_snapshots_every: int = Field(default=0, ge=0)
+    # Export the drone trajectories, the position of every drone at every step
+    export_trajectories: bool = False
+    # Time the phases of every step, report them and write a trace at the end of the run
+    profile: bool = False
+    # Record the run to this animation file, a .gif or any format ffmpeg writes (e.g. .mp4)
+    video_path: Optional[str] = None
+    # Steps between recorded frames
+    video_every: int = Field(default=1, gt=0)
+    # Keep every n-th cell along each axis of the recorded frames
+    video_downscale: int = Field(default=1, gt=0)
+    # Frames per second of the recorded animation
+    video_fps: float = Field(default=10, gt=0)
 
 
 class FireConfig(BaseModel):
     """Fire behaviour configuration"""
     initial_fires: int = Field(default=1, ge=0)
-    model: Literal['simple', 'rothermel'] = 'simple'
+    model: Literal['simple', 'vectorised', 'rothermel', 'arrival'] = 'simple'
+    # Minutes per step, used by the rothermel model and the smoke
+    step_minutes: float = Field(default=1, gt=0)
+    # Dead fuel moisture content, as a fraction of the dry weight
+    fuel_moisture: float = Field(default=0.06, ge=0)
+    # Spread after the median number of steps instead of a random one, used by the arrival model
+    deterministic_delays: bool = False
+
+
+class LandscapeConfig(BaseModel):
+    """Landscape generation configuration"""
+    # Raster with the fuel level of every cell (.npy, .asc or .tif), the grid takes its size.
+    # Fuel is drawn at random if empty
+    fuel_path: Optional[str] = None
+    # Raster with the roads as nonzero cells, roads along the middle of each axis if empty
+    road_path: Optional[str] = None
+    # Rows at the bottom of the grid with no land, reserved for the bases
+    void_rows: int = Field(default=5, ge=0)
+    # Side of a grid cell in metres
+    cell_size: float = Field(default=10, gt=0)
+
+
+class TerrainConfig(BaseModel):
+    """Terrain elevation configuration"""
+    # Raster with the elevation of every cell in metres (.npy, .asc or .tif), of the size of the grid
+    elevation_path: Optional[str] = None
+    # Height in metres of the relief generated when no raster is given, flat if 0
+    relief: float = Field(default=0, ge=0)
+    # Size in cells of the largest generated hills
+    feature_size: int = Field(default=64, gt=0)
+    # Directory for memory-mapped temporary files holding the terrain arrays, in memory if empty
+    memmap_dir: Optional[str] = None
+
+
+class WindConfig(BaseModel):
+    """Wind configuration"""
+    # Midflame wind speed in m/s
+    speed: float = Field(default=0, ge=0)
+    # Direction the wind blows from, in degrees clockwise from north
+    direction: float = 0
+    # Wind over time, replacing speed and direction from its first step: .csv with step, speed and
+    # direction columns, or .npz with steps, speed and direction arrays, per step or per cell
+    series_path: Optional[str] = None
+
+
+class SmokeConfig(BaseModel):
+    """Smoke transport configuration"""
+    # Whether burning cells emit smoke, reducing the vision range of the drones in it
+    enabled: bool = False
+    # Landscape cells per smoke cell along each axis
+    downscale: int = Field(default=4, gt=0)
+    # Smoke emitted by a burning cell per step
+    emission: float = Field(default=1.0, ge=0)
+    # Diffusion coefficient of the smoke in m²/s
+    diffusivity: float = Field(default=5.0, ge=0)
+    # Fraction of the smoke lost per minute
+    decay: float = Field(default=0.05, ge=0)
+    # Attenuation of the vision range per unit of concentration
+    extinction: float = Field(default=1.0, ge=0)
 
 
 class DroneConfig(BaseModel):
@@ -63,6 +141,12 @@ class DroneBaseConfig(BaseModel):
 class SwarmConfig(BaseModel):
     """Swarm configuration parameters"""
     initial_bases: int = Field(default=1, ge=0)
+    # 'sequential': drones step in random order and see the moves of the drones before them
+    # 'synchronous': all drones decide on the positions at the start of the step, then move
+    schedule: Literal['sequential', 'synchronous'] = 'sequential'
+    # 'agent': each Drone agent runs its own step
+    # 'vectorised': the whole swarm is updated with array operations, always synchronous
+    engine: Literal['agent', 'vectorised'] = 'agent'
     drone_base: DroneBaseConfig = DroneBaseConfig()
     drone: DroneConfig = DroneConfig()
 
@@ -70,7 +154,11 @@ class SwarmConfig(BaseModel):
 class CompleteConfig(BaseModel):
     """Complete configuration combining all sections and default values"""
     simulation: SimulationConfig = SimulationConfig()
+    landscape: LandscapeConfig = LandscapeConfig()
+    terrain: TerrainConfig = TerrainConfig()
     fire: FireConfig = FireConfig()
+    wind: WindConfig = WindConfig()
+    smoke: SmokeConfig = SmokeConfig()
     swarm: SwarmConfig = SwarmConfig()
 
 # TODO: use Singleton patter, dependency injection and perhaps context manager
@@ -165,3 +253,54 @@ class Config:
             else:
                 return default
         return current
+
+    def with_overrides(self, overrides: Dict[str, Any]) -> 'Config':
+        """
+        Create a copy of the configuration with some values replaced.
+
+        Args:
+            overrides: New values keyed by their dot notation path (e.g., 'simulation.seed')
+
+        Returns:
+            A new configuration, validated like a loaded file
+
+        Raises:
+            ConfigError: If a path does not exist or a value is invalid
+        """
+        data = self.config.model_dump()
+        for path, value in overrides.items():
+            *sections, key = path.split('.')
+            current = data
+            for part in sections:
+                current = current.get(part) if isinstance(current, dict) else None
+            if not isinstance(current, dict) or key not in current:
+                raise ConfigError(f"Unknown configuration value '{path}'")
+            current[key] = value
+
+        config = Config.from_dict(data)
+        config.config_path = self.config_path
+        return config
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Config':
+        """
+        Create a configuration from a dict of values, as read from a configuration file.
+
+        Args:
+            data: Configuration values, nested by section
+
+        Returns:
+            The validated configuration
+
+        Raises:
+            ConfigError: If a value is invalid
+        """
+        try:
+            loaded_config = CompleteConfig(**data)
+        except ValidationError as e:
+            raise ConfigError(f"Invalid configuration: {str(e)}") from e
+
+        config = cls.__new__(cls)
+        config.config_path = None
+        config.config = loaded_config
+        return config
@@ -0,0 +1,185 @@
+"""
+Columnar time-series data collection.
+
+Per-step model metrics are recorded into preallocated NumPy ring buffers and written to disk in
+chunks of .npz files holding one array per column. Nothing is built per agent, unlike
+mesa.DataCollector. The drone trajectories are exported by src.utils.export.StreamingExporter.
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from src.agents.cell import CellState
+from src.models.swarm.state import UNSET
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+logger = get_logger()
+
+# Recorded metrics and their types
+METRICS = {
+    'step': np.int64,
+    'burning': np.int64,
+    'burnt': np.int64,
+    'unburnt': np.int64,
+    # fraction of the land within vision range of a drone
+    'coverage': np.float64,
+    # fraction of the drones in the largest group connected within communication range
+    'connectivity': np.float64,
+    # number of connected groups of drones
+    'components': np.int64,
+}
+
+
+def coverage_mask(positions: np.ndarray, radius, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Mask of the cells within a Chebyshev distance of any of the positions, one radius for all
+    positions or one per position.
+
+    The squares are added to a difference array and summed up, so the cost does not depend on the
+    radius or on how much the squares overlap.
+    """
+    width, height = shape
+    diff = np.zeros((width + 1, height + 1), dtype=np.int32)
+    if len(positions):
+        x0 = np.clip(positions[:, 0] - radius, 0, width)
+        x1 = np.clip(positions[:, 0] + radius + 1, 0, width)
+        y0 = np.clip(positions[:, 1] - radius, 0, height)
+        y1 = np.clip(positions[:, 1] + radius + 1, 0, height)
+        np.add.at(diff, (x0, y0), 1)
+        np.add.at(diff, (x1, y0), -1)
+        np.add.at(diff, (x0, y1), -1)
+        np.add.at(diff, (x1, y1), 1)
+    return diff.cumsum(axis=0).cumsum(axis=1)[:width, :height] > 0
+
+
+def connectivity(positions: np.ndarray, radius: float) -> Tuple[float, int]:
+    """
+    Connectivity of the drones linked when within a Chebyshev distance of each other.
+
+    Returns:
+        The fraction of the drones in the largest connected group, and the number of groups
+    """
+    n = len(positions)
+    if n == 0:
+        return 0.0, 0
+    # drones sharing a cell are always linked, build the graph on the distinct positions
+    unique, counts = np.unique(positions, axis=0, return_counts=True)
+    m = len(unique)
+    pairs = cKDTree(unique).query_pairs(radius, p=np.inf, output_type='ndarray')
+    graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(m, m))
+    n_components, labels = connected_components(graph, directed=False)
+    largest = np.bincount(labels, weights=counts).max()
+    return float(largest / n), int(n_components)
+
+
+class DataCollector:
+    """
+    Record per-step metrics of a simulation into ring buffers.
+
+    The buffers hold the last chunk_size steps. With a path set, every chunk_size steps the new
+    rows are appended to it as metrics_<chunk>.npz files.
+    Without a path the data is only kept in memory.
+    """
+    def __init__(self, model: 'SimulationModel', path: Optional[str] = None, chunk_size: int = 1000):
+        """
+        Args:
+            model: The simulation model
+            path: Directory the chunks are written to, or None to keep the data in memory
+            chunk_size: Number of steps held in the buffers and written per chunk
+        """
+        self.model = model
+        self.path = Path(path).expanduser() if path else None
+        self.chunk_size = int(chunk_size)
+        self.vision_range = int(model.config.get("swarm.drone.vision_range", 5))
+        self.communication_range = float(model.config.get("swarm.drone.communication_range", 10))
+
+        self.columns = {name: np.zeros(self.chunk_size, dtype=dtype) for name, dtype in METRICS.items()}
+
+        self.rows = 0
+        self._flushed = 0
+        self._chunks = 0
+
+    def collect(self) -> None:
+        """Record the current state of the model."""
+        model = self.model
+        landscape = model.landscape
+        i = self.rows % self.chunk_size
+
+        positions = model.swarm_state.positions
+        # drones not on the grid have UNSET positions and take no part in the coverage and connectivity
+        positions = positions[positions[:, 0] != UNSET]
+        counts = np.bincount(landscape.state.ravel(), minlength=len(CellState))
+        land = landscape.land
+        # the smoke around the drones shortens their vision
+        vision = self.vision_range if model.smoke is None else model.smoke.vision_ranges(positions, self.vision_range)
+        covered = coverage_mask(positions, np.floor(vision).astype(np.int64), land.shape)
+        connected, components = connectivity(positions, self.communication_range)
+
+        columns = self.columns
+        columns['step'][i] = model.steps
+        columns['burning'][i] = counts[CellState.BURNING]
+        columns['burnt'][i] = counts[CellState.BURNT]
+        columns['unburnt'][i] = counts[CellState.UNBURNT]
+        columns['coverage'][i] = np.count_nonzero(covered & land) / max(np.count_nonzero(land), 1)
+        columns['connectivity'][i] = connected
+        columns['components'][i] = components
+
+        self.rows += 1
+        if self.path and self.rows - self._flushed >= self.chunk_size:
+            self.flush()
+
+    def _pending(self) -> np.ndarray:
+        """Buffer indices of the rows not written yet, oldest first."""
+        return np.arange(self._flushed, self.rows) % self.chunk_size
+
+    def flush(self) -> None:
+        """Write the rows collected since the last flush, if a path is set."""
+        if not self.path or self.rows == self._flushed:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        index = self._pending()
+        np.savez(self.path / f"metrics_{self._chunks:05d}.npz",
+                 **{name: column[index] for name, column in self.columns.items()})
+        logger.debug(f"Wrote steps {self._flushed} to {self.rows} to {self.path}")
+        self._flushed = self.rows
+        self._chunks += 1
+
+    def latest(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        """
+        Get the most recent values of a metric still held in the buffer.
+
+        Args:
+            name: Name of the metric
+            n: Number of values, all the buffered values if None
+
+        Returns:
+            The values, oldest first
+        """
+        available = min(self.rows, self.chunk_size)
+        if n is not None:
+            available = min(n, available)
+        return self.columns[name][np.arange(self.rows - available, self.rows) % self.chunk_size]
+
+
+def load_metrics(path: str) -> Dict[str, np.ndarray]:
+    """
+    Load the metrics written by a DataCollector.
+
+    Args:
+        path: Directory the chunks were written to
+
+    Returns:
+        One array per metric, over all the collected steps
+    """
+    chunks = sorted(Path(path).expanduser().glob("metrics_*.npz"))
+    if not chunks:
+        return {name: np.zeros(0, dtype=dtype) for name, dtype in METRICS.items()}
+    data = [np.load(chunk) for chunk in chunks]
+    return {name: np.concatenate([chunk[name] for chunk in data]) for name in METRICS}
@@ -0,0 +1,161 @@
+"""
+Streaming export of run outputs.
+
+Landscape state snapshots and drone trajectories are gathered in chunks while the model runs and
+handed to a background thread that compresses and writes them, so the simulation loop never waits
+on the disk. Each chunk is a new .npz file, earlier files are never rewritten.
+"""
+import queue
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+logger = get_logger()
+
+
+class StreamingExporter:
+    """
+    Write landscape snapshots and drone trajectories incrementally, in compressed chunks.
+
+    Files written to the path:
+        landscape_<chunk>.npz: 'step' (S,) and 'state' (S, width, height) for S snapshots
+        trajectories_<chunk>.npz: 'step' (T,), 'ids' (N,) and 'positions' (T, N, 2) for T steps
+    """
+    def __init__(self, model: 'SimulationModel', path: str, snapshot_every: int = 10,
+                 trajectories: bool = True, snapshot_chunk: int = 10, trajectory_chunk: int = 1000):
+        """
+        Args:
+            model: The simulation model
+            path: Directory the chunks are written to
+            snapshot_every: Steps between landscape snapshots, 0 for no snapshots
+            trajectories: Whether to record the drone positions at every step
+            snapshot_chunk: Number of snapshots per file
+            trajectory_chunk: Number of steps of trajectories per file
+        """
+        self.model = model
+        self.path = Path(path).expanduser()
+        self.snapshot_every = int(snapshot_every)
+        self.trajectories = trajectories
+        self.snapshot_chunk = int(snapshot_chunk)
+        self.trajectory_chunk = int(trajectory_chunk)
+
+        self._snapshot_steps: List[int] = []
+        self._snapshots: List[np.ndarray] = []
+        self._trajectory_steps: List[int] = []
+        self._positions: List[np.ndarray] = []
+        self._ids: Optional[np.ndarray] = None
+        self._chunks = {'landscape': 0, 'trajectories': 0}
+
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._write_loop, name="StreamingExporter", daemon=True)
+        self._writer.start()
+        self.closed = False
+
+    def record(self) -> None:
+        """Record the current state of the model, to be called after each step."""
+        if self.closed:
+            raise RuntimeError("The exporter is closed")
+        self._raise_writer_error()
+        step = self.model.steps
+
+        if self.snapshot_every and step % self.snapshot_every == 0:
+            self._snapshot_steps.append(step)
+            self._snapshots.append(self.model.landscape.state.copy())
+            if len(self._snapshots) >= self.snapshot_chunk:
+                self._submit_snapshots()
+
+        if self.trajectories:
+            swarm = self.model.swarm_state
+            ids = np.fromiter((drone.unique_id for drone in swarm.drones), dtype=np.int64, count=swarm.size)
+            if self._ids is not None and not np.array_equal(ids, self._ids):
+                # the swarm changed, start a new chunk with the new drones
+                self._submit_trajectories()
+            self._ids = ids
+            self._trajectory_steps.append(step)
+            self._positions.append(swarm.positions.copy())
+            if len(self._positions) >= self.trajectory_chunk:
+                self._submit_trajectories()
+
+    def _submit_snapshots(self) -> None:
+        if not self._snapshots:
+            return
+        self._submit('landscape', step=np.array(self._snapshot_steps, dtype=np.int64),
+                     state=np.stack(self._snapshots))
+        self._snapshot_steps, self._snapshots = [], []
+
+    def _submit_trajectories(self) -> None:
+        if not self._positions:
+            return
+        self._submit('trajectories', step=np.array(self._trajectory_steps, dtype=np.int64), ids=self._ids,
+                     positions=np.stack(self._positions))
+        self._trajectory_steps, self._positions = [], []
+
+    def _submit(self, kind: str, **arrays: np.ndarray) -> None:
+        file = self.path / f"{kind}_{self._chunks[kind]:05d}.npz"
+        self._chunks[kind] += 1
+        self._queue.put((file, arrays))
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            file, arrays = item
+            if self._error is not None:
+                continue
+            try:
+                file.parent.mkdir(parents=True, exist_ok=True)
+                # write under a temporary name so a partly written chunk is never read
+                temporary = file.with_name(file.name + ".tmp")
+                with open(temporary, 'wb') as f:
+                    np.savez_compressed(f, **arrays)
+                temporary.replace(file)
+            except BaseException as e:
+                logger.error(f"Failed to write {file}: {e!r}")
+                self._error = e
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("The exporter failed to write its output") from self._error
+
+    def close(self) -> None:
+        """Write the remaining data and wait for the writer to finish."""
+        if self.closed:
+            return
+        self.closed = True
+        self._submit_snapshots()
+        self._submit_trajectories()
+        self._queue.put(None)
+        self._writer.join()
+        self._raise_writer_error()
+        logger.info(f"Exported run outputs to {self.path}")
+
+    def __enter__(self) -> 'StreamingExporter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_chunks(path: str, kind: str) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Read the chunks written by a StreamingExporter one at a time, in order.
+
+    Args:
+        path: Directory the chunks were written to
+        kind: 'landscape' or 'trajectories'
+
+    Yields:
+        The arrays of each chunk
+    """
+    for file in sorted(Path(path).expanduser().glob(f"{kind}_*.npz")):
+        with np.load(file) as data:
+            yield {name: data[name] for name in data.files}
@@ -6,6 +6,7 @@ This module initializes a Loguru logger that can be imported and used throughout
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 from loguru import logger
@@ -21,24 +22,29 @@ LOG_DIR = str(Path.home() / f".{APP_NAME}" / "logs")
 Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=None)
+def _bound_logger(module_name: str):
+    return logger.bind(name=module_name)
+
+
 def get_logger(module_name: str = None):
     """
     Get a logger instance with the module name.
 
+    Loggers are cached, so every call for the same module returns the same instance.
+
     Args:
         module_name: Optional module name. If not provided, uses the caller's module name.
 
     Returns:
         A configured logger instance
     """
-    # If module_name not provided, use the caller's module name
+    # If module_name not provided, use the caller's module name, read from the caller's frame
+    # rather than inspect.stack(), which builds the info and source lines of the whole stack
     if module_name is None:
-        import inspect
-        frame = inspect.stack()[1]
-        module = inspect.getmodule(frame[0])
-        module_name = module.__name__ if module else "unnamed"
+        module_name = sys._getframe(1).f_globals.get("__name__", "unnamed")
 
-    return logger.bind(name=module_name)
+    return _bound_logger(module_name)
 
 
 # Export logger for direct import
@@ -46,10 +52,23 @@ log = logger
 
 
 class DroneLogger():
+    """
+    Debug logger of a single drone, off unless that drone is being debugged.
+
+    Nothing is formatted while the logger is off. Pass the values separately, formatted like
+    loguru with {} placeholders, or a callable building the message:
+        drone_logger.debug("Moving towards {}, at {}", target, pos)
+        drone_logger.debug(lambda: f"Links formed: {describe(links)}")
+    """
+    __slots__ = ("on", "logger")
+
     def __init__(self, logger):
         self.on = False
         self.logger = logger
 
-    def debug(self, message):
-        if self.on:
-            self.logger.debug(message)
+    def debug(self, message, *args, **kwargs):
+        if not self.on:
+            return
+        if callable(message):
+            message = message()
+        self.logger.opt(depth=1).debug(message, *args, **kwargs)
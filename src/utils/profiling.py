@@ -0,0 +1,150 @@
+"""
+Per-phase timing of the simulation steps.
+
+Code wraps the phases of a step in `with profiler.phase(name):`. When profiling is off the phase is
+a shared no-op context manager, so the instrumentation can stay in hot code such as the drone
+step. When on, the wall time and number of calls of each phase are summed per step, and every
+call is kept as an event for a Chrome trace (also read by speedscope and Perfetto).
+"""
+import json
+import os
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger()
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'StepProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.start, perf_counter_ns())
+        return False
+
+
+class StepProfiler:
+    """
+    Record the wall time and call counts of the phases of each step.
+
+    Phases may be nested, e.g. the grid moves inside the drone movement. The time of a nested
+    phase is also counted in the phase around it.
+    """
+    def __init__(self, enabled: bool = False, max_events: int = 1_000_000):
+        """
+        Args:
+            enabled: Whether to record anything
+            max_events: Largest number of events kept for the trace, the totals are always recorded
+        """
+        self.enabled = enabled
+        self.max_events = max_events
+        self.steps = 0
+        # phase -> [time in ns, calls] in the current step
+        self._current: Dict[str, List[int]] = {}
+        # phase -> time in ns and calls per completed step
+        self.step_times: Dict[str, List[int]] = {}
+        self.step_calls: Dict[str, List[int]] = {}
+        # (phase, start in ns, duration in ns)
+        self.events: List[Tuple[str, int, int]] = []
+        self.dropped_events = 0
+
+    def phase(self, name: str):
+        """Context manager timing one call of a phase."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def _record(self, name: str, start: int, end: int) -> None:
+        totals = self._current.get(name)
+        if totals is None:
+            totals = self._current[name] = [0, 0]
+        totals[0] += end - start
+        totals[1] += 1
+        if len(self.events) < self.max_events:
+            self.events.append((name, start, end - start))
+        else:
+            self.dropped_events += 1
+
+    def end_step(self) -> None:
+        """Close the current step, storing its per-phase totals."""
+        if not self.enabled:
+            return
+        for name in self._current.keys() - self.step_times.keys():
+            # phase seen for the first time, earlier steps did not run it
+            self.step_times[name] = [0] * self.steps
+            self.step_calls[name] = [0] * self.steps
+        for name in self.step_times:
+            time, calls = self._current.get(name, (0, 0))
+            self.step_times[name].append(time)
+            self.step_calls[name].append(calls)
+        self._current = {}
+        self.steps += 1
+
+    def summary(self) -> str:
+        """Table of the time spent in each phase, with percentiles of its time per step."""
+        header = (f"{'phase':<16} {'calls':>10} {'total s':>9} {'share':>7} "
+                  f"{'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        lines = [f"Profile of {self.steps} steps", header, "-" * len(header)]
+        step_total = sum(self.step_times.get("step", [])) or 1
+        for name, times in sorted(self.step_times.items(), key=lambda item: -sum(item[1])):
+            per_step = np.array(times) / 1e6
+            lines.append(f"{name:<16} {sum(self.step_calls[name]):>10} {per_step.sum() / 1e3:>9.3f} "
+                         f"{sum(times) / step_total:>7.1%} {per_step.mean():>9.3f} "
+                         f"{np.percentile(per_step, 50):>9.3f} {np.percentile(per_step, 95):>9.3f} "
+                         f"{per_step.max():>9.3f}")
+        if self.dropped_events:
+            lines.append(f"{self.dropped_events} events were left out of the trace")
+        return "\n".join(lines)
+
+    def write_trace(self, path: str) -> None:
+        """
+        Write the recorded events in the Chrome trace event format.
+
+        Args:
+            path: JSON file to write, opened with chrome://tracing, Perfetto or speedscope
+        """
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        origin = self.events[0][1] if self.events else 0
+        events = [{'name': name, 'cat': 'step', 'ph': 'X', 'ts': (start - origin) / 1e3, 'dur': duration / 1e3,
+                   'pid': pid, 'tid': 0} for name, start, duration in self.events]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    def report(self, trace_path: str) -> None:
+        """Log the summary table and write the trace."""
+        if not self.enabled:
+            return
+        logger.info("\n" + self.summary())
+        self.write_trace(trace_path)
+        logger.info(f"Wrote the step profile trace to {trace_path}")
+
+
+# Disabled profiler shared by the models that never profile, e.g. the minimal models of the tests
+NULL_PROFILER = StepProfiler()
@@ -0,0 +1,54 @@
+"""
+Independent random number streams per subsystem.
+
+Every subsystem draws from its own NumPy Generator, derived from the simulation seed with a
+SeedSequence. Changing how much one subsystem draws, e.g. the number of drones, leaves the draws of
+the others unchanged. Runs with different seeds, such as the runs of a sweep, get statistically
+independent streams.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Spawn key of each stream, new streams are appended so existing streams keep their draws
+STREAMS = {
+    'terrain': 0,
+    'fire': 1,
+    'swarm': 2,
+    'scheduling': 3,
+}
+
+
+class RandomStreams:
+    """
+    Seeded generators of the simulation.
+
+    Attributes:
+        terrain: Fuel and landscape generation
+        fire: Ignitions and fire spread
+        swarm: Base placement and drone behaviour
+        scheduling: Order in which agents act
+    """
+    terrain: np.random.Generator
+    fire: np.random.Generator
+    swarm: np.random.Generator
+    scheduling: np.random.Generator
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: Seed of the simulation, fresh entropy if None
+        """
+        self.seed_sequence = np.random.SeedSequence(seed)
+        for name, key in STREAMS.items():
+            child = np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=(key,))
+            setattr(self, name, np.random.Generator(np.random.PCG64(child)))
+
+    def get_state(self) -> Dict[str, Any]:
+        """States of the generators, JSON serialisable."""
+        return {name: getattr(self, name).bit_generator.state for name in STREAMS}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore the generators, in place, to states from get_state."""
+        for name in STREAMS:
+            getattr(self, name).bit_generator.state = state[name]
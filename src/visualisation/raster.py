@@ -0,0 +1,161 @@
+"""
+Raster rendering of the simulation.
+
+The landscape is drawn as one RGBA image, its pixels looked up from the landscape arrays in a
+colour table, and the drones and bases as one scatter. Between frames only the pixels of the
+cells that changed are recoloured, and the artists are updated in place rather than redrawn.
+"""
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.colors import to_rgba
+from matplotlib.markers import MarkerStyle
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.environment.landscape import LandscapeState
+from src.models.swarm.state import COLORS, UNSET
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+
+def _rgba(color: str, alpha: Optional[float] = None) -> np.ndarray:
+    return np.round(np.array(to_rgba(color, alpha)) * 255).astype(np.uint8)
+
+
+def landscape_lut() -> np.ndarray:
+    """
+    Colour table of the landscape, the colours of cell_portrayal.
+
+    Returns:
+        (len(CellState), 2, len(FuelLevel), 4) RGBA table indexed by [state, road, fuel]
+    """
+    alpha = 0x20 / 255
+    fuel_colors = np.array([
+        _rgba("#FFFFFF"),  # Default white
+        _rgba("#D2B48C", alpha),  # Tan for no fuel
+        _rgba("#ADFF2F", alpha),  # Green-yellow for grass
+        _rgba("#006400", alpha),  # Dark green for forest
+    ])
+    lut = np.zeros((len(CellState), 2, len(FuelLevel), 4), dtype=np.uint8)
+    lut[:, 0] = fuel_colors
+    lut[:, 1] = _rgba("#808080")
+    lut[CellState.BURNING] = _rgba("#FF0000")
+    lut[CellState.BURNT] = _rgba("#000000")
+    # no land, transparent
+    lut[CellState.VOID] = 0
+    return lut
+
+
+def landscape_keys(landscape: LandscapeState) -> np.ndarray:
+    """
+    Index of every cell in the flattened landscape_lut table.
+
+    Returns:
+        (height, width) array, row y and column x
+    """
+    keys = landscape.state * np.uint8(2 * len(FuelLevel))
+    keys += landscape.road.view(np.uint8) * np.uint8(len(FuelLevel))
+    keys += landscape.fuel
+    return keys.T
+
+
+class LandscapeRaster:
+    """
+    RGBA image of a landscape, kept up to date incrementally.
+
+    The image has shape (height, width, 4), row y and column x, to be shown with origin='lower'.
+    """
+    def __init__(self, landscape: LandscapeState):
+        self.landscape = landscape
+        self._lut = landscape_lut().reshape(-1, 4)
+        self.image = np.zeros((landscape.height, landscape.width, 4), dtype=np.uint8)
+        # colour table index of every pixel in the image
+        self._keys = landscape_keys(landscape)
+        self.image[:] = self._lut[self._keys]
+
+    def update(self) -> int:
+        """
+        Recolour the pixels of the cells that changed since the last update.
+
+        Returns:
+            The number of pixels recoloured
+        """
+        keys = landscape_keys(self.landscape)
+        changed = keys != self._keys
+        if not changed.any():
+            return 0
+        self.image[changed] = self._lut[keys[changed]]
+        self._keys = keys
+        return int(np.count_nonzero(changed))
+
+
+class RasterRenderer:
+    """
+    Draw a simulation model on a matplotlib Axes, the landscape as an image and the agents as a
+    scatter, with the same colours as agent_portrayal.
+
+    The artists are created once, update() brings them up to date with the model.
+    """
+    DRONE_SIZE = 5
+    DEBUG_DRONE_SIZE = 20
+    BASE_SIZE = 200
+
+    def __init__(self, model: 'SimulationModel', ax: Axes):
+        """
+        Args:
+            model: The simulation model
+            ax: The axes to draw on
+        """
+        self.model = model
+        self.ax = ax
+        self.raster = LandscapeRaster(model.landscape)
+        self._drone_colors = np.array([to_rgba(color) for color in COLORS])
+        self._debug_color = np.array(to_rgba("orange"))
+        self._base_color = np.array(to_rgba("grey"))
+        self._drone_path = self._marker_path("o")
+        self._base_path = self._marker_path("H")
+
+        width, height = model.grid.width, model.grid.height
+        self.image = ax.imshow(self.raster.image, origin='lower', interpolation='nearest',
+                               extent=(-0.5, width - 0.5, -0.5, height - 0.5), zorder=1)
+        self.agents = ax.scatter(np.empty(0), np.empty(0), marker="o", zorder=15)
+        ax.set_xlim(-0.5, width - 0.5)
+        ax.set_ylim(-0.5, height - 0.5)
+        ax.set_aspect('equal')
+        self._agent_count = None
+        self.update()
+
+    @staticmethod
+    def _marker_path(marker: str):
+        style = MarkerStyle(marker)
+        return style.get_path().transformed(style.get_transform())
+
+    def update(self) -> None:
+        """Bring the landscape image and the agents up to date with the model."""
+        if self.raster.update():
+            self.image.set_data(self.raster.image)
+
+        swarm = self.model.swarm_state
+        bases = list(self.model.bases)
+        positions = swarm.positions
+        placed = positions[:, 0] != UNSET
+
+        colors = self._drone_colors[swarm.colors[placed]]
+        sizes = np.full(len(colors), self.DRONE_SIZE, dtype=float)
+        debug = swarm.debug[placed]
+        colors[debug] = self._debug_color
+        sizes[debug] = self.DEBUG_DRONE_SIZE
+
+        # bases first so the drones are drawn over them
+        offsets = np.concatenate([np.array([base.pos for base in bases], dtype=float).reshape(-1, 2),
+                                  positions[placed]])
+        self.agents.set_offsets(offsets)
+        self.agents.set_facecolors(np.concatenate([np.tile(self._base_color, (len(bases), 1)), colors]))
+        self.agents.set_edgecolors('none')
+        self.agents.set_sizes(np.concatenate([np.full(len(bases), self.BASE_SIZE, dtype=float), sizes]))
+        counts = (len(bases), len(colors))
+        if counts != self._agent_count:
+            self.agents.set_paths([self._base_path] * len(bases) + [self._drone_path] * len(colors))
+            self._agent_count = counts
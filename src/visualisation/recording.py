@@ -0,0 +1,230 @@
+"""
+Headless recording of a run as an animation.
+
+Frames are rendered straight from the landscape and swarm state arrays, as palette indices into
+the colours of the raster renderer, so no figure is drawn and no colour quantisation is needed.
+A background thread encodes them while the model keeps stepping. GIFs are written frame by frame
+with Pillow, other formats (.mp4, .webm, ...) are piped to ffmpeg.
+"""
+import queue
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+from matplotlib.colors import to_rgb
+from PIL import GifImagePlugin, Image
+
+from src.models.swarm.state import COLORS, UNSET
+from src.utils.logging_config import get_logger
+from src.visualisation.raster import landscape_keys, landscape_lut
+
+if TYPE_CHECKING:
+    from src.simulation.simulation_model import SimulationModel
+
+logger = get_logger()
+
+
+def frame_palette() -> np.ndarray:
+    """
+    RGB palette of the frames: the landscape colours over a white background, then the drone
+    colours, the debug drone and the bases.
+
+    Returns:
+        (colours, 3) uint8 array
+    """
+    lut = landscape_lut().reshape(-1, 4).astype(float)
+    alpha = lut[:, 3:] / 255
+    landscape = np.round(lut[:, :3] * alpha + 255 * (1 - alpha))
+    agents = np.round(np.array([to_rgb(color) for color in COLORS + ('orange', 'grey')]) * 255)
+    return np.concatenate([landscape, agents]).astype(np.uint8)
+
+
+class FrameRenderer:
+    """
+    Render the model as frames of palette indices, north up.
+
+    Drones are single pixels in their colour, the debug drone orange, and bases 3x3 grey blocks.
+    """
+    def __init__(self, model: 'SimulationModel', downscale: int = 1):
+        """
+        Args:
+            model: The simulation model
+            downscale: Keep every n-th cell along each axis
+        """
+        self.model = model
+        self.downscale = int(downscale)
+        self.palette = frame_palette()
+        self._drone_index = len(self.palette) - len(COLORS) - 2
+        self._debug_index = len(self.palette) - 2
+        self._base_index = len(self.palette) - 1
+
+    @property
+    def shape(self) -> tuple:
+        """(height, width) of the frames."""
+        k = self.downscale
+        return -(-self.model.grid.height // k), -(-self.model.grid.width // k)
+
+    def render(self) -> np.ndarray:
+        """Render the current state of the model as a new (height, width) uint8 frame."""
+        k = self.downscale
+        height = self.model.grid.height
+        # flipped so that y grows upwards as in the raster renderer
+        frame = landscape_keys(self.model.landscape)[::-1][::k, ::k].copy()
+
+        for base in self.model.bases:
+            x, y = base.pos
+            row, column = (height - 1 - y) // k, x // k
+            frame[max(row - 1, 0):row + 2, max(column - 1, 0):column + 2] = self._base_index
+
+        swarm = self.model.swarm_state
+        positions = swarm.positions
+        placed = positions[:, 0] != UNSET
+        x, y = positions[placed].T
+        colors = swarm.colors[placed] + self._drone_index
+        colors[swarm.debug[placed]] = self._debug_index
+        frame[(height - 1 - y) // k, x // k] = colors
+        return frame
+
+
+class _GifWriter:
+    """
+    Write frames of palette indices to a looping GIF as they come.
+
+    Uses the getheader and getdata helpers of Pillow's GIF plugin, the frames are not kept in memory
+    for a single Image.save. TestRecording decodes the output, so a Pillow that changes them fails.
+    """
+
+    def __init__(self, path: Path, palette: np.ndarray, fps: float):
+        self.file = open(path, 'wb')
+        self.palette = palette.ravel().tolist()
+        self.duration = int(round(1000 / fps))
+        self.started = False
+
+    def write(self, frame: np.ndarray) -> None:
+        image = Image.frombytes('P', frame.shape[::-1], np.ascontiguousarray(frame).tobytes())
+        image.putpalette(self.palette)
+        if not self.started:
+            header, _ = GifImagePlugin.getheader(image, info={'loop': 0, 'duration': self.duration,
+                                                              'optimize': False})
+            self.file.write(b"".join(header))
+            self.started = True
+        self.file.write(b"".join(GifImagePlugin.getdata(image, duration=self.duration)))
+
+    def close(self) -> None:
+        if self.started:
+            # trailer
+            self.file.write(b";")
+        self.file.close()
+
+
+class _FfmpegWriter:
+    """Pipe RGB frames to an ffmpeg process encoding them."""
+
+    def __init__(self, path: Path, palette: np.ndarray, fps: float, shape: tuple):
+        self.palette = palette
+        height, width = shape
+        # most codecs need even dimensions, the frames are padded to them
+        self.padded = (height + height % 2, width + width % 2)
+        command = ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                   '-s', f'{self.padded[1]}x{self.padded[0]}', '-r', str(fps), '-i', '-',
+                   '-pix_fmt', 'yuv420p', str(path)]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame: np.ndarray) -> None:
+        rgb = np.full(self.padded + (3,), 255, dtype=np.uint8)
+        rgb[:frame.shape[0], :frame.shape[1]] = self.palette[frame]
+        self.process.stdin.write(rgb.tobytes())
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self.process.returncode}")
+
+
+class VideoRecorder:
+    """
+    Record a run to a GIF or video file, encoding in a background thread.
+
+    Frames are queued to the encoder as they are captured. The queue is bounded, so a model
+    stepping faster than the encoder waits instead of piling frames up in memory.
+    """
+    def __init__(self, model: 'SimulationModel', path: str, every: int = 1, downscale: int = 1,
+                 fps: float = 10, max_pending: int = 64):
+        """
+        Args:
+            model: The simulation model
+            path: File to write, a .gif or any format ffmpeg can write
+            every: Steps between frames
+            downscale: Keep every n-th cell along each axis of the frames
+            fps: Frames per second of the animation
+            max_pending: Number of frames queued before capture waits for the encoder
+        """
+        self.model = model
+        self.path = Path(path).expanduser()
+        self.every = int(every)
+        self.renderer = FrameRenderer(model, downscale)
+        self.frames = 0
+
+        if self.path.suffix.lower() != '.gif' and shutil.which('ffmpeg') is None:
+            raise RuntimeError(f"ffmpeg is needed to write {self.path.suffix} files, record to a .gif instead")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix.lower() == '.gif':
+            self._encoder = _GifWriter(self.path, self.renderer.palette, fps)
+        else:
+            self._encoder = _FfmpegWriter(self.path, self.renderer.palette, fps, self.renderer.shape)
+
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._write_loop, name="VideoRecorder", daemon=True)
+        self._writer.start()
+        self.closed = False
+
+    def capture(self) -> None:
+        """Capture a frame if the current step is on the stride, to be called after each step."""
+        if self.closed:
+            raise RuntimeError("The recorder is closed")
+        self._raise_writer_error()
+        if self.model.steps % self.every:
+            return
+        self._queue.put(self.renderer.render())
+        self.frames += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._encoder.write(frame)
+            except BaseException as e:
+                logger.error(f"Failed to encode a frame to {self.path}: {e!r}")
+                self._error = e
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("The recorder failed to encode its frames") from self._error
+
+    def close(self) -> None:
+        """Encode the remaining frames and finish the file."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(None)
+        self._writer.join()
+        try:
+            self._encoder.close()
+        except BaseException as e:
+            self._error = self._error or e
+        self._raise_writer_error()
+        logger.info(f"Recorded {self.frames} frames to {self.path}")
+
+    def __enter__(self) -> 'VideoRecorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,5 +1,35 @@
 
 import solara
+from matplotlib.figure import Figure
+from mesa.visualization.utils import update_counter
+
+from src.visualisation.raster import RasterRenderer
+
+
+def make_raster_space_component():
+    """Create a space component drawing the model as a raster image, updated in place each frame."""
+    def MakeRasterSpace(model):
+        return RasterSpace(model)
+
+    return MakeRasterSpace
+
+
+def _raster_figure(model):
+    fig = Figure()
+    ax = fig.add_subplot()
+    return fig, RasterRenderer(model, ax)
+
+
+@solara.component
+def RasterSpace(model):
+    """Component drawing the landscape image and the agents, reusing the figure between frames."""
+    update_counter.get()
+
+    # a new figure only when the model is replaced, e.g. on reset
+    fig, renderer = solara.use_memo(lambda: _raster_figure(model), dependencies=[model])
+    renderer.update()
+
+    solara.FigureMatplotlib(fig, format="png", bbox_inches="tight")
 
 
 @solara.component
@@ -1,6 +1,10 @@
+import numpy as np
+from matplotlib.colors import to_rgba
+
 from src.agents.base import DroneBase
-from src.agents.cell import Cell, FuelLevel
+from src.agents.cell import Cell, CellState, FuelLevel
 from src.agents.drone import Drone
+from src.models.environment.landscape import LandscapeState
 
 
 def cell_portrayal(agent: Cell):
@@ -30,6 +34,27 @@ def cell_portrayal(agent: Cell):
     }
 
 
+def landscape_colors(landscape: LandscapeState) -> np.ndarray:
+    """RGBA colour of every cell, same colours as cell_portrayal.
+
+    Returns:
+        Array of shape (width, height, 4)
+    """
+    alpha = 0x20 / 255
+    fuel_colors = np.array([
+        to_rgba("#FFFFFF"),  # Default white
+        to_rgba("#D2B48C", alpha),  # Tan for no fuel
+        to_rgba("#ADFF2F", alpha),  # Green-yellow for grass
+        to_rgba("#006400", alpha),  # Dark green for forest
+    ])
+
+    colors = fuel_colors[landscape.fuel]
+    colors[landscape.road] = to_rgba("#808080")
+    colors[landscape.state == CellState.BURNING] = to_rgba("#FF0000")
+    colors[landscape.state == CellState.BURNT] = to_rgba("#000000")
+    return colors
+
+
 def drone_base_portrayal(agent):
     return {
         "marker": "H",
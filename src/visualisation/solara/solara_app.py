@@ -1,4 +1,5 @@
 import argparse
+import atexit
 import os
 import sys
 from pathlib import Path
@@ -7,13 +8,13 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 import matplotlib.pyplot as plt
-from mesa.visualization import SolaraViz, make_space_component
+from mesa.visualization import SolaraViz
 
 from src.simulation.simulation_model import SimulationModel
 from src.utils.config import Config
 from src.utils.logging_config import get_logger
-from src.visualisation.solara.components import RuntimeControls
-from src.visualisation.solara.custom_elements import agent_portrayal
+from src.visualisation.solara.components import (RuntimeControls,
+                                                 make_raster_space_component)
 
 logger = get_logger()
 
@@ -29,10 +30,18 @@ def main():
 
     # Initialise config and model
     config = Config(config_path)
+    if output_gif:
+        # The model records its frames as it steps, headless, whatever the browser shows
+        overrides = {'simulation.video_path': output_gif}
+        if os.environ.get("WILDFIRE_FRAME_EVERY"):
+            overrides['simulation.video_every'] = int(os.environ["WILDFIRE_FRAME_EVERY"])
+        if os.environ.get("WILDFIRE_DOWNSCALE"):
+            overrides['simulation.video_downscale'] = int(os.environ["WILDFIRE_DOWNSCALE"])
+        config = config.with_overrides(overrides)
     model = SimulationModel(config)
 
     # Create visualization components
-    SpaceGraph = make_space_component(agent_portrayal, draw_grid=False)
+    SpaceGraph = make_raster_space_component()
 
     # Create additional visualization components as needed
 
@@ -57,10 +66,9 @@ def main():
         play_interval=1,
     )
 
-    # If output-gif was specified, save the visualization
-    if output_gif:
-        # This would require additional code to save animation frames
-        pass
+    # The app never runs the model to the end, finish the recording when the server stops
+    if model.recorder:
+        atexit.register(model.recorder.close)
 
     return page
 
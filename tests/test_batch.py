@@ -0,0 +1,47 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from src.simulation.batch import expand_grid, parse_values, run_sweep
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_parse_values(self):
+        """Test that sweep values keep their type and integer ranges are expanded"""
+        self.assertEqual(parse_values("1,2.5,true,simple"), [1, 2.5, True, "simple"])
+        self.assertEqual(parse_values("0-3,10"), [0, 1, 2, 3, 10])
+
+    def test_expand_grid(self):
+        """Test that the grid expands to every combination of values"""
+        runs = expand_grid({"swarm.initial_bases": [1, 2], "simulation.seed": [0, 1, 2]})
+        self.assertEqual(len(runs), 6)
+        self.assertIn({"swarm.initial_bases": 2, "simulation.seed": 1}, runs)
+
+    def test_run_sweep_streams_summaries(self):
+        """Test that a sweep writes one summary line per run"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        config_path = os.path.join(temp_dir, "config.yml")
+        with open(config_path, "w") as f:
+            yaml.dump({"simulation": {"area_size": "small", "max_steps": 3, "save_data": False},
+                       "swarm": {"drone_base": {"number_of_agents": 2}}}, f)
+        output = os.path.join(temp_dir, "sweep.jsonl")
+
+        failed = run_sweep(config_path, {"simulation.seed": [0, 1, 2]}, output, workers=2)
+
+        self.assertEqual(failed, 0)
+        with open(output) as f:
+            summaries = [json.loads(line) for line in f]
+        self.assertEqual(sorted(s["overrides"]["simulation.seed"] for s in summaries), [0, 1, 2])
+        for summary in summaries:
+            self.assertEqual(summary["steps"], 3)
+            self.assertEqual(summary["drones"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
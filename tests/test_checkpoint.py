@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def make_model(self, **overrides):
+        config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.save_data': False,
+                                          'swarm.drone_base.number_of_agents': 20, **overrides})
+        model = SimulationModel(config)
+        model.start_fire(num_fires=3)
+        return model
+
+    def snapshot(self, model):
+        return (model.steps, model.landscape.state.copy(), model.landscape.burn_counter.copy(),
+                [(drone.unique_id, drone.pos, drone.target_pos, drone.color) for drone in model.drones])
+
+    def check_continuation(self, **overrides):
+        model = self.make_model(**overrides)
+        for _ in range(15):
+            model.step()
+        path = os.path.join(self.temp_dir, "checkpoint.npz")
+        model.save_checkpoint(path)
+        for _ in range(15):
+            model.step()
+        expected = self.snapshot(model)
+
+        restored = SimulationModel.from_checkpoint(path)
+        self.assertEqual(restored.steps, 15)
+        for _ in range(15):
+            restored.step()
+        steps, state, burn_counter, drones = self.snapshot(restored)
+
+        self.assertEqual(steps, expected[0])
+        np.testing.assert_array_equal(state, expected[1])
+        np.testing.assert_array_equal(burn_counter, expected[2])
+        self.assertEqual(drones, expected[3])
+
+    def test_continuation_is_identical(self):
+        """Test that a restored model continues exactly like the original"""
+        self.check_continuation()
+
+    def test_continuation_with_vectorised_engines(self):
+        """Test the continuation with the vectorised fire and swarm engines"""
+        self.check_continuation(**{'fire.model': 'vectorised', 'swarm.engine': 'vectorised'})
+
+    def test_continuation_with_rothermel(self):
+        """Test the continuation with the Rothermel fire model, whose fronts carry over between steps"""
+        self.check_continuation(**{'fire.model': 'rothermel', 'wind.speed': 2})
+
+    def test_continuation_with_arrival_times(self):
+        """Test the continuation with the arrival time fire model, whose ignition times are saved"""
+        self.check_continuation(**{'fire.model': 'arrival'})
+
+    def test_continuation_with_smoke(self):
+        """Test the continuation with the smoke field, which is saved with the model"""
+        self.check_continuation(**{'smoke.enabled': True, 'wind.speed': 2})
+
+    def test_restored_model_keeps_bases_and_ids(self):
+        """Test that the bases own their drones and new agents get fresh ids"""
+        model = self.make_model()
+        path = os.path.join(self.temp_dir, "checkpoint.npz")
+        model.save_checkpoint(path)
+
+        restored = SimulationModel.from_checkpoint(path)
+        self.assertEqual([len(base.drones) for base in restored.bases], [len(base.drones) for base in model.bases])
+        ids = {agent.unique_id for agent in restored.agents}
+        restored.add_base()
+        new_ids = {agent.unique_id for agent in restored.agents} - ids
+        self.assertTrue(new_ids)
+        self.assertGreater(min(new_ids), max(ids))
+
+    def test_ids_with_removed_drones(self):
+        """Test that the ids and the swarm order survive removed drones, including the newest one"""
+        model = self.make_model()
+        for _ in range(3):
+            model.step()
+        for drone in (model.swarm_state.drones[3], model.swarm_state.drones[-1]):
+            model.grid.remove_agent(drone)
+            for base in model.bases:
+                if drone in base.drones:
+                    base.drones.remove(drone)
+            drone.remove()
+        path = os.path.join(self.temp_dir, "checkpoint.npz")
+        model.save_checkpoint(path)
+
+        restored = SimulationModel.from_checkpoint(path)
+        self.assertEqual([(drone.unique_id, drone.pos) for drone in restored.swarm_state.drones],
+                         [(drone.unique_id, drone.pos) for drone in model.swarm_state.drones])
+        self.assertEqual([agent.unique_id for agent in restored.agents], [agent.unique_id for agent in model.agents])
+        self.assertEqual(restored.last_agent_id, model.last_agent_id)
+        restored.add_base()
+        self.assertEqual(list(restored.bases)[-1].unique_id, model.last_agent_id + 1)
+
+    def test_resume_agent_ids(self):
+        """Test that the id counter of the model can be set, as the restore needs"""
+        model = self.make_model()
+        model._resume_agent_ids(1000)
+        model.add_base()
+        self.assertEqual(list(model.bases)[-1].unique_id, 1000)
+        self.assertEqual(model.last_agent_id, 1000 + model.N)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -292,6 +292,20 @@ class TestConfig(unittest.TestCase):
         c = Config(yaml_path)
         self.assertNotIn("unknown_field", vars(c.config.simulation))
 
+    def test_with_overrides(self):
+        """Test that overrides return a validated copy of the configuration"""
+        config = Config()
+        overridden = config.with_overrides({'simulation.seed': 7, 'swarm.drone.communication_range': 4})
+        self.assertEqual(overridden.get('simulation.seed'), 7)
+        self.assertEqual(overridden.get('swarm.drone.communication_range'), 4)
+        self.assertEqual(overridden.get('fire.model'), config.get('fire.model'))
+        self.assertNotEqual(config.get('simulation.seed'), 7)
+
+        with self.assertRaises(ConfigError):
+            config.with_overrides({'simulation.unknown': 1})
+        with self.assertRaises(ConfigError):
+            config.with_overrides({'simulation.max_steps': 0})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import yaml
+
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.utils.data_collection import (DataCollector, connectivity,
+                                       coverage_mask, load_metrics)
+
+
+class TestDataCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        config_path = os.path.join(self.temp_dir, "config.yml")
+        with open(config_path, "w") as f:
+            yaml.dump({"simulation": {"area_size": "small", "max_steps": 10, "save_data": True,
+                                      "save_location": self.temp_dir,
+                                      "save_chunk_size": 4},
+                       "swarm": {"drone_base": {"number_of_agents": 3}}}, f)
+        self.model = SimulationModel(Config(config_path))
+        self.model.start_fire(1)
+
+    def test_chunks_are_written_and_loaded(self):
+        """Test that a run is written in chunks and loads back as whole columns"""
+        self.model.run()
+        path = self.model.datacollector.path
+        self.assertEqual(len(list(path.glob("metrics_*.npz"))), 3)
+
+        metrics = load_metrics(path)
+        np.testing.assert_array_equal(metrics["step"], np.arange(1, 11))
+        land = np.count_nonzero(self.model.landscape.land)
+        np.testing.assert_array_equal(metrics["burning"] + metrics["burnt"] + metrics["unburnt"], land)
+
+    def test_ring_buffer_keeps_latest_steps(self):
+        """Test that the in-memory buffer holds the most recent steps"""
+        collector = DataCollector(self.model, chunk_size=4)
+        for _ in range(6):
+            self.model.step()
+            collector.collect()
+        np.testing.assert_array_equal(collector.latest("step"), [3, 4, 5, 6])
+        np.testing.assert_array_equal(collector.latest("step", 2), [5, 6])
+
+    def test_coverage_and_connectivity(self):
+        """Test the coverage mask and the connectivity of the swarm"""
+        positions = np.array([[0, 0], [5, 5], [5, 5], [9, 9]])
+        covered = coverage_mask(positions, 1, (10, 10))
+        self.assertEqual(np.count_nonzero(covered), 4 + 9 + 4)
+        self.assertTrue(covered[6, 4])
+        self.assertFalse(covered[2, 2])
+
+        self.assertEqual(connectivity(positions, 4), (0.75, 2))
+        self.assertEqual(connectivity(positions, 5), (1.0, 1))
+
+    def test_drones_off_the_grid_are_left_out(self):
+        """Test that a drone without a position does not count in the coverage or connectivity"""
+        drone = self.model.swarm_state.drones[0]
+        self.model.grid.remove_agent(drone)
+        collector = DataCollector(self.model, chunk_size=4)
+        collector.collect()
+
+        positions = np.array([d.pos for d in self.model.swarm_state.drones[1:]])
+        land = self.model.landscape.land
+        covered = coverage_mask(positions, collector.vision_range, land.shape)
+        self.assertAlmostEqual(collector.latest('coverage')[0],
+                               np.count_nonzero(covered & land) / np.count_nonzero(land))
+        self.assertEqual(collector.latest('connectivity')[0],
+                         connectivity(positions, collector.communication_range)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import yaml
+
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.utils.export import StreamingExporter, read_chunks
+
+
+class TestStreamingExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        config_path = os.path.join(self.temp_dir, "config.yml")
+        with open(config_path, "w") as f:
+            yaml.dump({"simulation": {"area_size": "small", "max_steps": 12, "save_data": True,
+                                      "save_location": self.temp_dir,
+                                      "export_snapshots_every": 3, "export_trajectories": True},
+                       "swarm": {"drone_base": {"number_of_agents": 3}}}, f)
+        self.model = SimulationModel(Config(config_path))
+        self.model.start_fire(1)
+
+    def test_run_exports_snapshots_and_trajectories(self):
+        """Test that a run streams its snapshots and trajectories to disk"""
+        self.model.run()
+        path = self.model.run_path
+
+        snapshots = list(read_chunks(path, "landscape"))
+        np.testing.assert_array_equal(np.concatenate([c["step"] for c in snapshots]), [3, 6, 9, 12])
+        np.testing.assert_array_equal(snapshots[-1]["state"][-1], self.model.landscape.state)
+
+        trajectories = list(read_chunks(path, "trajectories"))
+        self.assertEqual(len(trajectories), 1)
+        self.assertEqual(trajectories[0]["positions"].shape, (12, 3, 2))
+        np.testing.assert_array_equal(trajectories[0]["positions"][-1], [d.pos for d in self.model.drones])
+
+    def test_chunks_are_appended(self):
+        """Test that every full chunk is written to a new file and a changed swarm starts a new chunk"""
+        path = os.path.join(self.temp_dir, "chunks")
+        with StreamingExporter(self.model, path, snapshot_every=1, snapshot_chunk=2, trajectory_chunk=4) as exporter:
+            for _ in range(5):
+                self.model.step()
+                exporter.record()
+            self.model.add_base()
+            self.model.step()
+            exporter.record()
+
+        self.assertEqual([len(c["step"]) for c in read_chunks(path, "landscape")], [2, 2, 2])
+        trajectories = list(read_chunks(path, "trajectories"))
+        self.assertEqual([len(c["step"]) for c in trajectories], [4, 1, 1])
+        self.assertEqual(trajectories[-1]["positions"].shape[1], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,247 @@
+import unittest
+
+import mesa
+import numpy as np
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.environment.environment import GridEnvironment
+from src.models.environment.wind import WindField
+from src.models.fire.arrival import ArrivalTimeFireModel
+from src.models.fire.rothermel import RothermelModel, rate_of_spread
+from src.models.fire.simple import SimpleFireModel
+from src.models.fire.vectorised import VectorisedFireModel
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.utils.random_streams import RandomStreams
+
+
+class FireOnlyModel(mesa.Model):
+    """Minimal model holding a grid and a fire model, without drones."""
+
+    def __init__(self, fire_model, seed: int, size: int = 30):
+        super().__init__(seed=seed)
+        self.config = Config()
+        self.streams = RandomStreams(seed)
+        self.grid = GridEnvironment(self, size, size)
+        self.landscape = self.grid.landscape
+        self.fire_model = fire_model(self)
+
+
+def burnt_area(fire_model, seed: int, steps: int) -> int:
+    """Number of cells reached by a fire started in the middle of a uniform landscape."""
+    model = FireOnlyModel(fire_model, seed)
+    model.landscape.fuel[...] = FuelLevel.MEDIUM
+    model.landscape.state[15, 15] = CellState.BURNING
+    for _ in range(steps):
+        model.fire_model.step()
+    return model.landscape.count(CellState.BURNING) + model.landscape.count(CellState.BURNT)
+
+
+class TestFireModels(unittest.TestCase):
+
+    def test_burn_out(self):
+        """Test that burning cells burn out after their burn time"""
+        for fire_model in (SimpleFireModel, VectorisedFireModel, RothermelModel, ArrivalTimeFireModel):
+            model = FireOnlyModel(fire_model, seed=1)
+            model.landscape.fuel[...] = FuelLevel.EMPTY
+            model.landscape.state[10, 10] = CellState.BURNING
+            model.fire_model.step()
+            self.assertEqual(model.landscape.state[10, 10], CellState.BURNT)
+            self.assertEqual(model.landscape.count(CellState.BURNING), 0)
+
+    def test_void_cells_do_not_burn(self):
+        """Test that fire does not spread to positions without land"""
+        for fire_model in (SimpleFireModel, VectorisedFireModel, RothermelModel, ArrivalTimeFireModel):
+            model = FireOnlyModel(fire_model, seed=1)
+            model.landscape.fuel[...] = FuelLevel.HIGH
+            model.landscape.state[10, 6] = CellState.BURNING
+            for _ in range(5):
+                model.fire_model.step()
+            self.assertTrue(np.all(model.landscape.state[:, :5] == CellState.VOID))
+
+    def test_active_front(self):
+        """Test that the active set follows ignitions and burn outs"""
+        for fire_model in (SimpleFireModel, VectorisedFireModel, RothermelModel, ArrivalTimeFireModel):
+            model = FireOnlyModel(fire_model, seed=1)
+            model.landscape.fuel[...] = FuelLevel.LOW
+            model.fire_model.ignite((10, 10))
+            self.assertEqual(len(model.fire_model.frontier()), 8)
+
+            for _ in range(10):
+                model.fire_model.step()
+                burning = set(model.landscape.positions(model.landscape.on_fire))
+                self.assertEqual(model.fire_model.burning, burning)
+                front = {pos for x, y in burning for pos in model.grid.get_neighborhood((x, y), moore=True)
+                         if model.landscape.state[pos] == CellState.UNBURNT}
+                self.assertEqual(model.fire_model.frontier(), front)
+
+    def test_vectorised_matches_simple(self):
+        """Test that the vectorised model spreads like the per-cell model on average"""
+        seeds = range(60)
+        simple = np.array([burnt_area(SimpleFireModel, seed, steps=4) for seed in seeds])
+        vectorised = np.array([burnt_area(VectorisedFireModel, seed, steps=4) for seed in seeds])
+
+        standard_error = np.sqrt((simple.var() + vectorised.var()) / len(seeds))
+        self.assertLess(abs(simple.mean() - vectorised.mean()), 4 * standard_error)
+
+    def test_fire_spreads_downwind(self):
+        """Test that the probabilistic fire models burn more downwind than upwind"""
+        for fire_model in (SimpleFireModel, VectorisedFireModel, ArrivalTimeFireModel):
+            downwind = upwind = 0
+            for seed in range(10):
+                model = FireOnlyModel(fire_model, seed)
+                model.grid.wind.set(speed=8, direction=270)
+                model.landscape.fuel[...] = FuelLevel.MEDIUM
+                model.landscape.state[15, 15] = CellState.BURNING
+                for _ in range(4):
+                    model.fire_model.step()
+                reached = model.landscape.state != CellState.UNBURNT
+                downwind += np.count_nonzero(reached[16:])
+                upwind += np.count_nonzero(reached[:15])
+            self.assertGreater(downwind, 2 * upwind, fire_model.__name__)
+
+
+class TestRothermelModel(unittest.TestCase):
+
+    def test_rate_of_spread(self):
+        """Test that the rate of spread grows with wind and slope and stops without fuel"""
+        still = rate_of_spread(FuelLevel.LOW, 0, 0, moisture=0.06)
+        self.assertGreater(still, 0)
+        self.assertGreater(rate_of_spread(FuelLevel.LOW, 3, 0, moisture=0.06), still)
+        self.assertGreater(rate_of_spread(FuelLevel.LOW, 0, 0.5, moisture=0.06), still)
+        self.assertEqual(rate_of_spread(FuelLevel.EMPTY, 3, 0.5, moisture=0.06), 0)
+        # moisture of extinction of short grass is 12%
+        self.assertEqual(rate_of_spread(FuelLevel.LOW, 3, 0, moisture=0.2), 0)
+
+    def test_table_matches_formula(self):
+        """Test that the lookup table holds the rates of the formula at the bin centres"""
+        model = FireOnlyModel(RothermelModel, seed=1)
+        fire = model.fire_model
+        wind_bin, slope_bin = 12, 4
+        expected = rate_of_spread(FuelLevel.HIGH, wind_bin * WindField.SPEED_STEP, slope_bin * fire.SLOPE_STEP,
+                                  fire.moisture)
+        self.assertAlmostEqual(fire.ros_table[FuelLevel.HIGH, wind_bin, slope_bin], expected, places=4)
+
+    def test_wind_drives_the_fire_downwind(self):
+        """Test that the fire spreads further downwind than upwind and across the wind"""
+        model = FireOnlyModel(RothermelModel, seed=1, size=60)
+        model.landscape.fuel[...] = FuelLevel.LOW
+        model.landscape.state[...] = CellState.UNBURNT
+        # wind from the west
+        model.grid.wind.set(speed=3, direction=270)
+        model.fire_model.ignite((20, 30))
+        for _ in range(20):
+            model.fire_model.step()
+        reached = np.argwhere(model.landscape.state != CellState.UNBURNT)
+        (west, south), (east, north) = reached.min(axis=0), reached.max(axis=0)
+        self.assertGreater(east - 20, 3 * (20 - west))
+        self.assertGreater(east - 20, north - 30)
+        self.assertEqual(north - 30, 30 - south)
+
+    def test_strong_wind_keeps_the_flanks(self):
+        """Test that a fire in strong wind spreads across the wind and around a gap in the fuel"""
+        model = FireOnlyModel(RothermelModel, seed=1, size=60)
+        model.landscape.fuel[...] = FuelLevel.LOW
+        model.landscape.state[...] = CellState.UNBURNT
+        model.grid.wind.set(speed=10, direction=270)
+        model.landscape.fuel[14, 30] = FuelLevel.EMPTY
+        model.fire_model.ignite((10, 30))
+        for _ in range(30):
+            model.fire_model.step()
+        reached = np.argwhere(model.landscape.state != CellState.UNBURNT)
+        (_, south), (east, north) = reached.min(axis=0), reached.max(axis=0)
+        self.assertGreaterEqual(north - south, 4)
+        self.assertGreater(east, 30)
+
+    def test_progress_carries_over(self):
+        """Test that a front slower than one cell per step ignites the cell after several steps"""
+        model = FireOnlyModel(RothermelModel, seed=1)
+        model.landscape.fuel[...] = FuelLevel.LOW
+        model.fire_model.ignite((15, 15))
+        # 10 m cells at about 1.4 m/min without wind
+        steps = 0
+        while model.landscape.state[16, 15] == CellState.UNBURNT:
+            model.fire_model.step()
+            steps += 1
+        self.assertEqual(steps, 8)
+
+
+class TestArrivalTimeFireModel(unittest.TestCase):
+
+    def test_matches_simple(self):
+        """Test that the ignition times spread the fire like the per-cell model on average"""
+        seeds = range(60)
+        simple = np.array([burnt_area(SimpleFireModel, seed, steps=4) for seed in seeds])
+        arrival = np.array([burnt_area(ArrivalTimeFireModel, seed, steps=4) for seed in seeds])
+
+        standard_error = np.sqrt((simple.var() + arrival.var()) / len(seeds))
+        self.assertLess(abs(simple.mean() - arrival.mean()), 4 * standard_error)
+
+    def test_state_at_any_step(self):
+        """Test that the state at a step follows from the ignition times, ahead of the steps"""
+        model = FireOnlyModel(ArrivalTimeFireModel, seed=2)
+        model.landscape.fuel[...] = FuelLevel.HIGH
+        fire = model.fire_model
+        fire.ignite((15, 15))
+        ahead = [fire.state_at(step).reshape(model.landscape.state.shape) for step in range(1, 9)]
+        for expected in ahead:
+            fire.step()
+            np.testing.assert_array_equal(model.landscape.state, expected)
+            burning = model.landscape.state == CellState.BURNING
+            self.assertTrue(np.all(model.landscape.burn_counter[burning] < fire.burn_time[FuelLevel.HIGH]))
+
+        fire.advance_to(fire.end_time)
+        self.assertEqual(model.landscape.count(CellState.BURNING), 0)
+        self.assertGreater(model.landscape.count(CellState.BURNT), 100)
+
+    def test_deterministic_delays(self):
+        """Test that the deterministic spread does not depend on the seed and is symmetric"""
+        states = []
+        for seed in (1, 2):
+            model = FireOnlyModel(ArrivalTimeFireModel, seed)
+            model.fire_model.deterministic = True
+            model.landscape.fuel[...] = FuelLevel.MEDIUM
+            model.fire_model.ignite((15, 15))
+            model.fire_model.advance_to(5)
+            states.append(model.landscape.state.copy())
+        np.testing.assert_array_equal(states[0], states[1])
+        reached = states[0][10:21, 10:21] != CellState.UNBURNT
+        np.testing.assert_array_equal(reached, reached.T)
+        np.testing.assert_array_equal(reached, reached[::-1])
+
+    def test_sweeps_again_after_ignition(self):
+        """Test that a fire started during the run gets its own ignition times"""
+        model = FireOnlyModel(ArrivalTimeFireModel, seed=1)
+        model.landscape.fuel[...] = FuelLevel.HIGH
+        model.fire_model.ignite((5, 8))
+        model.fire_model.step()
+        self.assertEqual(model.fire_model.state_at(1, np.array([25 * 30 + 25]))[0], CellState.UNBURNT)
+        model.fire_model.ignite((25, 25))
+        model.fire_model.step()
+        self.assertIn((25, 25), set(map(tuple, model.fire_model.get_front().tolist())))
+        self.assertTrue(np.all(model.fire_model.ignition.reshape(30, 30)[24:27, 24:27] < 10))
+
+    def test_fire_only_run_in_one_pass(self):
+        """Test that a run without drones jumps to its last step with the state it would step to"""
+        config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.save_data': False,
+                                          'simulation.collect_metrics': True, 'simulation.max_steps': 40,
+                                          'swarm.initial_bases': 0,
+                                          'fire.model': 'arrival'})
+        stepped = SimulationModel(config)
+        stepped.start_fire(num_fires=3)
+        ahead = stepped.fire_state_at(25)
+        for _ in range(40):
+            stepped.step()
+        fast = SimulationModel(config)
+        fast.start_fire(num_fires=3)
+        fast.run()
+
+        self.assertEqual(fast.steps, 40)
+        self.assertEqual(fast.datacollector.rows, 1)
+        np.testing.assert_array_equal(fast.landscape.state, stepped.landscape.state)
+        np.testing.assert_array_equal(fast.landscape.burn_counter, stepped.landscape.burn_counter)
+        np.testing.assert_array_equal(stepped.fire_state_at(25), ahead)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mesa
+import numpy as np
+from PIL import Image
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.environment.builder import LandscapeBuilder
+from src.models.environment.environment import GridEnvironment
+from src.models.environment.landscape import LandscapeState
+from src.utils.random_streams import RandomStreams
+
+
+class TestLandscapeState(unittest.TestCase):
+
+    def setUp(self):
+        self.landscape = LandscapeState(20, 10)
+        self.landscape.randomise_fuel(np.random.default_rng(42))
+
+    def test_array_layout(self):
+        """Test that the state is stored as compact arrays indexed by (x, y)"""
+        self.assertEqual(self.landscape.fuel.shape, (20, 10))
+        self.assertEqual(self.landscape.fuel.dtype, np.uint8)
+        self.assertEqual(self.landscape.state.dtype, np.uint8)
+        self.assertEqual(self.landscape.burn_counter.dtype, np.uint8)
+        self.assertEqual(self.landscape.road.dtype, bool)
+        self.assertTrue(np.all(self.landscape.fuel <= FuelLevel.HIGH))
+
+    def test_cell_view_reads_and_writes_arrays(self):
+        """Test that the Cell view is backed by the arrays"""
+        cell = self.landscape.cell((3, 4))
+        self.assertEqual(cell.fuel_level, FuelLevel(self.landscape.fuel[3, 4]))
+        self.assertFalse(cell.on_fire)
+
+        cell.on_fire = True
+        self.assertEqual(self.landscape.state[3, 4], CellState.BURNING)
+
+        cell.burn_counter += 1
+        self.assertEqual(self.landscape.burn_counter[3, 4], 1)
+
+        cell.on_fire = False
+        cell.burnt = True
+        self.assertEqual(self.landscape.state[3, 4], CellState.BURNT)
+        self.assertFalse(cell.on_fire)
+
+    def test_void_cells(self):
+        """Test that void positions are not land cells"""
+        self.landscape.state[:, :2] = CellState.VOID
+        self.assertFalse(self.landscape.has_cell((0, 1)))
+        self.assertTrue(self.landscape.has_cell((0, 2)))
+        self.assertFalse(self.landscape.has_cell((20, 2)))
+        self.assertEqual(len(self.landscape), 20 * 8)
+        self.assertEqual(len(list(self.landscape)), 20 * 8)
+
+
+
+class TestLandscapeBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        # map orientation, first row north
+        self.raster = np.array([[1, 2, 3, 0],
+                                [0, 1, 2, 3],
+                                [3, 3, 1, 1]])
+
+    def check_fuel(self, path):
+        landscape = LandscapeBuilder(0, 0, fuel_path=path, void_rows=0).build(np.random.default_rng(0))
+        self.assertEqual((landscape.width, landscape.height), (4, 3))
+        self.assertEqual(landscape.fuel[0, 2], 1)  # north west
+        self.assertEqual(landscape.fuel[3, 0], 1)  # south east
+        np.testing.assert_array_equal(landscape.fuel, np.flipud(self.raster).T)
+        return landscape
+
+    def test_npy(self):
+        path = os.path.join(self.temp_dir, "fuel.npy")
+        np.save(path, self.raster)
+        self.check_fuel(path)
+
+    def test_ascii_grid(self):
+        """Test that ASCII grids are read with their nodata cells left without land"""
+        path = os.path.join(self.temp_dir, "fuel.asc")
+        with open(path, 'w') as file:
+            file.write("ncols 4\nnrows 3\nxllcorner 0\nyllcorner 0\ncellsize 30\nNODATA_value -9999\n")
+            file.write("1 2 3 0\n0 1 -9999 3\n3 3 1 1\n")
+        landscape = LandscapeBuilder(0, 0, fuel_path=path, void_rows=0).build(np.random.default_rng(0))
+        self.assertEqual(landscape.state[2, 1], CellState.VOID)
+        self.assertEqual(len(landscape), 11)
+
+    def test_geotiff(self):
+        path = os.path.join(self.temp_dir, "fuel.tif")
+        Image.fromarray(self.raster.astype(np.uint8)).save(path)
+        self.check_fuel(path)
+
+    def test_invalid_fuel(self):
+        path = os.path.join(self.temp_dir, "fuel.npy")
+        np.save(path, self.raster + 1)
+        with self.assertRaises(ValueError):
+            LandscapeBuilder(0, 0, fuel_path=path)
+
+    def test_roads_and_void_rows(self):
+        """Test the road mask from a raster and the rows reserved for the bases"""
+        path = os.path.join(self.temp_dir, "roads.npy")
+        roads = np.zeros((30, 20), dtype=np.uint8)
+        roads[:, 7] = 1
+        np.save(path, roads)
+        landscape = LandscapeBuilder(20, 30, road_path=path, void_rows=2).build(np.random.default_rng(0))
+        self.assertTrue(np.all(landscape.road[7, 2:]))
+        self.assertEqual(np.count_nonzero(landscape.road), 28)
+        self.assertTrue(np.all(landscape.state[:, :2] == CellState.VOID))
+
+    def test_large_landscape(self):
+        """Test that a 2000x2000 environment builds well under a second"""
+        model = mesa.Model(seed=0)
+        model.streams = RandomStreams(0)
+        start = time.perf_counter()
+        grid = GridEnvironment(model, 2000, 2000)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(grid.landscape.fuel.shape, (2000, 2000))
+        self.assertTrue(grid.is_cell_empty((1999, 1999)))
+
+
+class TestGridApi(unittest.TestCase):
+    """The mesa grid API of GridEnvironment, against a plain mesa MultiGrid"""
+
+    def setUp(self):
+        model = mesa.Model(seed=0)
+        model.streams = RandomStreams(0)
+        self.grid = GridEnvironment(model, 12, 9)
+        self.agents = [mesa.Agent(model) for _ in range(3)]
+        reference_model = mesa.Model(seed=0)
+        self.reference = mesa.space.MultiGrid(12, 9, torus=False)
+        self.reference_agents = [mesa.Agent(reference_model) for _ in range(3)]
+
+    def apply(self, method, index, *args):
+        getattr(self.grid, method)(self.agents[index], *args)
+        getattr(self.reference, method)(self.reference_agents[index], *args)
+        self.assertEqual(self.agents[index].pos, self.reference_agents[index].pos)
+
+    def check_same(self):
+        def ids(agents):
+            return [agent.unique_id for agent in agents]
+
+        self.assertEqual(self.grid.empties, self.reference.empties)
+        self.assertEqual([(ids(contents), pos) for contents, pos in self.grid.coord_iter()],
+                         [(ids(contents), pos) for contents, pos in self.reference.coord_iter()])
+        for x in range(12):
+            for y in range(9):
+                self.assertEqual(self.grid.is_cell_empty((x, y)), self.reference.is_cell_empty((x, y)))
+                self.assertEqual(ids(self.grid.get_cell_list_contents([(x, y)])),
+                                 ids(self.reference.get_cell_list_contents([(x, y)])))
+                self.assertEqual(ids(self.grid.get_neighbors((x, y), moore=True, radius=2)),
+                                 ids(self.reference.get_neighbors((x, y), moore=True, radius=2)))
+
+    def test_place_move_remove(self):
+        """Test that placing, moving and removing agents match mesa"""
+        self.check_same()
+        self.apply('place_agent', 0, (0, 0))
+        self.apply('place_agent', 1, (11, 8))
+        self.apply('place_agent', 2, (11, 8))
+        self.check_same()
+        self.apply('move_agent', 1, (5, 4))
+        self.apply('move_agent', 0, (5, 4))
+        self.check_same()
+        self.apply('remove_agent', 2)
+        self.check_same()
+        self.assertEqual(len(self.grid.empties), 12 * 9 - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
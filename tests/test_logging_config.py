@@ -0,0 +1,43 @@
+import unittest
+
+from src.utils.logging_config import DroneLogger, get_logger, log
+
+
+class TestGetLogger(unittest.TestCase):
+
+    def test_caller_module_name(self):
+        """Test that the logger is bound to the calling module and cached"""
+        records = []
+        sink = log.add(lambda message: records.append(message.record["extra"]["name"]), level="INFO")
+        try:
+            get_logger().info("from the test module")
+            get_logger("other.module").info("from another module")
+        finally:
+            log.remove(sink)
+
+        self.assertEqual(records, [__name__, "other.module"])
+        self.assertIs(get_logger(), get_logger(__name__))
+
+
+class TestDroneLogger(unittest.TestCase):
+
+    def test_messages_are_formatted_only_when_on(self):
+        """Test that a drone logger that is off never builds its messages"""
+        messages = []
+        sink = log.add(lambda message: messages.append(message.record["message"]), level="DEBUG")
+        drone_logger = DroneLogger(get_logger())
+        try:
+            drone_logger.debug(lambda: self.fail("formatted while off"))
+            drone_logger.debug("Moving towards {}, at {}", (1, 2), (3, 4))
+
+            drone_logger.on = True
+            drone_logger.debug("Moving towards {}, at {}", (1, 2), (3, 4))
+            drone_logger.debug(lambda: "built lazily")
+        finally:
+            log.remove(sink)
+
+        self.assertEqual(messages, ["Moving towards (1, 2), at (3, 4)", "built lazily"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+
+import mesa
+
+from src.agents.drone import Drone
+from src.models.environment.environment import GridEnvironment
+from src.models.swarm.neighbourhood import SwarmNeighbourhood
+from src.models.swarm.state import SwarmState
+from src.models.swarm.vectorised import VectorisedSwarm
+from src.utils.config import Config
+from src.utils.profiling import NULL_PROFILER
+from src.utils.random_streams import RandomStreams
+
+
+class SwarmModel(mesa.Model):
+    """Minimal model holding a grid and randomly placed drones."""
+
+    def __init__(self, n: int, seed: int = 0):
+        super().__init__(seed=seed)
+        self.config = Config()
+        self.streams = RandomStreams(seed)
+        self.profiler = NULL_PROFILER
+        self.swarm_state = SwarmState(communication_range=self.config.config.swarm.drone.communication_range)
+        self.grid = GridEnvironment(self, 60, 60)
+        self.drones = []
+        for _ in range(n):
+            drone = Drone(self, (0, 0))
+            self.grid.place_agent(drone, (self.random.randrange(60), self.random.randrange(60)))
+            self.drones.append(drone)
+
+
+class TestSwarmNeighbourhood(unittest.TestCase):
+
+    def setUp(self):
+        self.model = SwarmModel(150)
+        self.radius = 8
+
+    def expected(self, drone):
+        neighbours = self.model.grid.get_agents_in_range(drone.pos, self.radius, Drone, exclude=drone)
+        nearest = min(neighbours, key=lambda n: drone.chebyshev_distance(n.pos)) if neighbours else None
+        same_cell = [n for n in neighbours if n.pos == drone.pos]
+        return neighbours, nearest, same_cell
+
+    def check(self, neighbourhood):
+        for drone in self.model.drones:
+            neighbours, nearest, same_cell = self.expected(drone)
+            self.assertEqual([n.pos for n in neighbourhood.neighbours(drone)], [n.pos for n in neighbours])
+            self.assertEqual(sorted(n.unique_id for n in neighbourhood.same_cell(drone)),
+                             sorted(n.unique_id for n in same_cell))
+            found, distance = neighbourhood.nearest(drone)
+            if nearest is None:
+                self.assertIsNone(found)
+            else:
+                self.assertEqual(found.pos, nearest.pos)
+                self.assertEqual(distance, drone.chebyshev_distance(nearest.pos))
+
+    def test_kdtree_matches_grid_queries(self):
+        """Test that both modes give the same neighbourhood as the grid queries"""
+        for synchronous, mode in [(True, 'kdtree'), (False, 'grid')]:
+            neighbourhood = SwarmNeighbourhood(self.model.grid, self.radius, synchronous)
+            neighbourhood.update(self.model.drones)
+            self.assertEqual(neighbourhood.mode, mode)
+            self.check(neighbourhood)
+
+    def test_sequential_moves(self):
+        """Test that in sequential mode the neighbourhood follows the drones as they move"""
+        neighbourhood = SwarmNeighbourhood(self.model.grid, self.radius)
+        neighbourhood.update(self.model.drones)
+        for drone in self.model.drones[::3]:
+            x, y = drone.pos
+            self.model.grid.move_agent(drone, (min(x + 1, 59), max(y - 1, 0)))
+        self.check(neighbourhood)
+
+
+class TestVectorisedSwarm(unittest.TestCase):
+
+    def test_matches_synchronous_agent_step(self):
+        """Test that the vectorised engine moves the drones like a synchronous agent step"""
+        model = SwarmModel(150)
+        for drone in model.drones:
+            drone.set_up()
+        model.neighbourhood = SwarmNeighbourhood(model.grid, model.drones[0].communication_range,
+                                                 synchronous=True)
+        start = [(drone.pos, drone.target_pos) for drone in model.drones]
+
+        model.neighbourhood.update(model.drones)
+        for drone in model.drones:
+            drone.sense()
+        for drone in model.drones:
+            drone.decide()
+        for drone in model.drones:
+            drone.advance()
+        expected = [(drone.pos, drone.target_pos, drone.color) for drone in model.drones]
+
+        for drone, (pos, target) in zip(model.drones, start):
+            model.grid.move_agent(drone, pos)
+            drone.target_pos = target
+        engine = VectorisedSwarm(model)
+        engine.step()
+
+        random_moves = 0
+        for drone, (pos, target, color), (start_pos, _) in zip(model.drones, expected, start):
+            self.assertEqual(drone.color, color)
+            # disperse and random walk targets are random, the others must match exactly
+            if drone.same_cell_drones or color == 'red':
+                random_moves += 1
+                self.assertLessEqual(drone.chebyshev_distance(start_pos), 1)
+                continue
+            self.assertEqual(drone.target_pos, target)
+            self.assertEqual(drone.pos, pos)
+        self.assertLess(random_moves, len(model.drones))
+
+
+if __name__ == "__main__":
+    unittest.main()
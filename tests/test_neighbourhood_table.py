@@ -0,0 +1,65 @@
+import unittest
+
+import mesa
+import numpy as np
+
+from src.models.environment.environment import GridEnvironment, HexEnvironment
+from src.models.environment.neighbourhood_table import NeighbourhoodTables
+from src.utils.config import Config
+from src.utils.random_streams import RandomStreams
+
+
+class TableModel(mesa.Model):
+    def __init__(self):
+        super().__init__(seed=0)
+        self.config = Config()
+        self.streams = RandomStreams(0)
+
+
+class TestNeighbourhoodTable(unittest.TestCase):
+
+    positions = [(0, 0), (0, 5), (1, 1), (6, 6), (12, 4), (12, 13), (7, 13), (3, 9)]
+
+    def check(self, grid, moore, radius, include_center):
+        table = grid.neighbourhood_table(radius, moore=moore, include_center=include_center)
+        for pos in self.positions:
+            expected = grid.get_neighborhood(pos, moore=moore, include_center=include_center, radius=radius)
+            self.assertEqual(table.positions(pos), list(expected), (pos, moore, radius, include_center))
+
+    def test_grid_matches_mesa(self):
+        grid = GridEnvironment(TableModel(), 13, 14)
+        for moore in (True, False):
+            for radius in (1, 2, 3):
+                for include_center in (False, True):
+                    self.check(grid, moore, radius, include_center)
+
+    def test_hex_matches_mesa(self):
+        grid = HexEnvironment(TableModel(), 13, 14)
+        for radius in (1, 2, 3):
+            for include_center in (False, True):
+                self.check(grid, True, radius, include_center)
+
+    def test_tables_are_cached(self):
+        grid = GridEnvironment(TableModel(), 13, 14)
+        self.assertIs(grid.neighbourhood_table(2), grid.neighbourhood_table(2))
+        self.assertIsNot(grid.neighbourhood_table(2), grid.neighbourhood_table(2, moore=False))
+
+    def test_offset_patterns_are_required(self):
+        class NoPatterns(NeighbourhoodTables, mesa.space.MultiGrid):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoPatterns(5, 5, torus=False)
+
+    def test_batch_neighbours(self):
+        for grid in (GridEnvironment(TableModel(), 13, 14), HexEnvironment(TableModel(), 13, 14)):
+            table = grid.neighbourhood_table(1)
+            cells = np.array([x * grid.height + y for x, y in self.positions])
+            targets, sources = table.neighbours(cells)
+            for i, index in enumerate(cells):
+                np.testing.assert_array_equal(targets[sources == i], table.indices(divmod(int(index), grid.height)))
+            self.assertTrue(np.all(np.diff(sources) >= 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
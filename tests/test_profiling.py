@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.utils.profiling import StepProfiler
+
+
+class TestStepProfiler(unittest.TestCase):
+
+    def test_disabled_profiler_records_nothing(self):
+        """Test that a disabled profiler returns a shared no-op phase"""
+        profiler = StepProfiler()
+        self.assertIs(profiler.phase("a"), profiler.phase("b"))
+        with profiler.phase("a"):
+            pass
+        profiler.end_step()
+        self.assertEqual(profiler.steps, 0)
+        self.assertEqual(profiler.events, [])
+
+    def test_phases_are_summed_per_step(self):
+        """Test the per-step totals, including phases first seen after the first step"""
+        profiler = StepProfiler(enabled=True)
+        with profiler.phase("step"):
+            with profiler.phase("fire"):
+                pass
+        profiler.end_step()
+        with profiler.phase("step"):
+            for _ in range(3):
+                with profiler.phase("movement"):
+                    pass
+        profiler.end_step()
+
+        self.assertEqual(profiler.steps, 2)
+        self.assertEqual(profiler.step_calls["fire"], [1, 0])
+        self.assertEqual(profiler.step_calls["movement"], [0, 3])
+        self.assertEqual(len(profiler.events), 6)
+        self.assertIn("movement", profiler.summary())
+
+    def test_profiled_run_writes_trace(self):
+        """Test that a profiled run covers the drone phases and writes a Chrome trace"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.max_steps': 3,
+                                          'simulation.save_data': False, 'simulation.save_location': temp_dir,
+                                          'simulation.profile': True})
+        model = SimulationModel(config)
+        model.run()
+
+        calls = {name: sum(calls) for name, calls in model.profiler.step_calls.items()}
+        self.assertEqual(calls["step"], 3)
+        self.assertEqual(calls["formation"], 3 * len(model.drones))
+        self.assertGreater(calls["grid_move"], 0)
+
+        self.assertTrue(os.path.exists(model.profile_path))
+        with open(model.profile_path) as f:
+            trace = json.load(f)
+        self.assertEqual(len(trace["traceEvents"]), len(model.profiler.events))
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+
+
+if __name__ == "__main__":
+    unittest.main()
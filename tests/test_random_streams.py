@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.utils.random_streams import STREAMS, RandomStreams
+
+
+class TestRandomStreams(unittest.TestCase):
+
+    def test_reproducible_and_independent(self):
+        """Test that streams repeat for a seed and differ between streams and seeds"""
+        draws = {name: getattr(RandomStreams(7), name).random(5) for name in STREAMS}
+        for name in STREAMS:
+            np.testing.assert_array_equal(getattr(RandomStreams(7), name).random(5), draws[name])
+            self.assertFalse(np.array_equal(getattr(RandomStreams(8), name).random(5), draws[name]))
+        self.assertEqual(len({tuple(d) for d in draws.values()}), len(STREAMS))
+
+    def test_state_round_trip(self):
+        streams = RandomStreams(3)
+        state = streams.get_state()
+        first = streams.fire.random(4)
+        streams.set_state(state)
+        np.testing.assert_array_equal(streams.fire.random(4), first)
+
+    def test_fire_does_not_depend_on_swarm(self):
+        """Test that the landscape and the fire are the same whatever the number of drones"""
+        states = []
+        for drones in (1, 30):
+            config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.save_data': False,
+                                              'simulation.seed': 5, 'swarm.drone_base.number_of_agents': drones})
+            model = SimulationModel(config)
+            model.start_fire(num_fires=3)
+            for _ in range(10):
+                model.step()
+            states.append((model.landscape.fuel.copy(), model.landscape.state.copy()))
+        np.testing.assert_array_equal(states[0][0], states[1][0])
+        np.testing.assert_array_equal(states[0][1], states[1][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.visualisation.recording import (FrameRenderer, VideoRecorder,
+                                         frame_palette)
+
+
+class TestRecording(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.save_data': False,
+                                               'simulation.max_steps': 10,
+                                               'swarm.drone_base.number_of_agents': 10})
+
+    def test_gif_frames(self):
+        """Test that the GIF holds the rendered frames at the frame stride"""
+        model = SimulationModel(self.config)
+        model.start_fire(num_fires=3)
+        path = os.path.join(self.temp_dir, "run.gif")
+        expected = []
+        with VideoRecorder(model, path, every=3) as recorder:
+            for _ in range(10):
+                model.step()
+                recorder.capture()
+                if model.steps % 3 == 0:
+                    expected.append(recorder.renderer.render())
+
+        palette = frame_palette()
+        with Image.open(path) as gif:
+            self.assertEqual(gif.n_frames, 3)
+            for i, frame in enumerate(expected):
+                gif.seek(i)
+                np.testing.assert_array_equal(np.array(gif.convert('RGB')), palette[frame])
+
+    def test_gif_palette(self):
+        """Test that the GIF decodes to the palette and the palette indices of the frames"""
+        model = SimulationModel(self.config)
+        model.start_fire(num_fires=3)
+        path = os.path.join(self.temp_dir, "run.gif")
+        expected = []
+        with VideoRecorder(model, path) as recorder:
+            for _ in range(4):
+                model.step()
+                recorder.capture()
+                expected.append(recorder.renderer.render())
+
+        palette = frame_palette()
+        with Image.open(path) as gif:
+            self.assertEqual(gif.n_frames, 4)
+            self.assertEqual(gif.info['loop'], 0)
+            # Pillow decodes the first frame with its palette, the later ones as RGB
+            self.assertEqual(gif.mode, 'P')
+            np.testing.assert_array_equal(np.array(gif.getpalette()[:palette.size]), palette.ravel())
+            np.testing.assert_array_equal(np.array(gif), expected[0])
+            for i, frame in enumerate(expected):
+                gif.seek(i)
+                np.testing.assert_array_equal(np.array(gif.convert('RGB')), palette[frame])
+
+    def test_downscale(self):
+        """Test that downscaled frames keep every n-th cell and still show the drones"""
+        model = SimulationModel(self.config)
+        full = FrameRenderer(model).render()
+        half = FrameRenderer(model, downscale=2).render()
+        self.assertEqual(half.shape, (75, 75))
+        x, y = model.drones[0].pos
+        self.assertGreaterEqual(half[(149 - y) // 2, x // 2], len(frame_palette()) - 6)
+        self.assertEqual(half[0, 0], full[0, 0])
+
+    def test_model_records_run(self):
+        """Test that a model configured with a video path records its run"""
+        path = os.path.join(self.temp_dir, "run.gif")
+        model = SimulationModel(self.config.with_overrides({'simulation.video_path': path,
+                                                            'simulation.video_every': 2}))
+        model.run()
+        with Image.open(path) as gif:
+            self.assertEqual(gif.n_frames, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
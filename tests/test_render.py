@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from src.agents.cell import CellState
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+from src.visualisation.raster import LandscapeRaster, RasterRenderer
+from src.visualisation.solara.custom_elements import landscape_colors
+
+
+class TestRaster(unittest.TestCase):
+
+    def setUp(self):
+        config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.save_data': False,
+                                          'swarm.drone_base.number_of_agents': 10})
+        self.model = SimulationModel(config)
+
+    def test_matches_landscape_colors(self):
+        """Test that the image has the colours of the land cells"""
+        landscape = self.model.landscape
+        landscape.state[3, 4] = CellState.BURNING
+        landscape.state[5, 6] = CellState.BURNT
+        raster = LandscapeRaster(landscape)
+        land = landscape.land
+        expected = np.round(landscape_colors(landscape) * 255).astype(np.uint8)
+        image = raster.image.transpose(1, 0, 2)
+        np.testing.assert_array_equal(image[land], expected[land])
+        self.assertTrue(np.all(image[~land, 3] == 0))
+
+    def test_update_recolours_changed_cells(self):
+        """Test that an update only recolours the cells that changed"""
+        landscape = self.model.landscape
+        raster = LandscapeRaster(landscape)
+        self.assertEqual(raster.update(), 0)
+        self.model.start_fire(position=(20, 20))
+        self.assertEqual(raster.update(), 1)
+        np.testing.assert_array_equal(raster.image, LandscapeRaster(landscape).image)
+
+    def test_renderer_draws_agents(self):
+        """Test that the renderer draws every base and placed drone"""
+        renderer = RasterRenderer(self.model, Figure().add_subplot())
+        expected = len(self.model.bases) + len(self.model.drones)
+        self.assertEqual(len(renderer.agents.get_offsets()), expected)
+        self.model.step()
+        renderer.update()
+        np.testing.assert_array_equal(renderer.agents.get_offsets()[len(self.model.bases):],
+                                      self.model.swarm_state.positions)
+
+
+if __name__ == '__main__':
+    unittest.main()
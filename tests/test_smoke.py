@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from src.agents.cell import CellState
+from src.models.environment.landscape import LandscapeState
+from src.models.environment.smoke import SmokeField
+from src.models.environment.wind import WindField
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+
+
+def burning_landscape(width: int, height: int, *positions) -> LandscapeState:
+    landscape = LandscapeState(width, height)
+    for pos in positions:
+        landscape.state[pos] = CellState.BURNING
+    return landscape
+
+
+class TestSmokeField(unittest.TestCase):
+
+    def test_emission(self):
+        """Test that every burning cell emits into the smoke cell covering it"""
+        smoke = SmokeField(40, 30, downscale=4, emission=2.0)
+        smoke.emit(burning_landscape(40, 30, (5, 5), (6, 7), (20, 20)))
+        self.assertAlmostEqual(smoke.total, 6.0, places=5)
+        self.assertAlmostEqual(smoke.sample([(5, 5)])[0], 2 * 2.0 / 16)
+        self.assertEqual(smoke.concentration.shape, (10, 8))
+
+    def test_diffusion_conserves_smoke(self):
+        """Test that diffusion spreads the smoke without losing any away from the edges"""
+        smoke = SmokeField(50, 50, diffusivity=2.0)
+        smoke.emit(burning_landscape(50, 50, (25, 25)))
+        for _ in range(3):
+            smoke.diffuse()
+        self.assertAlmostEqual(smoke.total, 1.0, places=5)
+        self.assertLess(smoke.sample([(25, 25)])[0], 0.5)
+        self.assertGreater(smoke.sample([(27, 25)])[0], 0)
+
+    def test_advection_follows_the_wind(self):
+        """Test that a wind from the west carries the smoke east"""
+        smoke = SmokeField(60, 20, diffusivity=0, decay=0, cell_size=10, step_minutes=1)
+        smoke.emit(burning_landscape(60, 20, (10, 10)))
+        # 1 m/s for a minute is 6 cells of 10 m
+        wind = WindField(60, 20, speed=1.0, direction=270)
+        smoke.advect(wind)
+        self.assertAlmostEqual(smoke.sample([(16, 10)])[0], 1.0, places=4)
+        self.assertAlmostEqual(smoke.total, 1.0, places=4)
+
+    def test_decay_and_leaving_the_grid(self):
+        """Test that smoke decays and is lost past the edges"""
+        smoke = SmokeField(20, 20, diffusivity=0, decay=0.1)
+        smoke.step(burning_landscape(20, 20, (10, 10)), WindField(20, 20))
+        self.assertAlmostEqual(smoke.total, np.exp(-0.1), places=5)
+        smoke.advect(WindField(20, 20, speed=5.0, direction=0))
+        self.assertEqual(smoke.total, 0)
+
+    def test_queries(self):
+        """Test the line integral and the vision ranges of drones in smoke"""
+        smoke = SmokeField(40, 40, downscale=2, extinction=0.5)
+        smoke.concentration[...] = 0.4
+        np.testing.assert_allclose(smoke.line_integral([(4, 10), (5, 5)], [(34, 10), (5, 25)]), [12, 8], rtol=1e-5)
+        np.testing.assert_allclose(smoke.vision_ranges([(3, 3)], 10), [10 * np.exp(-0.2)], rtol=1e-5)
+
+
+class TestModelSmoke(unittest.TestCase):
+
+    def test_smoke_shortens_the_vision(self):
+        """Test that smoke over the drones lowers their coverage"""
+        overrides = {'simulation.area_size': 'small', 'simulation.save_data': False, 'simulation.seed': 3,
+                     'simulation.collect_metrics': True, 'swarm.drone_base.number_of_agents': 20,
+                     'smoke.downscale': 2}
+        coverage = []
+        for enabled in (False, True):
+            model = SimulationModel(Config().with_overrides({**overrides, 'smoke.enabled': enabled}))
+            if model.smoke is not None:
+                model.smoke.concentration[...] = 2.0
+            for _ in range(3):
+                model.step()
+            coverage.append(model.datacollector.columns['coverage'][2])
+        self.assertIsNotNone(model.smoke)
+        self.assertGreater(model.smoke.total, 0)
+        self.assertLess(coverage[1], coverage[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import random
+import unittest
+
+from src.models.environment.spatial_index import SpatialHash
+
+
+class TestSpatialHash(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(0)
+        self.index = SpatialHash(bucket_size=7)
+        self.positions = {}
+        for agent in range(200):
+            pos = (self.rng.randrange(100), self.rng.randrange(100))
+            self.index.add(agent, pos)
+            self.positions[agent] = pos
+
+    def brute_force(self, pos, radius, exclude=None):
+        return sorted((agent for agent, (x, y) in self.positions.items()
+                       if max(abs(x - pos[0]), abs(y - pos[1])) <= radius and agent != exclude),
+                      key=lambda agent: (self.positions[agent], agent))
+
+    def test_query_matches_brute_force(self):
+        """Test that Chebyshev range queries return the same agents as a linear scan"""
+        for radius in (0, 1, 7, 15, 40):
+            for agent in range(0, 200, 13):
+                pos = self.positions[agent]
+                self.assertEqual(self.index.query(pos, radius, exclude=agent),
+                                 self.brute_force(pos, radius, exclude=agent))
+
+    def test_move_and_remove(self):
+        """Test that moved and removed agents are found at their new position only"""
+        for agent in range(0, 200, 3):
+            pos = (self.rng.randrange(100), self.rng.randrange(100))
+            self.index.move(agent, pos)
+            self.positions[agent] = pos
+        for agent in range(0, 200, 5):
+            self.index.remove(agent)
+            del self.positions[agent]
+
+        self.assertEqual(len(self.index), len(self.positions))
+        for pos in [(0, 0), (50, 50), (99, 10)]:
+            self.assertEqual(self.index.query(pos, 15), self.brute_force(pos, 15))
+
+
+if __name__ == "__main__":
+    unittest.main()
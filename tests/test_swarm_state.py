@@ -0,0 +1,68 @@
+import unittest
+
+import mesa
+import numpy as np
+
+from src.agents.drone import Drone
+from src.models.environment.environment import GridEnvironment
+from src.models.swarm.state import UNSET, SwarmState
+from src.utils.config import Config
+from src.utils.profiling import NULL_PROFILER
+from src.utils.random_streams import RandomStreams
+
+
+class StateModel(mesa.Model):
+    def __init__(self):
+        super().__init__(seed=0)
+        self.config = Config()
+        self.streams = RandomStreams(0)
+        self.profiler = NULL_PROFILER
+        self.grid = GridEnvironment(self, 30, 30)
+        self.swarm_state = SwarmState(capacity=2)
+
+
+class TestSwarmState(unittest.TestCase):
+
+    def setUp(self):
+        self.model = StateModel()
+        self.drones = [Drone(self.model, (1, 2)) for _ in range(5)]
+        for i, drone in enumerate(self.drones):
+            self.model.grid.place_agent(drone, (i, 2 * i))
+
+    def test_attributes_are_rows_of_the_arrays(self):
+        """Test that the drone attributes read and write the swarm state arrays"""
+        state = self.model.swarm_state
+        self.assertEqual(len(state), 5)
+        np.testing.assert_array_equal(state.positions, [(i, 2 * i) for i in range(5)])
+        np.testing.assert_array_equal(state.base_positions, [(1, 2)] * 5)
+        self.assertTrue(np.all(state.targets == UNSET))
+        self.assertIsNone(self.drones[0].target_pos)
+
+        drone = self.drones[3]
+        drone.target_pos = (7, 8)
+        drone.color = 'purple'
+        drone.debug = True
+        self.model.grid.move_agent(drone, (4, 5))
+        self.assertEqual(tuple(state.targets[3]), (7, 8))
+        self.assertEqual(state.color_names()[3], 'purple')
+        self.assertTrue(state.debug[3])
+        self.assertEqual(tuple(state.positions[3]), (4, 5))
+        self.assertTrue(drone.drone_logger.on)
+        self.assertFalse(self.drones[0].drone_logger.on)
+
+        state.targets[1] = (9, 9)
+        self.assertEqual(self.drones[1].target_pos, (9, 9))
+
+    def test_remove(self):
+        """Test that removing a drone moves the last drone into its row"""
+        state = self.model.swarm_state
+        last = self.drones[-1]
+        self.drones[1].remove()
+        self.assertEqual(len(state), 4)
+        self.assertEqual(last.index, 1)
+        self.assertIs(state.drones[1], last)
+        self.assertEqual(tuple(state.positions[1]), last.pos)
+
+
+if __name__ == '__main__':
+    unittest.main()
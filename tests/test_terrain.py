@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.agents.cell import CellState, FuelLevel
+from src.models.environment.terrain import (LAYER_OFFSETS, SLOPE_UNIT, Terrain,
+                                            fractal_noise)
+from src.models.environment.wind import moore_keys
+from src.simulation.simulation_model import SimulationModel
+from src.utils.config import Config
+
+
+def ramp(width: int, height: int, grade: float, cell_size: float = 10.0) -> np.ndarray:
+    """Elevation rising to the east with the given tangent."""
+    return np.repeat(np.arange(width, dtype=float)[:, None] * grade * cell_size, height, axis=1)
+
+
+class TestTerrain(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_flat_terrain(self):
+        """Test that the default terrain is flat and allocates nothing"""
+        terrain = Terrain(50, 40)
+        self.assertTrue(terrain.flat)
+        self.assertEqual(terrain.nbytes, 0)
+        self.assertEqual(terrain.slopes.shape, (8, 50, 40))
+
+    def test_ramp_slopes(self):
+        """Test the directional slopes, slope and aspect of a ramp rising to the east"""
+        terrain = Terrain(30, 20, ramp(30, 20, grade=0.2))
+        self.assertFalse(terrain.flat)
+        layers = {offset: terrain.slopes[layer, 10, 10] for layer, offset in enumerate(LAYER_OFFSETS)}
+        self.assertEqual(layers[(1, 0)], round(0.2 / SLOPE_UNIT))
+        self.assertEqual(layers[(-1, 0)], -round(0.2 / SLOPE_UNIT))
+        self.assertEqual(layers[(0, 1)], 0)
+        self.assertEqual(layers[(1, 1)], round(0.2 / np.sqrt(2) / SLOPE_UNIT))
+        self.assertEqual(terrain.slope[10, 10], round(np.degrees(np.arctan(0.2))))
+        # facing west, downslope
+        self.assertEqual(terrain.aspect[10, 10], 270)
+        # no slope towards the outside of the grid
+        self.assertEqual(terrain.slopes[LAYER_OFFSETS.index((1, 0)), 29, 10], 0)
+
+    def test_lookup(self):
+        """Test the slope lookup by flat index and direction key"""
+        terrain = Terrain(30, 20, ramp(30, 20, grade=0.2))
+        source = np.array([10 * 20 + 10])
+        east, west = source + 20, source - 20
+        slopes = terrain.directional_slopes(np.repeat(source, 2), moore_keys(np.repeat(source, 2),
+                                                                             np.concatenate([east, west]), 20))
+        np.testing.assert_array_equal(slopes, [10, -10])
+        factors = terrain.multiplier(np.repeat(source, 2), moore_keys(np.repeat(source, 2),
+                                                                      np.concatenate([east, west]), 20))
+        self.assertGreater(factors[0], 1)
+        self.assertLess(factors[1], 1)
+        np.testing.assert_allclose(terrain.elevation_at([(3, 5), (4, 5)]), [6, 8])
+
+    def test_memory_mapped(self):
+        """Test that memory-mapped terrain matches the terrain in memory and leaves no files"""
+        elevation = fractal_noise(300, 200, np.random.default_rng(1), feature_size=32) * 100
+        in_memory = Terrain(300, 200, elevation)
+        mapped = Terrain(300, 200, elevation, memmap_dir=self.temp_dir)
+        self.assertIsInstance(mapped.slopes, np.memmap)
+        np.testing.assert_array_equal(mapped.slopes, in_memory.slopes)
+        np.testing.assert_array_equal(mapped.aspect, in_memory.aspect)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_fractal_noise(self):
+        """Test that the noise is within [0, 1], smooth and reproducible"""
+        noise = fractal_noise(200, 100, np.random.default_rng(3), feature_size=32, block=64)
+        self.assertGreaterEqual(noise.min(), 0)
+        self.assertLessEqual(noise.max(), 1)
+        self.assertLess(np.abs(np.diff(noise, axis=0)).max(), 0.2)
+        np.testing.assert_array_equal(noise, fractal_noise(200, 100, np.random.default_rng(3), feature_size=32))
+
+    def test_model_terrain(self):
+        """Test building the terrain of a model from the config, generated or loaded"""
+        config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.save_data': False,
+                                          'simulation.seed': 4, 'terrain.relief': 50})
+        model = SimulationModel(config)
+        terrain = model.grid.terrain
+        self.assertFalse(terrain.flat)
+        self.assertLessEqual(terrain.elevation.max(), 50)
+
+        path = os.path.join(self.temp_dir, "elevation.npy")
+        # map orientation, the first row is the northern edge
+        np.save(path, np.flipud(np.asarray(terrain.elevation).T))
+        loaded = SimulationModel(config.with_overrides({'terrain.relief': 0, 'terrain.elevation_path': path}))
+        np.testing.assert_array_equal(loaded.grid.terrain.slopes, terrain.slopes)
+
+
+class TestSlopeDrivenFire(unittest.TestCase):
+
+    def spread(self, fire_model, seed: int, steps: int):
+        config = Config().with_overrides({'simulation.area_size': 'small', 'simulation.save_data': False,
+                                          'simulation.seed': seed, 'swarm.initial_bases': 0,
+                                          'fire.model': fire_model})
+        model = SimulationModel(config)
+        width, height = model.grid.width, model.grid.height
+        model.grid.terrain = Terrain(width, height, ramp(width, height, grade=0.4))
+        model.landscape.fuel[...] = FuelLevel.MEDIUM
+        model.landscape.state[...] = CellState.UNBURNT
+        x, y = width // 2, height // 2
+        model.fire_model.ignite((x, y))
+        for _ in range(steps):
+            model.fire_model.step()
+        reached = model.landscape.state != CellState.UNBURNT
+        return np.count_nonzero(reached[x + 1:]), np.count_nonzero(reached[:x])
+
+    def test_fire_spreads_uphill(self):
+        """Test that fire spreads further up the slope than down it"""
+        uphill, downhill = np.sum([self.spread('vectorised', seed, steps=4) for seed in range(5)], axis=0)
+        self.assertGreater(uphill, 2 * downhill)
+        uphill, downhill = self.spread('rothermel', seed=0, steps=20)
+        self.assertGreater(uphill, 2 * downhill)
+
+
+if __name__ == '__main__':
+    unittest.main()
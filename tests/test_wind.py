@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.models.environment.wind import (MOORE_DIRECTIONS, WindField,
+                                         moore_keys, read_series)
+
+# Keys of the Moore directions east and west
+EAST, WEST = 7, 1
+
+
+class TestWindField(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_directions(self):
+        """Test the keys and unit vectors of the Moore directions"""
+        height = 10
+        centre = np.array([5 * height + 5])
+        east, north = centre + height, centre + 1
+        self.assertEqual(moore_keys(centre, east, height)[0], EAST)
+        np.testing.assert_allclose(MOORE_DIRECTIONS[EAST], [1, 0])
+        np.testing.assert_allclose(MOORE_DIRECTIONS[moore_keys(centre, north, height)[0]], [0, 1])
+
+    def test_calm(self):
+        """Test that without wind the kernels leave the spread unchanged"""
+        wind = WindField(20, 10)
+        self.assertTrue(wind.calm)
+        cells = np.arange(5)
+        np.testing.assert_array_equal(wind.multiplier(cells, np.full(5, EAST)), 1)
+
+    def test_uniform_wind_kernels(self):
+        """Test that a wind from the west favours spread to the east"""
+        wind = WindField(20, 10, speed=5, direction=270)
+        self.assertFalse(wind.calm)
+        cell = np.array([42])
+        east = wind.multiplier(cell, np.array([EAST]))[0]
+        west = wind.multiplier(cell, np.array([WEST]))[0]
+        self.assertGreater(east, 1)
+        self.assertLess(west, 1)
+        ellipse = wind.ellipses[wind.bins(cell)[0]]
+        self.assertAlmostEqual(ellipse[EAST], 1, places=5)
+        self.assertTrue(np.all(np.delete(ellipse, [EAST, 4]) < 1))
+
+    def test_per_cell_wind(self):
+        """Test that every cell gets the bin of its own wind"""
+        speed = np.zeros((20, 10))
+        speed[10:] = 4
+        wind = WindField(20, 10, speed=speed, direction=90)
+        bins = wind.bins(np.array([0, 10 * 10]))
+        self.assertEqual(wind.speed_bins(np.array([0]))[0], 0)
+        self.assertEqual(bins[1] // WindField.DIRECTION_BINS, 4 / WindField.SPEED_STEP)
+        with self.assertRaises(ValueError):
+            wind.set(np.zeros((10, 20)), 0)
+
+    def test_series_from_csv(self):
+        """Test that a series changes the wind at its steps"""
+        path = os.path.join(self.temp_dir, "wind.csv")
+        with open(path, "w") as file:
+            file.write("step,speed,direction\n5,3,180\n1,2,90\n")
+        wind = WindField(20, 10, series=read_series(path))
+        self.assertFalse(wind.update(0))
+        self.assertTrue(wind.calm)
+        self.assertTrue(wind.update(1))
+        self.assertEqual(float(wind.speed), 2)
+        self.assertFalse(wind.update(4))
+        self.assertTrue(wind.update(7))
+        self.assertEqual(float(wind.direction), 180)
+
+    def test_series_from_npz(self):
+        """Test a series of wind arrays per cell"""
+        path = os.path.join(self.temp_dir, "wind.npz")
+        speed = np.stack([np.zeros((20, 10)), np.full((20, 10), 6.0)])
+        np.savez(path, steps=np.array([0, 3]), speed=speed, direction=np.zeros((2, 20, 10)))
+        wind = WindField(20, 10, series=read_series(path))
+        wind.update(3)
+        np.testing.assert_array_equal(wind.speed, speed[1])
+        with self.assertRaises(ValueError):
+            WindField(5, 5, series=read_series(path))
+
+
+if __name__ == '__main__':
+    unittest.main()